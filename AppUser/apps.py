@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class AppUserConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'AppUser'
+
+    def ready(self):
+        # Connecting the signal receivers
+        from . import signals  # noqa: F401
+        # Registering the system checks
+        from . import checks  # noqa: F401
@@ -0,0 +1,17 @@
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+from .token_store import revocation_store
+
+
+class RevocationAwareJWTAuthentication(JWTAuthentication):
+    """
+    This class in inherited from JWTAuthentication class. Token is validated by signature and expiry as before, and
+    then checked against the revocation store so tokens of logged out users are rejected.
+    """
+
+    def get_validated_token(self, raw_token):
+        validated_token = super().get_validated_token(raw_token)
+        if revocation_store.is_revoked(validated_token):
+            raise InvalidToken("Token is revoked")
+        return validated_token
@@ -0,0 +1,195 @@
+from django.conf import settings
+from django.db import NotSupportedError, connections, router, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.relations import PrimaryKeyRelatedField
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from DishDash.general_functions import error_message, success_message
+
+
+def bulk_create_with_pks(model, instances: list, batch_size: int = None) -> list:
+    """
+    This function creates instances with bulk_create and makes sure they have primary keys, also on databases which
+    can not return primary keys from bulk insert (MySQL).
+
+    On those databases every batch is written with one multi-row INSERT, auto increment keys of such INSERT are
+    consecutive, so keys of the batch are counted from the id of the first inserted row (LAST_INSERT_ID() on MySQL,
+    last_insert_rowid() on SQLite). Call it inside transaction.atomic(), so the batches are rolled back together.
+
+    Params:
+    model: Model class with auto increment primary key
+    instances: list of unsaved model instances
+    batch_size: number of rows of one INSERT query
+
+    return: list of created instances with primary keys
+    """
+    connection = connections[router.db_for_write(model)]
+    if connection.features.can_return_rows_from_bulk_insert:
+        return model.objects.bulk_create(instances, batch_size=batch_size)
+    if connection.vendor not in ("mysql", "sqlite"):
+        raise NotSupportedError(f"Primary keys of bulk insert can not be read on {connection.vendor}.")
+    fields = [field for field in model._meta.concrete_fields if not field.primary_key]
+    max_batch_size = max(connection.ops.bulk_batch_size(fields, instances), 1)
+    batch_size = min(batch_size, max_batch_size) if batch_size else max_batch_size
+    for start in range(0, len(instances), batch_size):
+        batch = instances[start:start + batch_size]
+        model.objects.bulk_create(batch)
+        with connection.cursor() as cursor:
+            if connection.vendor == "mysql":
+                # Id of the first row of the last INSERT, ids of one INSERT are auto_increment_increment apart.
+                cursor.execute("SELECT LAST_INSERT_ID(), @@auto_increment_increment")
+                first_pk, step = cursor.fetchone()
+            else:
+                # Id of the last row of the last INSERT.
+                cursor.execute("SELECT last_insert_rowid()")
+                first_pk, step = cursor.fetchone()[0] - len(batch) + 1, 1
+        for index, instance in enumerate(batch):
+            instance.pk = first_pk + index * step
+    return instances
+
+
+class BulkWriteMixin:
+    """
+    This mixin adds bulk action to a ModelViewSet.
+
+    Methods to Access Data:
+        To create many objects: POST /<route>/bulk/ with JSON array of objects
+        To update many objects partially: PATCH /<route>/bulk/ with JSON array of objects, each with "id"
+
+    Items are validated with many=True serializer, related objects are loaded with one query per foreign key and rows
+    are written with bulk_create / bulk_update in batches of ?batch_size= (default BULK_WRITE_BATCH_SIZE setting)
+    inside one transaction. If any item is invalid nothing is written and errors are returned with item index.
+
+    Created objects have primary keys on every database, see bulk_create_with_pks.
+    """
+
+    def before_bulk_write(self, instances: list, fields: set) -> set:
+        """
+        This method is called before instances are written, viewsets override it to fill derived fields.
+
+        return: set of fields to write with bulk_update
+        """
+        return fields
+
+    def after_bulk_write(self, instances: list) -> None:
+        """
+        This method is called inside the write transaction after instances are written, viewsets override it to
+        rebuild indexes of instances. Caches should be invalidated with transaction.on_commit, so other requests do not
+        cache rows which may still be rolled back.
+        """
+
+    def get_bulk_batch_size(self, request: Request) -> int:
+        try:
+            batch_size = int(request.query_params.get("batch_size", settings.BULK_WRITE_BATCH_SIZE))
+        except ValueError:
+            batch_size = settings.BULK_WRITE_BATCH_SIZE
+        return max(1, min(batch_size, settings.BULK_WRITE_MAX_BATCH_SIZE))
+
+    def preload_related_instances(self, items: list) -> dict:
+        """
+        This method loads related objects of all items with one query per foreign key field.
+
+        return: dict of field name -> {str(pk): instance}
+        """
+        related_instances = {}
+        for field_name, field in self.get_serializer().fields.items():
+            if not isinstance(field, PrimaryKeyRelatedField) or field.read_only or not getattr(field, "preload", True):
+                continue
+            values = {item.get(field_name) for item in items if isinstance(item, dict)}
+            values = [value for value in values if value is not None and not isinstance(value, bool)]
+            try:
+                instances = field.get_queryset().in_bulk(values)
+            except (TypeError, ValueError):
+                # Invalid primary key values, serializer will report them per item.
+                continue
+            related_instances[field_name] = {str(pk): instance for pk, instance in instances.items()}
+        return related_instances
+
+    @staticmethod
+    def item_errors(errors: list) -> list:
+        return [{"index": index, "errors": error} for index, error in enumerate(errors) if error]
+
+    @action(detail=False, methods=['post', 'patch'])
+    def bulk(self, request: Request, *args: any, **kwargs: any) -> Response:
+        """
+        In this method we are creating (POST) or partially updating (PATCH) many objects in one request.
+
+        Params:
+        request: HTTP Request object - request body is JSON array of objects
+        **args: These are additional parameters
+        **kwargs: These are additional - optional keyword parameters
+
+        return:  rest_framework.response object with status of OK of failure to requesting source for this API
+        """
+        items = request.data
+        if not isinstance(items, list) or not items:
+            response_dictionary = error_message("REQUEST BODY MUST BE A NON EMPTY LIST")
+            return Response(response_dictionary, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > settings.BULK_WRITE_MAX_ITEMS:
+            response_dictionary = error_message(f"NOT MORE THAN {settings.BULK_WRITE_MAX_ITEMS} ITEMS ARE ALLOWED")
+            return Response(response_dictionary, status=status.HTTP_400_BAD_REQUEST)
+
+        context = self.get_serializer_context()
+        context["related_instances"] = self.preload_related_instances(items)
+        if request.method == "POST":
+            return self.perform_bulk_create(request, items, context)
+        return self.perform_bulk_update(request, items, context)
+
+    def perform_bulk_create(self, request: Request, items: list, context: dict) -> Response:
+        serializer = self.get_serializer(data=items, many=True, context=context)
+        if not serializer.is_valid():
+            response_dictionary = error_message("OBJECTS NOT CREATED", self.item_errors(serializer.errors))
+            return Response(response_dictionary, status=status.HTTP_400_BAD_REQUEST)
+
+        model = self.get_queryset().model
+        instances = [model(**attributes) for attributes in serializer.validated_data]
+        self.before_bulk_write(instances, set())
+        with transaction.atomic():
+            instances = bulk_create_with_pks(model, instances, batch_size=self.get_bulk_batch_size(request))
+            self.after_bulk_write(instances)
+
+        response_status = status.HTTP_201_CREATED
+        response_dictionary = success_message("OBJECTS CREATED", self.get_serializer(instances, many=True).data,
+                                              response_status)
+        return Response(response_dictionary, status=response_status)
+
+    def perform_bulk_update(self, request: Request, items: list, context: dict) -> Response:
+        ids = [item.get("id") if isinstance(item, dict) else None for item in items]
+        try:
+            instances = self.get_queryset().in_bulk([pk for pk in ids if pk is not None])
+        except (TypeError, ValueError):
+            instances = {}
+        instances = {str(pk): instance for pk, instance in instances.items()}
+        errors = [{} if str(pk) in instances else {"id": ["Object with this id does not exist."]} for pk in ids]
+
+        serializer = self.get_serializer(data=items, many=True, partial=True, context=context)
+        if not serializer.is_valid():
+            errors = [dict(serializer_error, **id_error) for serializer_error, id_error in
+                      zip(serializer.errors, errors)]
+        if any(errors):
+            response_dictionary = error_message("OBJECTS NOT UPDATED", self.item_errors(errors))
+            return Response(response_dictionary, status=status.HTTP_400_BAD_REQUEST)
+
+        now = timezone.now()
+        fields = {"updated_at"}
+        updated = []
+        for pk, attributes in zip(ids, serializer.validated_data):
+            instance = instances[str(pk)]
+            for field_name, value in attributes.items():
+                setattr(instance, field_name, value)
+                fields.add(field_name)
+            instance.updated_at = now
+            updated.append(instance)
+        fields = self.before_bulk_write(updated, fields)
+        with transaction.atomic():
+            self.get_queryset().model.objects.bulk_update(updated, list(fields),
+                                                          batch_size=self.get_bulk_batch_size(request))
+            self.after_bulk_write(updated)
+
+        response_status = status.HTTP_200_OK
+        response_dictionary = success_message("OBJECTS UPDATED", self.get_serializer(updated, many=True).data,
+                                              response_status)
+        return Response(response_dictionary, status=response_status)
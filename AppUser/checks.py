@@ -0,0 +1,66 @@
+from django.conf import settings
+from django.core import checks
+from django.utils.module_loading import import_string
+
+# Cache backends which keep their data in the memory of one process, every worker has its own copy.
+PER_PROCESS_CACHE_BACKENDS = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+def is_shared_cache(alias: str) -> bool:
+    """
+    This function returns True when cache alias of CACHES setting is seen by every worker (e.g. Redis, Memcached or
+    database cache).
+    """
+    return settings.CACHES.get(alias, {}).get("BACKEND") not in PER_PROCESS_CACHE_BACKENDS
+
+
+@checks.register(checks.Tags.caches)
+def check_otp_cache(app_configs, **kwargs) -> list:
+    """
+    This check fails when OTPs are kept in a per process cache. OTP issued by one worker would not be found by the
+    worker which verifies it and max attempts would be counted per worker.
+    """
+    from .otp import CacheOTPBackend
+
+    if not issubclass(import_string(settings.OTP_BACKEND), CacheOTPBackend) or is_shared_cache(settings.OTP_CACHE):
+        return []
+    return [checks.Error(
+        f"OTP_BACKEND keeps OTPs in cache {settings.OTP_CACHE!r} which is not shared between worker processes.",
+        hint="Point OTP_CACHE to a Redis / Memcached cache, or set OTP_BACKEND to AppUser.otp.DatabaseOTPBackend.",
+        id="AppUser.E001",
+    )]
+
+
+@checks.register(checks.Tags.caches)
+def check_token_revocation_cache(app_configs, **kwargs) -> list:
+    """
+    This check fails when stateless login keeps revoked tokens in a per process cache. Token revoked by logout on one
+    worker would still be accepted by the others.
+    """
+    if not settings.JWT_STATELESS_LOGIN or is_shared_cache(settings.TOKEN_REVOCATION_CACHE):
+        return []
+    return [checks.Error(
+        f"JWT_STATELESS_LOGIN keeps revoked tokens in cache {settings.TOKEN_REVOCATION_CACHE!r} which is not shared "
+        f"between worker processes.",
+        hint="Point TOKEN_REVOCATION_CACHE to a Redis / Memcached cache, or set JWT_STATELESS_LOGIN to False.",
+        id="AppUser.E002",
+    )]
+
+
+@checks.register(checks.Tags.caches)
+def check_throttle_cache(app_configs, **kwargs) -> list:
+    """
+    This check warns when token buckets are kept in a per process cache. Every worker has its own buckets, so a
+    client gets the limit once per worker.
+    """
+    if not settings.THROTTLE_ENABLED or is_shared_cache(settings.THROTTLE_CACHE):
+        return []
+    return [checks.Warning(
+        f"THROTTLE_ENABLED keeps token buckets in cache {settings.THROTTLE_CACHE!r} which is not shared between "
+        f"worker processes, limits are multiplied by the number of workers.",
+        hint="Point THROTTLE_CACHE to a Redis / Memcached cache.",
+        id="AppUser.W001",
+    )]
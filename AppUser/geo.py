@@ -0,0 +1,173 @@
+import math
+
+from django.db.models import Q
+
+EARTH_RADIUS_KM = 6371.0088
+GEOHASH_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+GEOHASH_MAX_PRECISION = 12
+
+
+def parse_coordinate(value, limit: float):
+    """
+    This function converts the coordinate saved in CharField (latitude / longitude) into float value.
+
+    Params:
+    value: str or number - coordinate received from application.
+    limit: float - 90 for latitude and 180 for longitude.
+
+    return: float value of coordinate or None if value is empty or not a valid coordinate.
+    """
+    try:
+        coordinate = float(value)
+    except (TypeError, ValueError):
+        return None
+    if math.isnan(coordinate) or abs(coordinate) > limit:
+        return None
+    return coordinate
+
+
+def encode_geohash(latitude: float, longitude: float, precision: int = GEOHASH_MAX_PRECISION) -> str:
+    """
+    This function encodes latitude and longitude into geohash string. Nearby points share the same geohash prefix,
+    which means an index on geohash column can answer "which rows are in this cell" with a range seek.
+
+    Params:
+    latitude: float - latitude in degrees
+    longitude: float - longitude in degrees
+    precision: int - length of geohash string
+
+    return: geohash string
+    """
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    geohash = []
+    bit = 0
+    character = 0
+    even_bit = True
+    while len(geohash) < precision:
+        if even_bit:
+            middle = (lng_range[0] + lng_range[1]) / 2
+            if longitude >= middle:
+                character = (character << 1) | 1
+                lng_range[0] = middle
+            else:
+                character = character << 1
+                lng_range[1] = middle
+        else:
+            middle = (lat_range[0] + lat_range[1]) / 2
+            if latitude >= middle:
+                character = (character << 1) | 1
+                lat_range[0] = middle
+            else:
+                character = character << 1
+                lat_range[1] = middle
+        even_bit = not even_bit
+        bit += 1
+        if bit == 5:
+            geohash.append(GEOHASH_BASE32[character])
+            bit = 0
+            character = 0
+    return "".join(geohash)
+
+
+def geohash_cell_size(precision: int) -> tuple:
+    """
+    This function returns the (height, width) in degrees of a geohash cell for given precision.
+    """
+    bits = precision * 5
+    lng_bits = (bits + 1) // 2
+    lat_bits = bits // 2
+    return 180.0 / (2 ** lat_bits), 360.0 / (2 ** lng_bits)
+
+
+def haversine_km(latitude_1: float, longitude_1: float, latitude_2: float, longitude_2: float) -> float:
+    """
+    This function calculates the great circle distance between two points in kilometers.
+    """
+    phi_1 = math.radians(latitude_1)
+    phi_2 = math.radians(latitude_2)
+    delta_phi = math.radians(latitude_2 - latitude_1)
+    delta_lambda = math.radians(longitude_2 - longitude_1)
+    a = math.sin(delta_phi / 2) ** 2 + math.cos(phi_1) * math.cos(phi_2) * math.sin(delta_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(latitude: float, longitude: float, radius_km: float) -> tuple:
+    """
+    This function calculates the bounding box around a point which contains every point within radius_km.
+
+    return: (min_latitude, max_latitude, min_longitude, max_longitude). Longitudes are not wrapped, so min_longitude
+    can be less than -180 and max_longitude can be more than 180 when box crosses the anti meridian.
+    """
+    delta_latitude = math.degrees(radius_km / EARTH_RADIUS_KM)
+    min_latitude = max(-90.0, latitude - delta_latitude)
+    max_latitude = min(90.0, latitude + delta_latitude)
+    # Near the poles a circle covers every longitude.
+    if min_latitude <= -90.0 or max_latitude >= 90.0:
+        return min_latitude, max_latitude, -180.0, 180.0
+    delta_longitude = math.degrees(
+        math.asin(min(1.0, math.sin(radius_km / EARTH_RADIUS_KM) / math.cos(math.radians(latitude)))))
+    if delta_longitude >= 180.0:
+        return min_latitude, max_latitude, -180.0, 180.0
+    return min_latitude, max_latitude, longitude - delta_longitude, longitude + delta_longitude
+
+
+def _wrap_longitude(longitude: float) -> float:
+    return ((longitude + 180.0) % 360.0) - 180.0
+
+
+def covering_geohashes(min_latitude: float, max_latitude: float, min_longitude: float, max_longitude: float) -> list:
+    """
+    This function returns the geohash prefixes which together cover the bounding box. Precision is selected so that
+    one cell is at least as big as the box, which keeps the number of prefixes between 1 and 4.
+    """
+    height = max_latitude - min_latitude
+    width = max_longitude - min_longitude
+    if width >= 360.0:
+        return []
+    precision = 0
+    for candidate in range(1, GEOHASH_MAX_PRECISION + 1):
+        cell_height, cell_width = geohash_cell_size(candidate)
+        if cell_height < height or cell_width < width:
+            break
+        precision = candidate
+    if precision == 0:
+        return []
+    cells = set()
+    for latitude in (min_latitude, max_latitude):
+        for longitude in (min_longitude, max_longitude):
+            cells.add(encode_geohash(latitude, _wrap_longitude(longitude), precision))
+    return sorted(cells)
+
+
+def bounding_box_filter(latitude: float, longitude: float, radius_km: float,
+                        latitude_field: str = "geo_latitude", longitude_field: str = "geo_longitude",
+                        geohash_field: str = "geohash") -> Q:
+    """
+    This function builds the Q object which pre filters rows to the bounding box of the search circle. Geohash
+    prefixes let the database use the geohash index, and latitude / longitude ranges trim the corners of the cells.
+
+    Params:
+    latitude: float - latitude of search center
+    longitude: float - longitude of search center
+    radius_km: float - search radius in kilometers
+
+    return: django.db.models.Q object
+    """
+    min_latitude, max_latitude, min_longitude, max_longitude = bounding_box(latitude, longitude, radius_km)
+
+    query = Q(**{f"{latitude_field}__gte": min_latitude, f"{latitude_field}__lte": max_latitude})
+    if min_longitude < -180.0 or max_longitude > 180.0:
+        # Box crosses the anti meridian, so we need two longitude ranges.
+        query &= (Q(**{f"{longitude_field}__gte": _wrap_longitude(min_longitude)}) |
+                  Q(**{f"{longitude_field}__lte": _wrap_longitude(max_longitude)}))
+    elif min_longitude > -180.0 or max_longitude < 180.0:
+        query &= Q(**{f"{longitude_field}__gte": min_longitude, f"{longitude_field}__lte": max_longitude})
+
+    prefixes = covering_geohashes(min_latitude, max_latitude, min_longitude, max_longitude)
+    if prefixes:
+        prefix_query = Q()
+        for prefix in prefixes:
+            prefix_query |= Q(**{f"{geohash_field}__startswith": prefix})
+        query &= prefix_query
+    return query
@@ -0,0 +1,212 @@
+import atexit
+import io
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils.module_loading import import_string
+from PIL import Image, ImageOps
+
+from .storage import get_storage
+
+logger = logging.getLogger(__name__)
+
+
+def render_variants(data: bytes, sizes: dict, image_format: str, quality: int) -> dict:
+    """
+    This function decodes the image once and returns its resized and re-encoded variants. It only uses Pillow, so
+    it can run in a worker process without Django.
+
+    Params:
+    data: bytes - uploaded image file
+    sizes: dict - variant name to (max width, max height), aspect ratio is kept and images are never enlarged
+    image_format: str - Pillow format of variants e.g. "JPEG" or "WEBP"
+    quality: int - encoder quality from 1 to 95
+
+    return: dict of variant name -> encoded bytes
+    raise: PIL.UnidentifiedImageError when data is not an image
+    """
+    image = Image.open(io.BytesIO(data))
+    largest = max(sizes.values())
+    # JPEG can be decoded straight at a smaller scale, which is much faster than decoding full size and resizing.
+    image.draft("RGB", (largest[0] * 2, largest[1] * 2))
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ("RGBA", "LA", "P"):
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel("A"))
+        image = background
+    elif image.mode != "RGB":
+        image = image.convert("RGB")
+
+    variants = {}
+    # Every variant is resized from the previous (bigger) one instead of the original, so the big image is only
+    # resized once.
+    for name, size in sorted(sizes.items(), key=lambda item: item[1], reverse=True):
+        image = image.copy()
+        image.thumbnail(size, Image.LANCZOS)
+        output = io.BytesIO()
+        image.save(output, image_format, quality=quality, optimize=True)
+        variants[name] = output.getvalue()
+    return variants
+
+
+def variant_key(key: str, name: str, image_format: str) -> str:
+    """
+    This function returns storage key of image variant e.g. business_image/shop.png -> business_image/shop.thumb.jpg
+    """
+    extension = {"JPEG": "jpg"}.get(image_format, image_format.lower())
+    return f"{os.path.splitext(key)[0]}.{name}.{extension}"
+
+
+class ImagePipeline:
+    """
+    This is the base class for image pipelines. Views call submit after the profile with uploaded image is saved,
+    pipeline creates the variants of IMAGE_VARIANT_SIZES setting, uploads them through storage and saves their URLs
+    in image_variants field of the profile. Models name the field with URL of the image in image_field attribute.
+
+    Methods:
+        submit: param(instance, key) Create variants of image saved in storage under key for model instance.
+        process: param(model, pk, key, render) Read image, render, upload variants and save their URLs.
+        close: Finish submitted images and release resources.
+    """
+
+    def __init__(self, **kwargs):
+        pass
+
+    def submit(self, instance, key: str) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+    @staticmethod
+    def render_arguments() -> tuple:
+        return settings.IMAGE_VARIANT_SIZES, settings.IMAGE_VARIANT_FORMAT, settings.IMAGE_VARIANT_QUALITY
+
+    def process(self, model, pk, key: str, render) -> dict:
+        """
+        This method creates variants of one image. Variant URLs are only saved while image_field of the profile
+        still has the URL of key, so variants of an older upload which finish late do not replace the newer ones.
+
+        Params:
+        model: model class with image_variants field
+        pk: primary key of the profile
+        key: str - storage key of uploaded image
+        render: callable(data, sizes, image_format, quality) which returns variant name -> bytes
+
+        return: dict of variant name -> URL
+        """
+        storage = get_storage()
+        sizes, image_format, quality = self.render_arguments()
+        rendered = render(storage.read(key), sizes, image_format, quality)
+        content_type = Image.MIME.get(image_format)
+        urls = {
+            name: storage.upload(io.BytesIO(data), variant_key(key, name, image_format), content_type)
+            for name, data in rendered.items()
+        }
+        with transaction.atomic(savepoint=False):
+            # Row is locked, so image can not be replaced between the check and the save.
+            instance = model.objects.select_for_update().filter(pk=pk).first()
+            if instance is not None and getattr(instance, model.image_field) == storage.url(key):
+                instance.image_variants = urls
+                # save (not update) sends post_save, so caches of the profile are invalidated.
+                instance.save(update_fields=["image_variants"])
+        return urls
+
+
+class SynchronousImagePipeline(ImagePipeline):
+    """
+    This class creates the variants on the calling thread. It is useful for management commands and for tests where
+    variants should be saved as soon as submit returns.
+    """
+
+    def submit(self, instance, key: str) -> None:
+        self.process(type(instance), instance.pk, key, render_variants)
+
+
+class ProcessPoolImagePipeline(ImagePipeline):
+    """
+    This class creates the variants off the request thread. Decoding and resizing run in a pool of worker processes,
+    so they use every CPU core and do not hold the GIL of request threads. Reading the image, uploading variants and
+    saving URLs run in a small thread pool, as they mostly wait for storage and database.
+
+    Worker processes are started with "spawn" and only run render_variants, they never touch the database
+    connections of the web process.
+
+    Params:
+        max_workers: int - number of worker processes, default is number of CPU cores.
+        max_threads: int - number of threads which read / upload images.
+    """
+
+    def __init__(self, max_workers: int = None, max_threads: int = 4, **kwargs):
+        super().__init__(**kwargs)
+        self.max_workers = max_workers or os.cpu_count()
+        self.max_threads = max_threads
+        self._processes = None
+        self._threads = None
+        self._lock = threading.Lock()
+
+    def _ensure_pools(self) -> None:
+        if self._threads is not None:
+            return
+        with self._lock:
+            if self._threads is None:
+                self._processes = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                      mp_context=multiprocessing.get_context("spawn"))
+                self._threads = ThreadPoolExecutor(max_workers=self.max_threads, thread_name_prefix="image-pipeline")
+
+    def _render(self, data: bytes, sizes: dict, image_format: str, quality: int) -> dict:
+        return self._processes.submit(render_variants, data, sizes, image_format, quality).result()
+
+    def _run(self, model, pk, key: str) -> None:
+        try:
+            self.process(model, pk, key, self._render)
+        except Exception:
+            logger.exception("Not able to create image variants of %s", key)
+        finally:
+            # Database connection of this thread is not closed by request_finished signal.
+            close_old_connections()
+
+    def submit(self, instance, key: str) -> None:
+        self._ensure_pools()
+        self._threads.submit(self._run, type(instance), instance.pk, key)
+
+    def close(self) -> None:
+        if self._threads is not None:
+            self._threads.shutdown(wait=True)
+            self._processes.shutdown(wait=True)
+
+
+_image_pipeline = None
+_image_pipeline_lock = threading.Lock()
+
+
+def get_image_pipeline() -> ImagePipeline:
+    """
+    This function returns the process wide image pipeline configured with IMAGE_PIPELINE_BACKEND and
+    IMAGE_PIPELINE_OPTIONS settings.
+    """
+    global _image_pipeline
+    if _image_pipeline is None:
+        with _image_pipeline_lock:
+            if _image_pipeline is None:
+                pipeline_class = import_string(settings.IMAGE_PIPELINE_BACKEND)
+                _image_pipeline = pipeline_class(**settings.IMAGE_PIPELINE_OPTIONS)
+                atexit.register(_image_pipeline.close)
+    return _image_pipeline
+
+
+def create_image_variants(instance, key: str) -> None:
+    """
+    This function submits image saved in storage under key to process wide image pipeline. Variant URLs are saved
+    in image_variants field of instance when they are ready.
+    """
+    try:
+        get_image_pipeline().submit(instance, key)
+    except Exception:
+        logger.exception("Not able to submit image %s to image pipeline", key)
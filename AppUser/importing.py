@@ -0,0 +1,219 @@
+import csv
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+
+def read_records(path: str, file_format: str = None):
+    """
+    This function streams records of CSV (header row with field names) or NDJSON (one JSON object per line) file, only
+    the current record is kept in memory. Format is taken from file extension when it is not provided.
+
+    return: generator of (line number, dict of field name -> value)
+    raise: CommandError when format is unknown
+    """
+    file_format = file_format or {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}.get(
+        os.path.splitext(path)[1].lower())
+    if file_format not in ("csv", "ndjson"):
+        raise CommandError(f"Can not detect format of {path}, use --format csv or --format ndjson")
+    with open(path, newline="", encoding="utf-8-sig") as file:
+        if file_format == "csv":
+            reader = csv.DictReader(file)
+            for record in reader:
+                yield reader.line_num, record
+        else:
+            for line_number, line in enumerate(file, start=1):
+                if line.strip():
+                    try:
+                        record = json.loads(line)
+                    except ValueError as e:
+                        record = e
+                    yield line_number, record
+
+
+def _setup_django(settings_module: str) -> None:
+    # Worker processes are spawned, settings (PASSWORD_HASHERS) must be loaded before make_password.
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+    django.setup()
+
+
+def hash_passwords(passwords: list) -> list:
+    """
+    This function hashes passwords with default hasher of PASSWORD_HASHERS setting, None gives unusable password.
+    """
+    return [make_password(password) for password in passwords]
+
+
+class BaseImportCommand(BaseCommand):
+    """
+    This class is the base of import_users and import_businesses commands. Input is read as a stream and written in
+    chunks of chunk_size records with bulk_create, one transaction per chunk. Memory use only depends on chunk size,
+    not on input size.
+
+    The number of consumed records is saved in ImportCheckpoint row in the transaction of every chunk, so it always
+    matches the committed rows and running the same command again continues after the last committed chunk.
+
+    Subclasses implement:
+        build: param(record) Return unsaved model instance of the record, raise ValidationError for invalid record.
+        prepare: param(chunk) Start background work for chunk (e.g. password hashing), return a callable which
+            finishes it and returns the instances to write.
+        write: param(instances) Write instances of one chunk, return (imported, skipped).
+    """
+    noun = "records"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV file with header row, or NDJSON file with one JSON object per line.")
+        parser.add_argument("--format", choices=["csv", "ndjson"], default=None,
+                            help="Input format, default is taken from file extension (.csv, .ndjson, .jsonl).")
+        parser.add_argument("--chunk-size", type=int, default=1000,
+                            help="Number of records written with one bulk_create and transaction.")
+        parser.add_argument("--checkpoint", default=None,
+                            help="Checkpoint name, default is <command>:<absolute path>.")
+        parser.add_argument("--restart", action="store_true",
+                            help="Ignore existing checkpoint and import from the first record.")
+        parser.add_argument("--report-interval", type=float, default=5.0,
+                            help="Seconds between throughput reports.")
+
+    def build(self, record: dict):
+        raise NotImplementedError
+
+    def prepare(self, chunk: list):
+        return lambda: chunk
+
+    def write(self, instances: list) -> tuple:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+    def build_chunk(self, records) -> tuple:
+        """
+        This method builds instances of one chunk of (line number, record), invalid records are reported and counted
+        as skipped.
+
+        return: (list of instances, number of invalid records)
+        """
+        instances = []
+        invalid = 0
+        for line_number, record in records:
+            try:
+                if not isinstance(record, dict):
+                    raise ValidationError(f"not a JSON object ({record})")
+                instances.append(self.build(record))
+            except ValidationError as e:
+                invalid += 1
+                messages = getattr(e, "message_dict", None) or e.messages
+                self.stderr.write(f"line {line_number}: skipped, {messages}")
+        return instances, invalid
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        if not os.path.isfile(path):
+            raise CommandError(f"{path} does not exist")
+        # Imported here, worker processes of PasswordHashingPool import this module before Django is set up.
+        from .models import ImportCheckpoint
+
+        name = options["checkpoint"] or f"{self.__module__.rsplit('.', 1)[-1]}:{os.path.abspath(path)}"
+        if len(name) > ImportCheckpoint._meta.get_field("name").max_length:
+            raise CommandError(f"Checkpoint name {name} is too long, use --checkpoint to set a shorter one")
+        checkpoint, created = ImportCheckpoint.objects.get_or_create(name=name)
+        if options["restart"] and not created:
+            checkpoint.records = checkpoint.imported = checkpoint.skipped = 0
+            checkpoint.finished = False
+            checkpoint.save()
+        elif not created:
+            if checkpoint.finished:
+                self.stdout.write(f"{path} is already imported, use --restart to import it again")
+                return
+            self.stdout.write(f"resuming {path} after {checkpoint.records} records")
+
+        records = itertools.islice(read_records(path, options["format"]), checkpoint.records, None)
+        started = last_report = time.monotonic()
+        processed = 0
+        pending = None
+        try:
+            while True:
+                chunk = list(itertools.islice(records, options["chunk_size"]))
+                # Next chunk is prepared (e.g. passwords are hashed in worker processes) while the previous one is
+                # written, so at most two chunks are in memory.
+                if chunk:
+                    instances, invalid = self.build_chunk(chunk)
+                    next_pending = (len(chunk), invalid, self.prepare(instances))
+                else:
+                    next_pending = None
+                if pending is not None:
+                    consumed, invalid, finish = pending
+                    with transaction.atomic():
+                        imported, skipped = self.write(finish())
+                        checkpoint.records += consumed
+                        checkpoint.imported += imported
+                        checkpoint.skipped += skipped + invalid
+                        checkpoint.save()
+                    processed += consumed
+                    if time.monotonic() - last_report >= options["report_interval"]:
+                        last_report = time.monotonic()
+                        self.report(checkpoint, processed, started)
+                if next_pending is None:
+                    break
+                pending = next_pending
+        finally:
+            self.close()
+
+        checkpoint.finished = True
+        checkpoint.save()
+        self.report(checkpoint, processed, started)
+
+    def report(self, checkpoint, processed: int, started: float) -> None:
+        elapsed = max(time.monotonic() - started, 1e-6)
+        self.stdout.write(
+            f"{checkpoint.records} records read, {checkpoint.imported} {self.noun} imported, {checkpoint.skipped} "
+            f"skipped in {elapsed:.2f}s ({processed / elapsed:.0f} records/s)")
+
+
+class PasswordHashingPool:
+    """
+    This class hashes passwords of a chunk in a pool of worker processes, password hashers are slow on purpose and
+    hold the GIL, so one process can only hash a few hundred passwords per second.
+
+    Worker processes are started with "spawn" like AppUser.images.ProcessPoolImagePipeline, they load Django settings
+    and never touch the database connections of the command.
+
+    Params:
+        max_workers: int - number of worker processes, 1 or less hashes in the command process.
+    """
+
+    def __init__(self, max_workers: int = None):
+        self.max_workers = max_workers or os.cpu_count()
+        self._processes = None
+        if self.max_workers > 1:
+            self._processes = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                  mp_context=multiprocessing.get_context("spawn"),
+                                                  initializer=_setup_django, initargs=(settings.SETTINGS_MODULE,))
+
+    def submit(self, passwords: list):
+        """
+        This method starts hashing passwords.
+
+        return: callable which waits for the hashes and returns them in the order of passwords
+        """
+        if self._processes is None or not passwords:
+            return lambda: hash_passwords(passwords)
+        size = math.ceil(len(passwords) / self.max_workers)
+        futures = [self._processes.submit(hash_passwords, passwords[start:start + size])
+                   for start in range(0, len(passwords), size)]
+        return lambda: [hashed for future in futures for hashed in future.result()]
+
+    def close(self) -> None:
+        if self._processes is not None:
+            self._processes.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from AppUser.models import BusinessProfile
+
+
+class Command(BaseCommand):
+    """
+    This command fills numeric coordinates and geohash of every business profile from its latitude and longitude.
+
+    Run it once after adding geo_latitude, geo_longitude and geohash columns, business profiles saved before that
+    have null geohash and do not show up in nearby search until they are saved again.
+
+    Usage:
+        python manage.py backfill_geo --batch-size 1000
+    """
+    help = "Fill numeric coordinates and geohash of business profiles for nearby search."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000,
+                            help="Number of business profiles processed in one transaction.")
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        processed = invalid = 0
+        last_pk = 0
+        while True:
+            businesses = list(BusinessProfile.objects.filter(pk__gt=last_pk).order_by("pk")[:options["batch_size"]])
+            if not businesses:
+                break
+            for business in businesses:
+                business.update_geo_fields()
+                if business.geohash is None:
+                    invalid += 1
+            with transaction.atomic():
+                BusinessProfile.objects.bulk_update(businesses, ["geo_latitude", "geo_longitude", "geohash"])
+            processed += len(businesses)
+            last_pk = businesses[-1].pk
+
+        elapsed = max(time.monotonic() - started, 1e-6)
+        self.stdout.write(
+            f"filled coordinates of {processed} business profiles ({invalid} with coordinates which could not be "
+            f"parsed) in {elapsed:.2f}s ({processed / elapsed:.0f} profiles/s)")
@@ -0,0 +1,46 @@
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from AppUser.bulk import bulk_create_with_pks
+from AppUser.importing import BaseImportCommand
+from AppUser.models import BusinessOpeningInterval, BusinessProfile, BusinessSearchTrigram
+from AppUser.operating_hours import parse_operating_hours
+from AppUser.response_cache import BUSINESS_PROFILE_CACHE_NAMESPACE, invalidate_list
+
+BUSINESS_FIELDS = ("business_name", "business_profile_image", "address", "business_contact_number", "latitude",
+                   "longitude", "operating_hours")
+
+
+class Command(BaseImportCommand):
+    """
+    This command imports business profiles from CSV or NDJSON file of partner platform. Records have the fields of
+    BUSINESS_FIELDS, other fields are ignored. Operating hours must be in the format of AppUser.operating_hours.
+
+    bulk_create does not call save, so numeric coordinates, geohash and operating schedule are calculated here and
+    "open at" intervals and search trigrams are built in the same transaction as the chunk and its checkpoint, so a
+    stopped import never writes a business profile twice when it is started again.
+
+    Usage:
+        python manage.py import_businesses businesses.ndjson --chunk-size 1000
+    """
+    help = "Import business profiles from CSV / NDJSON file with bulk_create."
+    noun = "business profiles"
+
+    def build(self, record: dict) -> BusinessProfile:
+        business = BusinessProfile(**{field: str(record.get(field) or "").strip() for field in BUSINESS_FIELDS})
+        business.business_profile_image = business.business_profile_image or None
+        business.clean_fields()
+        try:
+            parse_operating_hours(business.operating_hours)
+        except ValueError as e:
+            raise ValidationError({"operating_hours": [str(e)]})
+        business.update_operating_schedule()
+        business.update_geo_fields()
+        return business
+
+    def write(self, instances: list) -> tuple:
+        bulk_create_with_pks(BusinessProfile, instances, batch_size=len(instances) or None)
+        BusinessOpeningInterval.rebuild(instances, replace=False)
+        BusinessSearchTrigram.rebuild(instances, replace=False)
+        transaction.on_commit(lambda: invalidate_list(BUSINESS_PROFILE_CACHE_NAMESPACE))
+        return len(instances), 0
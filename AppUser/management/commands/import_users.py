@@ -0,0 +1,59 @@
+from AppUser.importing import BaseImportCommand, PasswordHashingPool
+from AppUser.models import CustomUser
+
+USER_FIELDS = ("username", "email", "first_name", "last_name")
+
+
+class Command(BaseImportCommand):
+    """
+    This command imports users from CSV or NDJSON file of partner platform. Records have username (mandatory), email,
+    first_name, last_name and password (plain text, missing password gives unusable password) fields, other fields are
+    ignored.
+
+    create_user hashes and inserts one user at a time, this command hashes the passwords of a chunk in worker
+    processes while the previous chunk is written with bulk_create. Users whose username already exists (soft deleted
+    users included) are skipped, so a stopped import can always be started again.
+
+    Usage:
+        python manage.py import_users users.csv --chunk-size 1000 --workers 8
+    """
+    help = "Import users from CSV / NDJSON file with bulk_create and parallel password hashing."
+    noun = "users"
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument("--workers", type=int, default=None,
+                            help="Number of password hashing processes, default is number of CPU cores.")
+
+    def handle(self, *args, **options):
+        self.hashing_pool = PasswordHashingPool(options["workers"])
+        super().handle(*args, **options)
+
+    def close(self) -> None:
+        self.hashing_pool.close()
+
+    def build(self, record: dict) -> CustomUser:
+        user = CustomUser(**{field: (record.get(field) or "").strip() for field in USER_FIELDS})
+        user.password = record.get("password") or None
+        user.clean_fields(exclude=["password"])
+        return user
+
+    def prepare(self, chunk: list):
+        hashed = self.hashing_pool.submit([user.password for user in chunk])
+
+        def finish() -> list:
+            for user, password in zip(chunk, hashed()):
+                user.password = password
+            return chunk
+        return finish
+
+    def write(self, instances: list) -> tuple:
+        usernames = {user.username for user in instances}
+        existing = set(CustomUser.all_objects.filter(username__in=usernames).values_list("username", flat=True))
+        users = []
+        for user in instances:
+            if user.username not in existing:
+                existing.add(user.username)
+                users.append(user)
+        CustomUser.objects.bulk_create(users, batch_size=len(users) or None)
+        return len(users), len(instances) - len(users)
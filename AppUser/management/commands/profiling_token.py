@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from AppUser.profiling import create_profiling_token
+
+
+class Command(BaseCommand):
+    """
+    This command prints signed token for profiling request header, requests with the header are profiled by
+    ProfilingMiddleware when PROFILING_ENABLED setting is True.
+
+    Usage:
+        python manage.py profiling_token
+        curl -H "X-Profile-Token: <token>" https://.../business_profile/add_profile/
+    """
+    help = "Print signed token which makes ProfilingMiddleware profile a request."
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{settings.PROFILING_HEADER}: {create_profiling_token()}")
+        self.stdout.write(f"Token is valid for {settings.PROFILING_TOKEN_MAX_AGE} seconds.")
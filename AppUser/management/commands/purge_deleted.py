@@ -0,0 +1,85 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from AppUser.models import BusinessManager, BusinessProfile, CustomUser, OTPVerification, SMSOTPVerification, \
+    UserProfile, UserType
+
+# Children first, so rows are deleted by their own batch instead of a large cascade from parent row.
+SOFT_DELETE_MODELS = {
+    "business_manager": BusinessManager,
+    "user_profile": UserProfile,
+    "otp_verification": OTPVerification,
+    "sms_otp_verification": SMSOTPVerification,
+    "business_profile": BusinessProfile,
+    "user_type": UserType,
+    "user": CustomUser,
+}
+
+
+class Command(BaseCommand):
+    """
+    This command hard deletes soft deleted rows (is_deleted = True) whose updated_at, the time of soft delete, is
+    older than retention period.
+
+    Tables are processed in primary key ranges of batch_size rows like purge_otps command, every DELETE only touches
+    one range, so locks are held for a short time and command can run next to live traffic. Rows which cascade from a
+    deleted row (e.g. opening intervals of business profile) are deleted with it.
+
+    Usage:
+        python manage.py purge_deleted --table all --batch-size 1000 --retention-days 30 --sleep 0.1
+    """
+    help = "Hard delete soft deleted rows older than retention period in bounded primary key batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--table", choices=["all"] + list(SOFT_DELETE_MODELS), default="all",
+                            help="Table to purge.")
+        parser.add_argument("--batch-size", type=int, default=1000,
+                            help="Number of primary keys processed in one DELETE.")
+        parser.add_argument("--retention-days", type=float, default=30,
+                            help="Rows soft deleted before this many days are deleted.")
+        parser.add_argument("--sleep", type=float, default=0.0,
+                            help="Seconds to sleep between batches.")
+        parser.add_argument("--dry-run", action="store_true",
+                            help="Only count the rows which would be deleted.")
+
+    def handle(self, *args, **options):
+        tables = list(SOFT_DELETE_MODELS) if options["table"] == "all" else [options["table"]]
+        for table in tables:
+            self.purge(SOFT_DELETE_MODELS[table], options)
+
+    def purge(self, model, options):
+        """
+        This method walks the table from smallest to largest primary key and deletes the soft deleted rows older than
+        retention period.
+        """
+        batch_size = options["batch_size"]
+        delete_before = timezone.now() - timedelta(days=options["retention_days"])
+        expired = model.all_objects.dead().filter(updated_at__lt=delete_before)
+
+        bounds = expired.aggregate(min_pk=Min("pk"), max_pk=Max("pk"))
+        if bounds["min_pk"] is None:
+            self.stdout.write(f"{model._meta.db_table}: nothing to purge")
+            return
+
+        started = time.monotonic()
+        deleted = 0
+        for start in range(bounds["min_pk"], bounds["max_pk"] + 1, batch_size):
+            pk_range = expired.filter(pk__gte=start, pk__lt=start + batch_size)
+            if options["dry_run"]:
+                deleted += pk_range.count()
+            else:
+                # Count of the model itself, cascaded rows are not counted.
+                deleted += pk_range.delete()[1].get(model._meta.label, 0)
+            if options["sleep"]:
+                time.sleep(options["sleep"])
+
+        elapsed = max(time.monotonic() - started, 1e-6)
+        scanned = bounds["max_pk"] - bounds["min_pk"] + 1
+        action = "would delete" if options["dry_run"] else "deleted"
+        self.stdout.write(
+            f"{model._meta.db_table}: scanned {scanned} ids, {action} {deleted} rows in {elapsed:.2f}s "
+            f"({deleted / elapsed:.0f} rows/s)")
@@ -0,0 +1,78 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from AppUser.otp import OTP_MODELS
+
+
+class Command(BaseCommand):
+    """
+    This command expires and deletes old rows of OTPVerification and SMSOTPVerification tables.
+
+    Tables are processed in primary key ranges of batch_size rows, every UPDATE and DELETE only touches one range, so
+    locks are held for a short time and command can run next to live traffic. Use --loop to run it continuously.
+
+    Usage:
+        python manage.py purge_otps --batch-size 5000 --retention-days 7 --loop --interval 60
+    """
+    help = "Expire and delete old OTP rows in bounded primary key batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--channel", choices=["all"] + list(OTP_MODELS), default="all",
+                            help="OTP table to purge.")
+        parser.add_argument("--batch-size", type=int, default=5000,
+                            help="Number of primary keys processed in one UPDATE / DELETE.")
+        parser.add_argument("--ttl-seconds", type=int, default=settings.OTP_TTL_SECONDS,
+                            help="OTPs created before this many seconds are marked as expired.")
+        parser.add_argument("--retention-days", type=float, default=7,
+                            help="OTPs created before this many days are deleted.")
+        parser.add_argument("--sleep", type=float, default=0.0,
+                            help="Seconds to sleep between batches.")
+        parser.add_argument("--loop", action="store_true",
+                            help="Keep running and purge again every --interval seconds.")
+        parser.add_argument("--interval", type=float, default=60.0,
+                            help="Seconds to wait between runs with --loop.")
+
+    def handle(self, *args, **options):
+        channels = list(OTP_MODELS) if options["channel"] == "all" else [options["channel"]]
+        while True:
+            for channel in channels:
+                self.purge(OTP_MODELS[channel], options)
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
+
+    def purge(self, model, options):
+        """
+        This method walks the table from smallest to largest primary key, expires the active OTPs older than TTL and
+        deletes the OTPs older than retention period.
+        """
+        batch_size = options["batch_size"]
+        now = timezone.now()
+        expire_before = now - timedelta(seconds=options["ttl_seconds"])
+        delete_before = now - timedelta(days=options["retention_days"])
+
+        bounds = model.all_objects.aggregate(min_pk=Min("pk"), max_pk=Max("pk"))
+        if bounds["min_pk"] is None:
+            self.stdout.write(f"{model._meta.db_table}: nothing to purge")
+            return
+
+        started = time.monotonic()
+        expired = deleted = 0
+        for start in range(bounds["min_pk"], bounds["max_pk"] + 1, batch_size):
+            pk_range = model.all_objects.filter(pk__gte=start, pk__lt=start + batch_size)
+            deleted += pk_range.filter(created_at__lt=delete_before).delete()[0]
+            expired += pk_range.filter(created_at__lt=expire_before, is_expired=False).update(
+                is_expired=True, updated_at=now)
+            if options["sleep"]:
+                time.sleep(options["sleep"])
+
+        elapsed = max(time.monotonic() - started, 1e-6)
+        scanned = bounds["max_pk"] - bounds["min_pk"] + 1
+        self.stdout.write(
+            f"{model._meta.db_table}: scanned {scanned} ids, expired {expired}, deleted {deleted} rows in "
+            f"{elapsed:.2f}s ({(expired + deleted) / elapsed:.0f} rows/s, {scanned / elapsed:.0f} ids/s)")
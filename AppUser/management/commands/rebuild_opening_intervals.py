@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from AppUser.models import BusinessOpeningInterval, BusinessProfile
+
+
+class Command(BaseCommand):
+    """
+    This command parses operating_hours of every business profile again and rebuilds its "open at" intervals.
+
+    Intervals are kept up to date on every write (including bulk create and import), this is a backfill / repair
+    tool: run it once after adding operating_schedule column to fill existing rows, after changing operating hours
+    parsing, or when interval rows were changed outside the application.
+
+    Usage:
+        python manage.py rebuild_opening_intervals --batch-size 1000
+    """
+    help = "Parse operating hours of business profiles and rebuild their opening interval rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000,
+                            help="Number of business profiles processed in one transaction.")
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        processed = unparsed = 0
+        last_pk = 0
+        while True:
+            businesses = list(BusinessProfile.objects.filter(pk__gt=last_pk).order_by("pk")[:options["batch_size"]])
+            if not businesses:
+                break
+            for business in businesses:
+                business.update_operating_schedule()
+                if business.operating_schedule is None:
+                    unparsed += 1
+            with transaction.atomic():
+                BusinessProfile.objects.bulk_update(businesses, ["operating_schedule"])
+                BusinessOpeningInterval.rebuild(businesses)
+            processed += len(businesses)
+            last_pk = businesses[-1].pk
+
+        elapsed = max(time.monotonic() - started, 1e-6)
+        self.stdout.write(
+            f"rebuilt opening intervals of {processed} business profiles ({unparsed} with operating hours which could "
+            f"not be parsed) in {elapsed:.2f}s ({processed / elapsed:.0f} profiles/s)")
@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from AppUser.models import BusinessProfile, BusinessSearchTrigram
+
+
+class Command(BaseCommand):
+    """
+    This command rebuilds search trigrams of every business profile.
+
+    Trigrams are kept up to date on every write (including bulk create and import), this is a backfill / repair
+    tool: run it once after adding business_search_trigram table to index existing rows, after changing
+    AppUser.search tokenizing, or when trigram rows were changed outside the application.
+
+    Usage:
+        python manage.py rebuild_search_index --batch-size 1000
+    """
+    help = "Rebuild search trigram rows of business profiles."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000,
+                            help="Number of business profiles processed in one transaction.")
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        processed = 0
+        last_pk = 0
+        while True:
+            businesses = list(BusinessProfile.objects.filter(pk__gt=last_pk).order_by("pk").only(
+                "pk", "business_name", "address")[:options["batch_size"]])
+            if not businesses:
+                break
+            with transaction.atomic():
+                BusinessSearchTrigram.rebuild(businesses)
+            processed += len(businesses)
+            last_pk = businesses[-1].pk
+
+        elapsed = max(time.monotonic() - started, 1e-6)
+        self.stdout.write(
+            f"rebuilt search index of {processed} business profiles in {elapsed:.2f}s "
+            f"({processed / elapsed:.0f} profiles/s)")
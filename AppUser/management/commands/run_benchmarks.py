@@ -0,0 +1,327 @@
+import itertools
+import json
+import os
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from AppUser.models import BusinessManager, BusinessProfile, CustomUser, UserType
+
+BENCHMARK_PASSWORD = "benchmark-Passw0rd"
+# 1x1 transparent PNG, used as profile image of upload scenarios.
+PNG_IMAGE = bytes.fromhex("89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+                          "1f15c4890000000d49444154789c6360000002000100e221bc330000000049454e44ae426082")
+
+
+class Fixtures:
+    """
+    This class keeps ids of the rows created by seed step, scenarios use them to build request data.
+    """
+
+    def __init__(self, user_ids: list, profile_user_ids: list, business_ids: list, user_type_ids: list):
+        self.user_ids = user_ids
+        self.profile_user_ids = profile_user_ids
+        self.business_ids = business_ids
+        self.user_type_ids = user_type_ids
+        self.sequence = itertools.count()
+
+    def user_id(self, index: int) -> int:
+        return self.user_ids[index % len(self.user_ids)]
+
+    def next_number(self) -> int:
+        # next() of itertools.count is atomic, so threads never get the same number.
+        return next(self.sequence)
+
+
+def signup(client, fixtures, index):
+    number = fixtures.next_number()
+    return client.post("/user/signup/", {"username": f"bench_signup_{number}", "email": f"signup{number}@bench.local",
+                                         "password": BENCHMARK_PASSWORD}, format="json")
+
+
+def login(client, fixtures, index):
+    return client.post("/user/login/", {"username": f"bench_user_{index % len(fixtures.user_ids)}",
+                                        "password": BENCHMARK_PASSWORD}, format="json")
+
+
+def new_email_otp(client, fixtures, index):
+    return client.post("/otp/new_email_otp/", {"user_id": fixtures.user_id(index), "email": "otp@bench.local"},
+                       format="json")
+
+
+def verify_email_otp(client, fixtures, index):
+    return client.post("/otp/verify_email_otp/", {"user_id": fixtures.user_id(index), "otp": "000000"},
+                       format="json")
+
+
+def new_sms_otp(client, fixtures, index):
+    return client.post("/otp/new_sms_otp/", {"user_id": fixtures.user_id(index), "phone_no": "+10000000000"},
+                       format="json")
+
+
+def user_profile_add(client, fixtures, index):
+    number = fixtures.next_number()
+    image = SimpleUploadedFile(f"bench_{number}.png", PNG_IMAGE, content_type="image/png")
+    return client.post("/userprofile/add_profile/", {
+        "user_id": fixtures.profile_user_ids[number % len(fixtures.profile_user_ids)], "first_name": "Bench",
+        "last_name": "User", "address": "Benchmark street", "contact_number": "1234567", "longitude": "74.35",
+        "latitude": "31.52", "profile_image": image}, format="multipart")
+
+
+def user_profile_list(client, fixtures, index):
+    return client.get("/userprofile/")
+
+
+def business_profile_add(client, fixtures, index):
+    number = fixtures.next_number()
+    image = SimpleUploadedFile(f"bench_{number}.png", PNG_IMAGE, content_type="image/png")
+    return client.post("/business_profile/add_profile/", {
+        "business_name": f"Bench {number}", "address": "Benchmark street", "business_contact_number": "1234567",
+        "longitude": "74.35", "latitude": "31.52", "operating_hours": "Mon-Sun 09:00-22:00",
+        "business_profile_image": image}, format="multipart")
+
+
+def business_profile_list(client, fixtures, index):
+    return client.get("/business_profile/")
+
+
+def business_profile_retrieve(client, fixtures, index):
+    return client.get(f"/business_profile/{fixtures.business_ids[index % len(fixtures.business_ids)]}/")
+
+
+def business_profile_nearby(client, fixtures, index):
+    return client.get("/business_profile/nearby/", {"lat": "31.52", "lng": "74.35", "radius": "10"})
+
+
+def business_manager_list(client, fixtures, index):
+    return client.get("/business_manager/", {"expand": "user,business,user_type"})
+
+
+def user_type_list(client, fixtures, index):
+    return client.get("/user_type/")
+
+
+# name -> (request function, response status codes which are counted as success)
+SCENARIOS = {
+    "signup": (signup, {201}),
+    "login": (login, {202}),
+    "new_email_otp": (new_email_otp, {201}),
+    "verify_email_otp": (verify_email_otp, {404}),
+    "new_sms_otp": (new_sms_otp, {202}),
+    "user_profile_add": (user_profile_add, {200}),
+    "user_profile_list": (user_profile_list, {200}),
+    "business_profile_add": (business_profile_add, {200}),
+    "business_profile_list": (business_profile_list, {200}),
+    "business_profile_retrieve": (business_profile_retrieve, {200}),
+    "business_profile_nearby": (business_profile_nearby, {200}),
+    "business_manager_list": (business_manager_list, {200}),
+    "user_type_list": (user_type_list, {200}),
+}
+
+
+def percentile(sorted_values: list, percent: float) -> float:
+    """
+    This function returns nearest rank percentile of already sorted values.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * percent // 100))
+    return sorted_values[int(rank) - 1]
+
+
+class Command(BaseCommand):
+    """
+    This command runs the endpoint benchmark suite. It creates a fresh SQLite database, seeds it with users,
+    profiles and businesses and then sends every scenario --requests times from --concurrency threads through
+    django test client, so no web server is needed and numbers are repeatable on one machine.
+
+    For each scenario p50 / p95 / p99 / max latency, requests per second, error count and average number of SQL
+    queries per request are printed and written in --output JSON file. Pass JSON file of an earlier run as --baseline
+    to print the change of every number.
+
+    Must be run with DishDash.benchmark_settings, which replaces database, email, SMS and S3 with local fakes.
+
+    Usage:
+        DJANGO_SETTINGS_MODULE=DishDash.benchmark_settings python manage.py run_benchmarks --requests 500 \
+            --concurrency 8 --output bench.json --baseline bench_main.json
+    """
+    help = "Benchmark API endpoints against local SQLite database and fake email / SMS / storage backends."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scenario", action="append", choices=list(SCENARIOS),
+                            help="Scenario to run, can be repeated. Default is all scenarios.")
+        parser.add_argument("--requests", type=int, default=200, help="Measured requests per scenario.")
+        parser.add_argument("--concurrency", type=int, default=4, help="Number of threads sending requests.")
+        parser.add_argument("--warmup", type=int, default=10, help="Requests sent before measuring each scenario.")
+        parser.add_argument("--users", type=int, default=1000, help="Number of users created by seed step.")
+        parser.add_argument("--businesses", type=int, default=500, help="Number of businesses created by seed step.")
+        parser.add_argument("--output", help="Path of JSON file to write results in.")
+        parser.add_argument("--baseline", help="Path of JSON file of an earlier run to compare with.")
+
+    def handle(self, *args, **options):
+        if not getattr(settings, "BENCHMARK_SETTINGS", False):
+            raise CommandError("Benchmarks must run with DJANGO_SETTINGS_MODULE=DishDash.benchmark_settings")
+
+        fixtures = self.setup_database(options)
+        results = {}
+        for name in options["scenario"] or list(SCENARIOS):
+            results[name] = self.run_scenario(name, fixtures, options)
+            self.stdout.write(self.format_result(name, results[name]))
+
+        report = {
+            "commit": self.git_commit(),
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "options": {key: options[key] for key in ("requests", "concurrency", "warmup", "users", "businesses")},
+            "results": results,
+        }
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                json.dump(report, output, indent=2, sort_keys=True)
+            self.stdout.write(f"Results are written in {options['output']}")
+        if options["baseline"]:
+            self.compare(options["baseline"], results)
+
+    def setup_database(self, options) -> Fixtures:
+        """
+        This method creates the schema in a new database file and seeds the rows used by scenarios. Password hash is
+        calculated once and shared by all users, so seed step does not take minutes.
+        """
+        database = connection.settings_dict["NAME"]
+        if os.path.exists(database):
+            connections.close_all()
+            os.remove(database)
+        call_command("migrate", run_syncdb=True, verbosity=0)
+        with connection.cursor() as cursor:
+            # Readers do not wait for writers in WAL mode, same as InnoDB.
+            cursor.execute("PRAGMA journal_mode=WAL")
+
+        reserved = options["requests"] + options["warmup"]
+        password = make_password(BENCHMARK_PASSWORD)
+        users = [CustomUser(username=f"bench_user_{index}", email=f"user{index}@bench.local", password=password)
+                 for index in range(options["users"])]
+        profile_users = [CustomUser(username=f"bench_profile_{index}", password=password) for index in range(reserved)]
+        CustomUser.objects.bulk_create(users + profile_users, batch_size=500)
+
+        user_types = [UserType(roll_type=roll_type) for roll_type in ("owner", "manager", "staff")]
+        UserType.objects.bulk_create(user_types)
+
+        businesses = []
+        for index in range(options["businesses"]):
+            business = BusinessProfile(business_name=f"Bench {index}", address="Benchmark street",
+                                       business_contact_number="1234567", operating_hours="Mon-Sun 09:00-22:00",
+                                       latitude=str(31.40 + (index % 50) * 0.005),
+                                       longitude=str(74.20 + (index // 50) * 0.005))
+            business.update_geo_fields()
+            businesses.append(business)
+        BusinessProfile.objects.bulk_create(businesses, batch_size=500)
+
+        user_ids = list(CustomUser.objects.filter(username__startswith="bench_user_").order_by("id")
+                        .values_list("id", flat=True))
+        business_ids = list(BusinessProfile.objects.order_by("id").values_list("id", flat=True))
+        user_type_ids = list(UserType.objects.order_by("id").values_list("id", flat=True))
+        BusinessManager.objects.bulk_create(
+            [BusinessManager(user_id_id=user_id, business_pofile_id_id=business_ids[index % len(business_ids)],
+                             user_type_id_id=user_type_ids[index % len(user_type_ids)], roll_name="Bench")
+             for index, user_id in enumerate(user_ids)], batch_size=500)
+        profile_user_ids = list(CustomUser.objects.filter(username__startswith="bench_profile_").order_by("id")
+                                .values_list("id", flat=True))
+        connections.close_all()
+        return Fixtures(user_ids, profile_user_ids, business_ids, user_type_ids)
+
+    def run_scenario(self, name: str, fixtures: Fixtures, options) -> dict:
+        """
+        This method sends warmup requests and then measured requests of one scenario from a thread pool. Every
+        thread has its own test client and database connection.
+        """
+        request, success_codes = SCENARIOS[name]
+        client = APIClient()
+        for index in range(options["warmup"]):
+            request(client, fixtures, index)
+
+        total = options["requests"]
+        counter = itertools.count()
+        lock = threading.Lock()
+        latencies, queries, errors = [], [], {}
+
+        def worker():
+            thread_client = APIClient()
+            try:
+                while True:
+                    index = next(counter)
+                    if index >= total:
+                        return
+                    with CaptureQueriesContext(connection) as captured:
+                        started = time.perf_counter()
+                        response = request(thread_client, fixtures, index)
+                        elapsed = time.perf_counter() - started
+                    with lock:
+                        latencies.append(elapsed)
+                        queries.append(len(captured))
+                        if response.status_code not in success_codes:
+                            errors[response.status_code] = errors.get(response.status_code, 0) + 1
+            finally:
+                connection.close()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as executor:
+            for future in [executor.submit(worker) for _ in range(options["concurrency"])]:
+                future.result()
+        duration = time.perf_counter() - started
+
+        latencies.sort()
+        return {
+            "requests": total,
+            "concurrency": options["concurrency"],
+            "errors": sum(errors.values()),
+            "error_status_codes": {str(code): count for code, count in sorted(errors.items())},
+            "duration_s": round(duration, 3),
+            "rps": round(total / duration, 2) if duration else 0.0,
+            "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+            "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+            "max_ms": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+            "queries_per_request": round(sum(queries) / len(queries), 2) if queries else 0.0,
+        }
+
+    @staticmethod
+    def format_result(name: str, result: dict) -> str:
+        return (f"{name:<28} p50 {result['p50_ms']:>9.2f}ms  p95 {result['p95_ms']:>9.2f}ms  "
+                f"p99 {result['p99_ms']:>9.2f}ms  {result['rps']:>9.1f} req/s  "
+                f"{result['queries_per_request']:>6.2f} queries/req  {result['errors']} errors")
+
+    def compare(self, baseline_path: str, results: dict) -> None:
+        """
+        This method prints change of latency, throughput and queries of every scenario from baseline run.
+        """
+        with open(baseline_path) as baseline_file:
+            baseline = json.load(baseline_file).get("results", {})
+        self.stdout.write(f"Change from {baseline_path}:")
+        for name, result in results.items():
+            if name not in baseline:
+                self.stdout.write(f"{name:<28} not in baseline")
+                continue
+            changes = []
+            for key in ("p50_ms", "p95_ms", "p99_ms", "rps", "queries_per_request"):
+                before = baseline[name].get(key) or 0
+                change = f"{(result[key] - before) / before * 100:+.1f}%" if before else "n/a"
+                changes.append(f"{key} {change}")
+            self.stdout.write(f"{name:<28} " + "  ".join(changes))
+
+    @staticmethod
+    def git_commit():
+        try:
+            return subprocess.run(["git", "rev-parse", "HEAD"], cwd=settings.BASE_DIR, capture_output=True,
+                                  text=True, timeout=5).stdout.strip() or None
+        except (OSError, subprocess.SubprocessError):
+            return None
@@ -0,0 +1,88 @@
+"""
+Prometheus metrics of the application.
+
+Metrics are kept in process memory and updated without locks shared between requests. When the application runs
+under gunicorn with more than one worker, set PROMETHEUS_MULTIPROC_DIR environment variable to an empty directory
+before workers start; every worker then writes its values in memory mapped files in that directory and /metrics
+adds up the values of all workers. Dead workers must be removed in gunicorn config:
+
+    from AppUser.metrics import mark_worker_dead
+
+    def child_exit(server, worker):
+        mark_worker_dead(worker.pid)
+"""
+
+import os
+import secrets
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, \
+    generate_latest, multiprocess
+
+REQUEST_LATENCY = Histogram(
+    "dishdash_request_duration_seconds", "Time spent handling HTTP request.", ["view", "method", "status"])
+REQUESTS_IN_PROGRESS = Gauge(
+    "dishdash_requests_in_progress", "Number of HTTP requests being handled.", multiprocess_mode="livesum")
+OUTBOUND_LATENCY = Histogram(
+    "dishdash_outbound_duration_seconds", "Time spent in calls to outside services.", ["service", "operation"])
+OUTBOUND_ERRORS = Counter(
+    "dishdash_outbound_errors_total", "Number of failed calls to outside services.", ["service", "operation"])
+RESPONSE_CACHE_REQUESTS = Counter(
+    "dishdash_response_cache_requests_total", "Number of cached responses read, by result hit or miss.",
+    ["namespace", "result"])
+
+
+def is_multiprocess() -> bool:
+    return "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+
+@contextmanager
+def observe_outbound(service: str, operation: str):
+    """
+    This context manager records duration of a call to outside service (e.g. "s3", "upload_fileobj") and counts it
+    as error when the block raises.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        OUTBOUND_ERRORS.labels(service, operation).inc()
+        raise
+    finally:
+        OUTBOUND_LATENCY.labels(service, operation).observe(time.perf_counter() - started)
+
+
+def mark_worker_dead(pid: int) -> None:
+    if is_multiprocess():
+        multiprocess.mark_process_dead(pid)
+
+
+def is_metrics_client(request) -> bool:
+    """
+    This function returns True when request has METRICS_TOKEN setting as bearer token, or comes from one of
+    METRICS_ALLOWED_IPS. REMOTE_ADDR is used and not X-Forwarded-For, which any client can set, so Prometheus should
+    scrape workers directly or use the token.
+    """
+    if settings.METRICS_TOKEN:
+        scheme, _, token = request.META.get("HTTP_AUTHORIZATION", "").partition(" ")
+        if scheme == "Bearer" and secrets.compare_digest(token.encode(), settings.METRICS_TOKEN.encode()):
+            return True
+    return request.META.get("REMOTE_ADDR") in settings.METRICS_ALLOWED_IPS
+
+
+def metrics_view(request) -> HttpResponse:
+    """
+    This view returns all metrics in Prometheus text format, values of all worker processes are added up in
+    multiprocess mode. Metrics show routes, error rates and traffic, so other clients get 403.
+    """
+    if not is_metrics_client(request):
+        return HttpResponseForbidden()
+    if is_multiprocess():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
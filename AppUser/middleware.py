@@ -0,0 +1,249 @@
+import logging
+import os
+import random
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.throttling import BaseThrottle
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from DishDash.db.routers import client_wrote_recently, mark_client_wrote, read_from_replica, reset_replica
+
+from .metrics import REQUEST_LATENCY, REQUESTS_IN_PROGRESS
+from .profiling import RequestProfiler, is_valid_profiling_token
+
+logger = logging.getLogger("AppUser.queries")
+
+
+class QueryRecorder:
+    """
+    This class is a database execute wrapper (see django.db.connection.execute_wrapper) which counts the SQL
+    statements, adds up their time and remembers the slowest one.
+
+    Attributes:
+        count: int - number of executed statements.
+        duration: float - total seconds spent in database.
+        slowest_sql: str - SQL of the slowest statement.
+        slowest_duration: float - seconds spent in the slowest statement.
+        statements: Counter - SQL -> number of executions, used to find duplicate queries.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.slowest_sql = None
+        self.slowest_duration = 0.0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.duration += elapsed
+            self.statements[sql] += 1
+            if elapsed >= self.slowest_duration:
+                self.slowest_sql, self.slowest_duration = sql, elapsed
+
+    @property
+    def duplicates(self) -> int:
+        """
+        Number of statements which were executed again with the same SQL (parameters are not compared).
+        """
+        return sum(count - 1 for count in self.statements.values() if count > 1)
+
+    @contextmanager
+    def record(self):
+        """
+        This method installs recorder on every database connection of current thread while the block runs.
+        """
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(self))
+            yield self
+
+
+def view_action_label(request) -> str:
+    """
+    This function returns "<ViewSet class>.<action>" of the view which handled request, e.g.
+    "PublicUserViewSet.signup", or URL name for views which are not viewsets.
+    """
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unresolved"
+    view_class = getattr(match.func, "cls", None)
+    actions = getattr(match.func, "actions", None) or {}
+    if view_class is None:
+        return match.view_name or match.route
+    action = actions.get(request.method.lower(), request.method.lower())
+    return f"{view_class.__name__}.{action}"
+
+
+class QueryInstrumentationMiddleware:
+    """
+    This middleware records number of SQL queries, total database time and slowest statement of every request.
+
+    When QUERY_INSTRUMENTATION_HEADERS setting is True numbers are added in X-DB-Queries, X-DB-Time-Ms,
+    X-DB-Duplicate-Queries and X-DB-Slowest-Ms response headers. Every request is logged on "AppUser.queries" logger
+    at DEBUG level, and at WARNING level with the slowest SQL when query count or database time is over
+    QUERY_INSTRUMENTATION_WARN_QUERIES / QUERY_INSTRUMENTATION_WARN_DB_MS settings.
+
+    Middleware is only loaded when QUERY_INSTRUMENTATION_ENABLED setting is True.
+    """
+
+    def __init__(self, get_response):
+        if not settings.QUERY_INSTRUMENTATION_ENABLED:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        with recorder.record():
+            response = self.get_response(request)
+
+        label = view_action_label(request)
+        db_time_ms = recorder.duration * 1000
+        if settings.QUERY_INSTRUMENTATION_HEADERS:
+            response["X-DB-Queries"] = str(recorder.count)
+            response["X-DB-Time-Ms"] = f"{db_time_ms:.2f}"
+            response["X-DB-Duplicate-Queries"] = str(recorder.duplicates)
+            response["X-DB-Slowest-Ms"] = f"{recorder.slowest_duration * 1000:.2f}"
+
+        if (recorder.count > settings.QUERY_INSTRUMENTATION_WARN_QUERIES
+                or db_time_ms > settings.QUERY_INSTRUMENTATION_WARN_DB_MS):
+            logger.warning("%s %s [%s] %d queries (%d duplicates) in %.2fms, slowest %.2fms: %s", request.method,
+                           request.path, label, recorder.count, recorder.duplicates, db_time_ms,
+                           recorder.slowest_duration * 1000, recorder.slowest_sql)
+        else:
+            logger.debug("%s %s [%s] %d queries (%d duplicates) in %.2fms", request.method, request.path, label,
+                         recorder.count, recorder.duplicates, db_time_ms)
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    This middleware profiles PROFILING_SAMPLE_RATE fraction of requests, and every request which has a valid signed
+    token (see AppUser.profiling.create_profiling_token or manage.py profiling_token) in PROFILING_HEADER header.
+
+    Profiled request runs under cProfile when PROFILING_MODE setting is "cprofile" and the result is written in a
+    .pstats file, or under a stack sampler when it is "sampler" and the result is written in a .collapsed file for
+    flame graphs. Files are written in PROFILING_OUTPUT_DIR, named by view action, duration and time. Requests with
+    the header get the file name back in X-Profile-File response header.
+
+    Middleware is only loaded when PROFILING_ENABLED setting is True, so it costs nothing when disabled.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.header = "HTTP_" + settings.PROFILING_HEADER.upper().replace("-", "_")
+
+    def __call__(self, request):
+        token = request.META.get(self.header)
+        requested = token is not None and is_valid_profiling_token(token)
+        sampled = settings.PROFILING_SAMPLE_RATE > 0 and random.random() < settings.PROFILING_SAMPLE_RATE
+        if not requested and not sampled:
+            return self.get_response(request)
+
+        profiler = RequestProfiler(settings.PROFILING_MODE)
+        if not profiler.start():
+            return self.get_response(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            path = profiler.stop(view_action_label(request))
+        logger.info("%s %s profile is written in %s", request.method, request.path, path)
+        if requested:
+            response["X-Profile-File"] = os.path.basename(path)
+        return response
+
+
+class MetricsMiddleware:
+    """
+    This middleware records latency of every request in dishdash_request_duration_seconds histogram, labeled with
+    view action, method and status code, and number of requests in progress in dishdash_requests_in_progress gauge.
+    Metrics are served by AppUser.metrics.metrics_view.
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        REQUESTS_IN_PROGRESS.inc()
+        started = time.perf_counter()
+        status = 500
+        try:
+            response = self.get_response(request)
+            status = response.status_code
+            return response
+        finally:
+            REQUEST_LATENCY.labels(view_action_label(request), request.method, status).observe(
+                time.perf_counter() - started)
+            REQUESTS_IN_PROGRESS.dec()
+
+
+def client_id(request) -> str:
+    """
+    This function returns value which identifies the client of request, user id of valid JWT in Authorization header
+    for logged in users (the same for every token of the user) and client IP address for others. Behind load balancers
+    NUM_PROXIES setting of REST_FRAMEWORK must be set, otherwise every client has the IP address of the proxy.
+    """
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    if header is not None:
+        try:
+            raw_token = authentication.get_raw_token(header)
+            if raw_token is not None:
+                return f"user:{authentication.get_validated_token(raw_token)[jwt_settings.USER_ID_CLAIM]}"
+        except (AuthenticationFailed, KeyError):
+            pass
+    return "ip:" + BaseThrottle().get_ident(request)
+
+
+class ReplicaRoutingMiddleware:
+    """
+    This middleware lets ReplicaRouter read from replica databases while a safe action runs. Actions are listed in
+    replica_read_actions attribute of the viewset, e.g. replica_read_actions = ("list", "retrieve").
+
+    After a client makes a successful write request, all its reads go to primary database for REPLICA_STICKY_SECONDS
+    setting, so the client always sees its own writes even if replicas are behind.
+
+    Middleware is only loaded when DATABASE_REPLICAS setting is not empty.
+    """
+    safe_methods = ("GET", "HEAD", "OPTIONS")
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request._replica_token = None
+        try:
+            response = self.get_response(request)
+        finally:
+            if request._replica_token is not None:
+                reset_replica(request._replica_token)
+        if request.method not in self.safe_methods and response.status_code < 400:
+            mark_client_wrote(client_id(request))
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.method not in self.safe_methods:
+            return None
+        view_class = getattr(view_func, "cls", None)
+        action = (getattr(view_func, "actions", None) or {}).get(request.method.lower())
+        if action in getattr(view_class, "replica_read_actions", ()) and not client_wrote_recently(client_id(request)):
+            request._replica_token = read_from_replica(True)
+        return None
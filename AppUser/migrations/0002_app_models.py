@@ -0,0 +1,135 @@
+# Generated by Django 5.0.6 on 2026-10-18 05:27
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # These tables exist on databases created before AppUser had migrations for them. Run
+    # "python manage.py migrate AppUser --fake-initial" there once, which records this migration as applied
+    # without creating the tables again.
+    initial = True
+
+    dependencies = [
+        ('AppUser', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BusinessProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('business_name', models.CharField(max_length=20)),
+                ('business_profile_image', models.CharField(blank=True, max_length=750, null=True)),
+                ('address', models.CharField(max_length=100)),
+                ('business_contact_number', models.CharField(max_length=15)),
+                ('longitude', models.CharField(max_length=30)),
+                ('latitude', models.CharField(max_length=30)),
+                ('operating_hours', models.CharField(max_length=500)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('is_deleted', models.BooleanField(default=False)),
+            ],
+            options={
+                'db_table': 'business_profile',
+            },
+        ),
+        migrations.CreateModel(
+            name='UserType',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('roll_type', models.CharField(max_length=20)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('is_deleted', models.BooleanField(default=False)),
+            ],
+            options={
+                'db_table': 'user_type',
+            },
+        ),
+        migrations.AddField(
+            model_name='customuser',
+            name='access_token',
+            field=models.CharField(blank=True, max_length=500, null=True),
+        ),
+        migrations.AddField(
+            model_name='customuser',
+            name='access_token_expiry',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='customuser',
+            name='refresh_token',
+            field=models.CharField(blank=True, max_length=500, null=True),
+        ),
+        migrations.CreateModel(
+            name='OTPVerification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('is_deleted', models.BooleanField(default=False)),
+                ('otp_str', models.CharField(max_length=6)),
+                ('expired_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('is_expired', models.BooleanField(default=False)),
+                ('user_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='email_otp', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'otp_verification',
+            },
+        ),
+        migrations.CreateModel(
+            name='SMSOTPVerification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('is_deleted', models.BooleanField(default=False)),
+                ('otp_str', models.CharField(max_length=6)),
+                ('expired_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('is_expired', models.BooleanField(default=False)),
+                ('user_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='SMS_otp', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'sms_otp_verification',
+            },
+        ),
+        migrations.CreateModel(
+            name='UserProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('profile_image', models.CharField(blank=True, max_length=750, null=True)),
+                ('first_name', models.CharField(max_length=20)),
+                ('last_name', models.CharField(max_length=20)),
+                ('address', models.CharField(max_length=100)),
+                ('contact_number', models.CharField(max_length=15)),
+                ('longitude', models.CharField(max_length=30)),
+                ('latitude', models.CharField(max_length=30)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('is_deleted', models.BooleanField(default=False)),
+                ('user_id', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='user_profile', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'user_profile',
+            },
+        ),
+        migrations.CreateModel(
+            name='BusinessManager',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('roll_name', models.CharField(max_length=20)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('is_deleted', models.BooleanField(default=False)),
+                ('user_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='user_business_manager_id', to=settings.AUTH_USER_MODEL)),
+                ('business_pofile_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='business_manager_id', to='AppUser.businessprofile')),
+                ('user_type_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='user_business_manager_id', to='AppUser.usertype')),
+            ],
+            options={
+                'db_table': 'business_manager',
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.0.6 on 2026-10-18 05:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('AppUser', '0003_businessprofile_geo_fields'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='otpverification',
+            index=models.Index(fields=['user_id', 'created_at'], name='otp_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='smsotpverification',
+            index=models.Index(fields=['user_id', 'created_at'], name='sms_otp_user_created_idx'),
+        ),
+    ]
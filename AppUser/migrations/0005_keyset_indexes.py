@@ -0,0 +1,42 @@
+# Generated by Django 5.0.6 on 2026-10-18 05:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('AppUser', '0004_otp_indexes'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='businessmanager',
+            index=models.Index(fields=['created_at', 'id'], name='manager_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='businessprofile',
+            index=models.Index(fields=['created_at', 'id'], name='business_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(fields=['created_at', 'id'], name='user_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='otpverification',
+            index=models.Index(fields=['created_at', 'id'], name='otp_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='smsotpverification',
+            index=models.Index(fields=['created_at', 'id'], name='sms_otp_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(fields=['created_at', 'id'], name='user_profile_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='usertype',
+            index=models.Index(fields=['created_at', 'id'], name='user_type_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.0.6 on 2026-10-18 05:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('AppUser', '0005_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='businessprofile',
+            name='operating_schedule',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='BusinessOpeningInterval',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_minute', models.IntegerField()),
+                ('end_minute', models.IntegerField()),
+                ('business', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='opening_intervals', to='AppUser.businessprofile')),
+            ],
+            options={
+                'db_table': 'business_opening_interval',
+                'indexes': [models.Index(fields=['start_minute', 'end_minute'], name='opening_interval_range_idx')],
+            },
+        ),
+    ]
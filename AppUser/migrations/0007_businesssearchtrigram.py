@@ -0,0 +1,27 @@
+# Generated by Django 5.0.6 on 2026-10-18 05:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('AppUser', '0006_businessopeninginterval'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BusinessSearchTrigram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trigram', models.CharField(max_length=3)),
+                ('weight', models.SmallIntegerField()),
+                ('business', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_trigrams', to='AppUser.businessprofile')),
+            ],
+            options={
+                'db_table': 'business_search_trigram',
+                'indexes': [models.Index(fields=['trigram', 'business', 'weight'], name='search_trigram_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,86 @@
+# Generated by Django 5.0.6 on 2026-10-18 06:05
+
+import AppUser.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('AppUser', '0008_image_variants'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='customuser',
+            managers=[
+                ('objects', AppUser.models.SoftDeleteUserManager()),
+                ('all_objects', AppUser.models.AllUserManager()),
+            ],
+        ),
+        migrations.RemoveIndex(
+            model_name='businessmanager',
+            name='manager_created_id_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='businessprofile',
+            name='business_created_id_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='customuser',
+            name='user_created_id_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='otpverification',
+            name='otp_user_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='smsotpverification',
+            name='sms_otp_user_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='userprofile',
+            name='user_profile_created_id_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='usertype',
+            name='user_type_created_id_idx',
+        ),
+        migrations.AddIndex(
+            model_name='businessmanager',
+            index=models.Index(fields=['is_deleted', 'created_at', 'id'], name='manager_live_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='businessmanager',
+            index=models.Index(fields=['user_id', 'is_deleted', 'created_at'], name='manager_user_live_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='businessmanager',
+            index=models.Index(fields=['business_pofile_id', 'is_deleted', 'created_at'], name='manager_business_live_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='businessprofile',
+            index=models.Index(fields=['is_deleted', 'created_at', 'id'], name='business_live_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(fields=['is_deleted', 'created_at', 'id'], name='user_live_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='otpverification',
+            index=models.Index(fields=['user_id', 'is_deleted', 'created_at'], name='otp_user_live_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='smsotpverification',
+            index=models.Index(fields=['user_id', 'is_deleted', 'created_at'], name='sms_otp_user_live_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(fields=['is_deleted', 'created_at', 'id'], name='user_profile_live_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='usertype',
+            index=models.Index(fields=['is_deleted', 'created_at', 'id'], name='user_type_live_created_idx'),
+        ),
+    ]
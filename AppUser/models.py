@@ -1,11 +1,75 @@
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import AbstractUser, UserManager
 from django.db import models
+from django.dispatch import Signal
 from django.utils import timezone
 from rest_framework import serializers
 
+from .geo import encode_geohash, parse_coordinate
+from .operating_hours import parse_operating_hours, schedule_intervals
+from .search import index_rows
+
 
 # Create your models here.
 
+# Sent with pks argument after SoftDeleteQuerySet.soft_delete, UPDATE does not send post_save, so receivers
+# invalidate caches of soft deleted rows here.
+soft_deleted = Signal()
+
+
+class SoftDeleteQuerySet(models.QuerySet):
+    """
+    This class in inherited from models.QuerySet class. Rows are soft deleted by setting is_deleted, updated_at keeps
+    the time of soft delete so purge_deleted command can hard delete them after retention period.
+
+    Methods:
+        alive: Rows which are not soft deleted.
+        dead: Rows which are soft deleted.
+        soft_delete: Soft delete every row of queryset with one UPDATE, return number of rows. soft_deleted signal
+            is sent with primary keys of the rows when the model has receivers.
+    """
+
+    def alive(self):
+        return self.filter(is_deleted=False)
+
+    def dead(self):
+        return self.filter(is_deleted=True)
+
+    def soft_delete(self) -> int:
+        if not soft_deleted.has_listeners(self.model):
+            return self.update(is_deleted=True, updated_at=timezone.now())
+        # Rows are selected first, queryset of default manager does not match them any more after the update.
+        pks = list(self.values_list("pk", flat=True))
+        count = self.model._base_manager.filter(pk__in=pks).update(is_deleted=True, updated_at=timezone.now())
+        soft_deleted.send(sender=self.model, pks=pks)
+        return count
+
+
+class SoftDeleteManager(models.Manager.from_queryset(SoftDeleteQuerySet)):
+    """
+    This class is the default manager (objects) of models with is_deleted field, it hides soft deleted rows so every
+    view, serializer relation and background job only sees live rows. Use all_objects manager of the model to reach
+    soft deleted rows e.g. in purge_deleted command or uniqueness checks.
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().filter(is_deleted=False)
+
+
+class AllUserManager(UserManager.from_queryset(SoftDeleteQuerySet)):
+    """
+    This class is UserManager with methods of SoftDeleteQuerySet, it is all_objects manager of CustomUser.
+    """
+
+
+class SoftDeleteUserManager(AllUserManager):
+    """
+    This class is SoftDeleteManager for CustomUser, it keeps create_user / create_superuser of UserManager. Soft
+    deleted users can not log in, as authentication backends look users up through the default manager.
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().filter(is_deleted=False)
+
 
 class CustomUser(AbstractUser):
     """
@@ -24,8 +88,14 @@ class CustomUser(AbstractUser):
     updated_at = models.DateTimeField(default=timezone.now)
     is_deleted = models.BooleanField(default=False)
 
+    objects = SoftDeleteUserManager()
+    all_objects = AllUserManager()
+
     class Meta:
         db_table = "user"
+        indexes = [
+            models.Index(fields=["is_deleted", "created_at", "id"], name="user_live_created_id_idx"),
+        ]
 
 
 class OTPVerification(models.Model):
@@ -49,8 +119,15 @@ class OTPVerification(models.Model):
     expired_at = models.DateTimeField(default=timezone.now)
     is_expired = models.BooleanField(default=False)
 
+    objects = SoftDeleteManager()
+    all_objects = SoftDeleteQuerySet.as_manager()
+
     class Meta:
         db_table = "otp_verification"
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="otp_created_id_idx"),
+            models.Index(fields=["user_id", "is_deleted", "created_at"], name="otp_user_live_created_idx"),
+        ]
 
 
 class UserProfile(models.Model):
@@ -66,12 +143,14 @@ class UserProfile(models.Model):
             longitude: CharField - longitude - Mandatory field
             latitude: CharField - latitude - Mandatory field
             operating_hours: CharField - operating_hours - Mandatory field
+            image_variants: JSONField - do not need to set, thumb / card / full URLs saved by AppUser.images
             created_at: DateTime field - do not need to set, it has default value
             updated_at: DateTime field - do not need to set, it has default value
             is_deleted: Boolean field - do not need to set, it has default value
     """
     user_id = models.OneToOneField(CustomUser, on_delete=models.CASCADE, related_name="user_profile")
     profile_image = models.CharField(max_length=750, blank=True, null=True)
+    image_variants = models.JSONField(blank=True, null=True)
     first_name = models.CharField(max_length=20, blank=False, null=False)
     last_name = models.CharField(max_length=20, blank=False, null=False)
     address = models.CharField(max_length=100, blank=False, null=False)
@@ -82,8 +161,16 @@ class UserProfile(models.Model):
     updated_at = models.DateTimeField(default=timezone.now)
     is_deleted = models.BooleanField(default=False)
 
+    objects = SoftDeleteManager()
+    all_objects = SoftDeleteQuerySet.as_manager()
+    # Field with URL of the image which image_variants are created from, see AppUser.images.
+    image_field = "profile_image"
+
     class Meta:
         db_table = "user_profile"
+        indexes = [
+            models.Index(fields=["is_deleted", "created_at", "id"], name="user_profile_live_created_idx"),
+        ]
 
 
 class UserType(models.Model):
@@ -102,8 +189,14 @@ class UserType(models.Model):
     updated_at = models.DateTimeField(default=timezone.now)
     is_deleted = models.BooleanField(default=False)
 
+    objects = SoftDeleteManager()
+    all_objects = SoftDeleteQuerySet.as_manager()
+
     class Meta:
         db_table = "user_type"
+        indexes = [
+            models.Index(fields=["is_deleted", "created_at", "id"], name="user_type_live_created_idx"),
+        ]
 
 
 class BusinessProfile(models.Model):
@@ -116,24 +209,182 @@ class BusinessProfile(models.Model):
                business_contact_number: CharField - contact_number - Mandatory field
                longitude: CharField - longitude - Mandatory field
                latitude: CharField - latitude - Mandatory field
-               operating_hours: CharField - operating_hours - Mandatory field
+               operating_hours: CharField - operating_hours - Mandatory field e.g. "Mon-Fri 09:00-22:00; Sun closed"
+               operating_schedule: JSONField - do not need to set, it is parsed from operating_hours on save
+               geo_latitude: FloatField - do not need to set, it is calculated from latitude on save
+               geo_longitude: FloatField - do not need to set, it is calculated from longitude on save
+               geohash: CharField - do not need to set, it is calculated from latitude and longitude on save
+               image_variants: JSONField - do not need to set, thumb / card / full URLs saved by AppUser.images
                created_at: DateTime field - do not need to set, it has default value
                updated_at: DateTime field - do not need to set, it has default value
                is_deleted: Boolean field - do not need to set, it has default value
        """
     business_name = models.CharField(max_length=20, blank=False, null=False)
     business_profile_image = models.CharField(max_length=750, blank=True, null=True)
+    image_variants = models.JSONField(blank=True, null=True)
     address = models.CharField(max_length=100, blank=False, null=False)
     business_contact_number = models.CharField(max_length=15, blank=False, null=False)
     longitude = models.CharField(max_length=30, blank=False, null=False)
     latitude = models.CharField(max_length=30, blank=False, null=False)
     operating_hours = models.CharField(max_length=500, blank=False, null=False)
+    operating_schedule = models.JSONField(blank=True, null=True)
+    geo_latitude = models.FloatField(blank=True, null=True)
+    geo_longitude = models.FloatField(blank=True, null=True)
+    geohash = models.CharField(max_length=12, blank=True, null=True, db_index=True)
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(default=timezone.now)
     is_deleted = models.BooleanField(default=False)
 
+    objects = SoftDeleteManager()
+    all_objects = SoftDeleteQuerySet.as_manager()
+    # Field with URL of the image which image_variants are created from, see AppUser.images.
+    image_field = "business_profile_image"
+
     class Meta:
         db_table = "business_profile"
+        indexes = [
+            models.Index(fields=["is_deleted", "created_at", "id"], name="business_live_created_idx"),
+            models.Index(fields=["geo_latitude", "geo_longitude"], name="business_profile_lat_lng_idx"),
+        ]
+
+    def update_geo_fields(self):
+        """
+        This method converts latitude and longitude saved as string into numeric coordinates and geohash so that
+        nearby search can use the database indexes. Invalid coordinates are saved as null and will not show up in
+        nearby search.
+        """
+        self.geo_latitude = parse_coordinate(self.latitude, 90.0)
+        self.geo_longitude = parse_coordinate(self.longitude, 180.0)
+        if self.geo_latitude is None or self.geo_longitude is None:
+            self.geo_latitude = self.geo_longitude = self.geohash = None
+        else:
+            self.geohash = encode_geohash(self.geo_latitude, self.geo_longitude)
+
+    def update_operating_schedule(self) -> bool:
+        """
+        This method parses operating_hours into weekly schedule (see AppUser.operating_hours). Hours which can not be
+        parsed are saved with null schedule and the business will not show up in open_at filter.
+
+        return: True when schedule has changed, so opening intervals must be rebuilt
+        """
+        previous = self.operating_schedule
+        try:
+            self.operating_schedule = parse_operating_hours(self.operating_hours)
+        except ValueError:
+            self.operating_schedule = None
+        return self.operating_schedule != previous or self.pk is None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_search_text = instance.search_text()
+        return instance
+
+    def search_text(self) -> tuple:
+        return self.business_name, self.address
+
+    def search_text_changed(self) -> bool:
+        """
+        This method returns True when business name or address differ from the values loaded from database, so search
+        trigrams must be rebuilt.
+        """
+        return self.pk is None or self.search_text() != getattr(self, "_loaded_search_text", None)
+
+    def save(self, *args, **kwargs):
+        self.update_geo_fields()
+        # Read by AppUser.signals after save to rebuild "open at" intervals and search trigrams.
+        self.operating_schedule_changed = self.update_operating_schedule()
+        self.search_index_changed = self.search_text_changed()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if {"latitude", "longitude"} & update_fields:
+                update_fields |= {"geo_latitude", "geo_longitude", "geohash"}
+            if "operating_hours" in update_fields:
+                update_fields.add("operating_schedule")
+            kwargs["update_fields"] = update_fields
+        super().save(*args, **kwargs)
+
+
+class BusinessOpeningInterval(models.Model):
+    """
+        This class in inherited from models.Model class. Rows are built from operating_schedule of business profile
+        (see BusinessOpeningInterval.rebuild), one row per opening interval of the week, so "open at" is an indexed
+        range query.
+
+        Fields:
+            business: Foreign Key from BusinessProfile model
+            start_minute: IntegerField - minute of week when business opens, Monday 00:00 is 0
+            end_minute: IntegerField - minute of week when business closes (exclusive), at most 7 * 24 * 60
+    """
+    business = models.ForeignKey(BusinessProfile, on_delete=models.CASCADE, related_name="opening_intervals")
+    start_minute = models.IntegerField()
+    end_minute = models.IntegerField()
+
+    class Meta:
+        db_table = "business_opening_interval"
+        indexes = [
+            models.Index(fields=["start_minute", "end_minute"], name="opening_interval_range_idx"),
+        ]
+
+    @classmethod
+    def rebuild(cls, businesses, replace: bool = True) -> None:
+        """
+        This method replaces the interval rows of businesses with the ones of their current operating_schedule. Pass
+        replace=False for just created businesses, they do not have old rows to delete.
+        """
+        businesses = [business for business in businesses if business.pk is not None]
+        if not businesses:
+            return
+        if replace:
+            cls.objects.filter(business__in=[business.pk for business in businesses]).delete()
+        cls.objects.bulk_create([
+            cls(business_id=business.pk, start_minute=start, end_minute=end)
+            for business in businesses
+            for start, end in schedule_intervals(business.operating_schedule or {})
+        ], batch_size=1000)
+
+
+class BusinessSearchTrigram(models.Model):
+    """
+        This class in inherited from models.Model class. Rows are built from business_name and address of business
+        profile (see AppUser.search.index_rows), one row per distinct trigram, so search reads only the rows of query
+        trigrams through the index instead of scanning every business.
+
+        Fields:
+            business: Foreign Key from BusinessProfile model
+            trigram: CharField - 3 characters of normalized name or address
+            weight: SmallIntegerField - 2 when trigram is in business name, 1 when it is only in address
+    """
+    business = models.ForeignKey(BusinessProfile, on_delete=models.CASCADE, related_name="search_trigrams")
+    trigram = models.CharField(max_length=3)
+    weight = models.SmallIntegerField()
+
+    class Meta:
+        db_table = "business_search_trigram"
+        indexes = [
+            # Covers the search query, business ids and weights of a trigram are read from the index only.
+            models.Index(fields=["trigram", "business", "weight"], name="search_trigram_idx"),
+        ]
+
+    @classmethod
+    def rebuild(cls, businesses, replace: bool = True) -> None:
+        """
+        This method replaces the trigram rows of businesses with the ones of their current name and address. Pass
+        replace=False for just created businesses, they do not have old rows to delete.
+        """
+        businesses = [business for business in businesses if business.pk is not None]
+        if not businesses:
+            return
+        if replace:
+            cls.objects.filter(business__in=[business.pk for business in businesses]).delete()
+        cls.objects.bulk_create([
+            cls(business_id=business.pk, trigram=trigram, weight=weight)
+            for business in businesses
+            for trigram, weight in index_rows(business.business_name, business.address)
+        ], batch_size=1000)
+        for business in businesses:
+            business._loaded_search_text = business.search_text()
 
 
 class BusinessManager(models.Model):
@@ -157,8 +408,16 @@ class BusinessManager(models.Model):
     updated_at = models.DateTimeField(default=timezone.now)
     is_deleted = models.BooleanField(default=False)
 
+    objects = SoftDeleteManager()
+    all_objects = SoftDeleteQuerySet.as_manager()
+
     class Meta:
         db_table = "business_manager"
+        indexes = [
+            models.Index(fields=["is_deleted", "created_at", "id"], name="manager_live_created_idx"),
+            models.Index(fields=["user_id", "is_deleted", "created_at"], name="manager_user_live_idx"),
+            models.Index(fields=["business_pofile_id", "is_deleted", "created_at"], name="manager_business_live_idx"),
+        ]
 
 
 class SMSOTPVerification(models.Model):
@@ -182,5 +441,36 @@ class SMSOTPVerification(models.Model):
     expired_at = models.DateTimeField(default=timezone.now)
     is_expired = models.BooleanField(default=False)
 
+    objects = SoftDeleteManager()
+    all_objects = SoftDeleteQuerySet.as_manager()
+
     class Meta:
         db_table = "sms_otp_verification"
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="sms_otp_created_id_idx"),
+            models.Index(fields=["user_id", "is_deleted", "created_at"], name="sms_otp_user_live_created_idx"),
+        ]
+
+
+class ImportCheckpoint(models.Model):
+    """
+        This class in inherited from models.Model class, import commands (AppUser.importing) keep their progress here.
+        Row is updated in the transaction of every written chunk, so it always matches the committed rows.
+
+        Fields:
+            name: CharField - command name and absolute path of input file - Mandatory field, unique
+            records: PositiveBigIntegerField - number of input records already read
+            imported: PositiveBigIntegerField - number of rows written
+            skipped: PositiveBigIntegerField - number of invalid or existing records
+            finished: Boolean field - True when whole input is imported
+            updated_at: DateTime field - do not need to set, it is set on every save
+    """
+    name = models.CharField(max_length=255, unique=True)
+    records = models.PositiveBigIntegerField(default=0)
+    imported = models.PositiveBigIntegerField(default=0)
+    skipped = models.PositiveBigIntegerField(default=0)
+    finished = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "import_checkpoint"
@@ -0,0 +1,242 @@
+import atexit
+import heapq
+import itertools
+import logging
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils.module_loading import import_string
+
+from .metrics import observe_outbound
+
+logger = logging.getLogger(__name__)
+
+
+def close_connection(connection) -> None:
+    if connection is None:
+        return
+    try:
+        connection.close()
+    except Exception as e:
+        logger.warning("Email connection could not be closed: %s", e)
+
+
+class NotificationQueue:
+    """
+    This is the base class for email notification queues. Views call enqueue method and return the response, the
+    queue implementation decides when and how the email is delivered.
+
+    Methods:
+        enqueue: param(subject, message, recipient_list, from_email) Add the email in the queue.
+        flush: param(timeout) Wait until all queued emails are delivered.
+        close: param(timeout) Deliver queued emails and release resources.
+    """
+
+    def __init__(self, batch_size: int = 50, max_retries: int = 3, retry_backoff: float = 0.5, **kwargs):
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+
+    def enqueue(self, subject: str, message: str, recipient_list: list, from_email: str = None) -> bool:
+        raise NotImplementedError
+
+    def flush(self, timeout: float = None) -> None:
+        pass
+
+    def close(self, timeout: float = None) -> None:
+        self.flush(timeout)
+
+    @staticmethod
+    def build_message(subject: str, message: str, recipient_list: list, from_email: str = None) -> EmailMessage:
+        return EmailMessage(subject, message, from_email or settings.DEFAULT_FROM_EMAIL, list(recipient_list))
+
+    def send(self, email_message: EmailMessage, connection=None) -> tuple:
+        """
+        This method makes one attempt to send the message. Connection is closed when sending fails, as failure usually
+        means SMTP server dropped it.
+
+        Params:
+        email_message: EmailMessage object
+        connection: already opened email backend connection, if None a new connection is opened.
+
+        return: (connection which can be used for next message or None, exception or None when message was sent)
+        """
+        try:
+            with observe_outbound("smtp", "send_mail"):
+                if connection is None:
+                    connection = get_connection(fail_silently=False)
+                    connection.open()
+                connection.send_messages([email_message])
+            return connection, None
+        except Exception as e:
+            close_connection(connection)
+            return None, e
+
+    def retry_delay(self, email_message: EmailMessage, attempt: int, error: Exception):
+        """
+        This method logs failed attempt of the message.
+
+        return: seconds to wait before next attempt (exponential backoff), or None when the message has used all
+        max_retries and is dropped.
+        """
+        if attempt < self.max_retries:
+            logger.warning("Email to %s failed (attempt %d): %s", email_message.to, attempt + 1, error)
+            return self.retry_backoff * (2 ** attempt)
+        logger.error("Email to %s dropped after %d attempts: %s", email_message.to, attempt + 1, error)
+        return None
+
+
+class SynchronousNotificationQueue(NotificationQueue):
+    """
+    This class delivers the email on the calling thread. It is useful for management commands and for tests where
+    email should be in outbox as soon as enqueue returns.
+    """
+
+    def enqueue(self, subject: str, message: str, recipient_list: list, from_email: str = None) -> bool:
+        email_message = self.build_message(subject, message, recipient_list, from_email)
+        connection = None
+        for attempt in itertools.count():
+            connection, error = self.send(email_message, connection)
+            if error is None:
+                break
+            delay = self.retry_delay(email_message, attempt, error)
+            if delay is None:
+                break
+            time.sleep(delay)
+        close_connection(connection)
+        return True
+
+
+class ThreadedNotificationQueue(NotificationQueue):
+    """
+    This class delivers the emails from a background thread, so request thread only pays for putting the message in
+    the queue.
+
+    Worker thread takes up to batch_size messages at a time and sends them over one SMTP connection. Connection is
+    kept open while there are messages in the queue and is closed after idle_timeout seconds without messages.
+
+    A failed message is put aside until its retry time (exponential backoff) and the worker goes on with the next
+    messages, so one failing recipient does not hold back OTP emails of other users.
+
+    Params:
+        max_queue_size: int - enqueue returns False when this many messages are waiting.
+        idle_timeout: float - seconds to keep SMTP connection open without any message.
+    """
+
+    def __init__(self, max_queue_size: int = 10000, idle_timeout: float = 5.0, **kwargs):
+        super().__init__(**kwargs)
+        self.idle_timeout = idle_timeout
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._lock = threading.Lock()
+        self._worker = None
+        # Heap of (retry time, sequence, attempt, message), only used by the worker thread.
+        self._retries = []
+        self._sequence = itertools.count()
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="notification-queue", daemon=True)
+                self._worker.start()
+
+    def enqueue(self, subject: str, message: str, recipient_list: list, from_email: str = None) -> bool:
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(self.build_message(subject, message, recipient_list, from_email))
+        except queue.Full:
+            return False
+        return True
+
+    def _next_batch(self, timeout: float = None) -> list:
+        """
+        This method returns up to batch_size (attempt, message) pairs, retries which are due first. It waits for
+        timeout seconds for a new message only when no retry is due.
+        """
+        batch = []
+        now = time.monotonic()
+        while self._retries and self._retries[0][0] <= now and len(batch) < self.batch_size:
+            _, _, attempt, email_message = heapq.heappop(self._retries)
+            batch.append((attempt, email_message))
+        while len(batch) < self.batch_size:
+            try:
+                email_message = self._queue.get_nowait() if batch else self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            batch.append((0, email_message))
+        return batch
+
+    def _run(self):
+        connection = None
+        idle_since = time.monotonic()
+        while True:
+            now = time.monotonic()
+            deadlines = [retry_at for retry_at, _, _, _ in self._retries[:1]]
+            if connection is not None:
+                deadlines.append(idle_since + self.idle_timeout)
+            batch = self._next_batch(max(min(deadlines) - now, 0) if deadlines else None)
+            if not batch:
+                if connection is not None and time.monotonic() - idle_since >= self.idle_timeout:
+                    # Queue is idle, so we release the SMTP connection until next message arrives.
+                    close_connection(connection)
+                    connection = None
+                continue
+
+            for attempt, email_message in batch:
+                try:
+                    connection, error = self.send(email_message, connection)
+                    delay = None if error is None else self.retry_delay(email_message, attempt, error)
+                except Exception:
+                    logger.exception("Unexpected error while sending email to %s", email_message.to)
+                    close_connection(connection)
+                    connection, delay = None, None
+                if delay is None:
+                    self._queue.task_done()
+                else:
+                    heapq.heappush(self._retries,
+                                   (time.monotonic() + delay, next(self._sequence), attempt + 1, email_message))
+            idle_since = time.monotonic()
+
+    def flush(self, timeout: float = None) -> None:
+        """
+        This method waits until every queued message is sent or dropped, messages waiting for a retry are included. If
+        timeout is provided we stop waiting after timeout seconds.
+        """
+        if timeout is None:
+            self._queue.join()
+            return
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+
+_notification_queue = None
+_notification_queue_lock = threading.Lock()
+
+
+def get_notification_queue() -> NotificationQueue:
+    """
+    This function returns the process wide notification queue configured with NOTIFICATION_QUEUE_BACKEND and
+    NOTIFICATION_QUEUE_OPTIONS settings.
+    """
+    global _notification_queue
+    if _notification_queue is None:
+        with _notification_queue_lock:
+            if _notification_queue is None:
+                queue_class = import_string(settings.NOTIFICATION_QUEUE_BACKEND)
+                _notification_queue = queue_class(**settings.NOTIFICATION_QUEUE_OPTIONS)
+                atexit.register(_notification_queue.close, settings.NOTIFICATION_QUEUE_SHUTDOWN_TIMEOUT)
+    return _notification_queue
+
+
+def enqueue_email(subject: str, message: str, recipient_list: list, from_email: str = None) -> bool:
+    """
+    This function adds the email in process wide notification queue.
+
+    return: True if email is queued, False if queue is full.
+    """
+    return get_notification_queue().enqueue(subject, message, recipient_list, from_email)
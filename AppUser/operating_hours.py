@@ -0,0 +1,126 @@
+import re
+from datetime import datetime
+
+DAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+_DAY_NAMES = {
+    "mon": 0, "monday": 0, "tue": 1, "tues": 1, "tuesday": 1, "wed": 2, "wednesday": 2, "thu": 3, "thur": 3,
+    "thurs": 3, "thursday": 3, "fri": 4, "friday": 4, "sat": 5, "saturday": 5, "sun": 6, "sunday": 6,
+}
+_ALL_DAYS_NAMES = {"daily", "everyday", "all", "week", "weekdays", "weekends"}
+_CLOSED_NAMES = {"closed", "off", "close"}
+_ALL_DAY_NAMES = {"24h", "24hrs", "24hours", "24/7", "allday", "open24hours"}
+_TIME = r"(\d{1,2})(?::(\d{2}))?\s*(am|pm)?"
+_RANGE_RE = re.compile(rf"^{_TIME}\s*(?:-|to|–)\s*{_TIME}$", re.IGNORECASE)
+_CLAUSE_RE = re.compile(
+    r"^\s*(?P<days>[a-z][a-z ,\-–]*?)\s*:?\s+(?P<hours>(?:\d|closed|close|off|open|all).*?)\s*$", re.IGNORECASE)
+
+
+def _parse_minute(hour: str, minute: str, meridiem: str) -> int:
+    hour, minute = int(hour), int(minute or 0)
+    if meridiem:
+        if not 1 <= hour <= 12:
+            raise ValueError(f"Invalid hour {hour}{meridiem}")
+        hour = hour % 12 + (12 if meridiem.lower() == "pm" else 0)
+    if minute > 59 or hour > 24 or (hour == 24 and minute):
+        raise ValueError(f"Invalid time {hour}:{minute:02d}")
+    return hour * 60 + minute
+
+
+def _format_minute(minute: int) -> str:
+    return f"{minute // 60:02d}:{minute % 60:02d}"
+
+
+def _parse_days(text: str) -> list:
+    text = re.sub(r"\s*[-–]\s*", "-", text.strip().lower())
+    if text in _ALL_DAYS_NAMES:
+        return {"weekdays": [0, 1, 2, 3, 4], "weekends": [5, 6]}.get(text, list(range(7)))
+    days = []
+    for part in re.split(r"[,\s]+", text):
+        bounds = part.split("-")
+        if len(bounds) > 2 or any(bound not in _DAY_NAMES for bound in bounds):
+            raise ValueError(f"Unknown day {part!r}")
+        start, end = _DAY_NAMES[bounds[0]], _DAY_NAMES[bounds[-1]]
+        # Ranges may wrap around the week e.g. Fri-Mon.
+        days.extend((start + offset) % 7 for offset in range((end - start) % 7 + 1))
+    return days
+
+
+def _parse_hours(text: str) -> list:
+    compact = re.sub(r"\s+", "", text.lower())
+    if compact in _CLOSED_NAMES:
+        return []
+    if compact in _ALL_DAY_NAMES:
+        return [["00:00", "24:00"]]
+    ranges = []
+    for part in re.split(r"\s*(?:,|&|\band\b)\s*", text.strip()):
+        match = _RANGE_RE.match(part.strip())
+        if not match:
+            raise ValueError(f"Invalid hours {part!r}, expected e.g. 09:00-22:00")
+        start = _parse_minute(*match.group(1, 2, 3))
+        end = _parse_minute(*match.group(4, 5, 6))
+        if start == end or start == MINUTES_PER_DAY:
+            raise ValueError(f"Invalid hours {part!r}")
+        ranges.append([_format_minute(start), _format_minute(end)])
+    return ranges
+
+
+def parse_operating_hours(text: str) -> dict:
+    """
+    This function parses operating hours written by business into weekly schedule.
+
+    Clauses are separated by ";" or new line, each clause is days and hours e.g.
+        "Mon-Fri 09:00-22:00; Sat 10am-11pm, 18:00-02:00; Sun closed", "Daily 24h"
+    Hours ending before they start close on the next day. Days which are not written are closed and a later clause
+    replaces the hours of days written in earlier clause.
+
+    return: dict of day ("mon" ... "sun") -> list of ["HH:MM", "HH:MM"] ranges
+    raise: ValueError when text can not be parsed
+    """
+    if not text or not text.strip():
+        raise ValueError("Operating hours are empty")
+    schedule = {day: [] for day in DAYS}
+    for clause in re.split(r"[;\n]+", text):
+        if not clause.strip():
+            continue
+        match = _CLAUSE_RE.match(clause)
+        if not match:
+            raise ValueError(f"Invalid clause {clause.strip()!r}, expected e.g. Mon-Fri 09:00-22:00")
+        hours = _parse_hours(match.group("hours"))
+        for day in _parse_days(match.group("days")):
+            schedule[DAYS[day]] = hours
+    return schedule
+
+
+def schedule_intervals(schedule: dict) -> list:
+    """
+    This function converts weekly schedule into sorted, non overlapping [start, end) minute of week intervals, where
+    minute 0 is Monday 00:00. Ranges which pass Sunday midnight are split at the end of the week.
+
+    return: list of (start_minute, end_minute) tuples
+    """
+    intervals = []
+    for day_index, day in enumerate(DAYS):
+        for opens, closes in schedule.get(day) or []:
+            start = day_index * MINUTES_PER_DAY + _parse_minute(*opens.split(":"), None)
+            end = day_index * MINUTES_PER_DAY + _parse_minute(*closes.split(":"), None)
+            if end <= start:
+                end += MINUTES_PER_DAY
+            if end > MINUTES_PER_WEEK:
+                intervals.append((0, end - MINUTES_PER_WEEK))
+                end = MINUTES_PER_WEEK
+            intervals.append((start, end))
+
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def minute_of_week(moment: datetime) -> int:
+    return moment.weekday() * MINUTES_PER_DAY + moment.hour * 60 + moment.minute
@@ -0,0 +1,174 @@
+import secrets
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import OTPVerification, SMSOTPVerification
+
+EMAIL_CHANNEL = "email"
+SMS_CHANNEL = "sms"
+
+OTP_MATCHED = "matched"
+OTP_MISMATCH = "mismatch"
+OTP_NOT_FOUND = "not_found"
+
+OTP_MODELS = {
+    EMAIL_CHANNEL: OTPVerification,
+    SMS_CHANNEL: SMSOTPVerification,
+}
+
+
+def otp_matches(otp, expected_otp: str) -> bool:
+    """
+    This function compares the OTP in constant time.
+    """
+    return secrets.compare_digest(str(otp).encode(), expected_otp.encode())
+
+
+def generate_otp() -> str:
+    """
+    This function generates the 6 digit OTP.
+    """
+    return str(100000 + secrets.randbelow(900000))
+
+
+class OTPBackend:
+    """
+    This is the base class for OTP stores. Each user has at most one active OTP per channel (email or sms), issuing
+    a new OTP replaces the previous one.
+
+    Methods:
+        issue: param(channel, user_id) Create new OTP for user and return it.
+        verify: param(channel, user_id, otp) Compare OTP and consume it if it matches. Returns OTP_MATCHED,
+        OTP_MISMATCH or OTP_NOT_FOUND.
+
+    Params:
+        ttl: int - seconds for which OTP is valid.
+        audit: bool - if True every issued OTP is also saved in OTPVerification / SMSOTPVerification table.
+    """
+
+    def __init__(self, ttl: int = None, audit: bool = None, **kwargs):
+        self.ttl = ttl if ttl is not None else settings.OTP_TTL_SECONDS
+        self.audit = audit if audit is not None else settings.OTP_AUDIT_TO_DB
+
+    def issue(self, channel: str, user_id) -> str:
+        raise NotImplementedError
+
+    def verify(self, channel: str, user_id, otp: str) -> str:
+        raise NotImplementedError
+
+    def audit_issue(self, channel: str, user_id, otp: str) -> None:
+        if self.audit:
+            now = timezone.now()
+            OTP_MODELS[channel].objects.filter(user_id=user_id, is_expired=False).update(is_expired=True,
+                                                                                          updated_at=now)
+            OTP_MODELS[channel].objects.create(user_id_id=user_id, otp_str=otp, created_at=now, updated_at=now,
+                                               expired_at=now + timedelta(seconds=self.ttl))
+
+    def audit_consume(self, channel: str, user_id, otp: str) -> None:
+        if self.audit:
+            OTP_MODELS[channel].objects.filter(user_id=user_id, otp_str=otp, is_expired=False).update(
+                is_expired=True, updated_at=timezone.now())
+
+
+class CacheOTPBackend(OTPBackend):
+    """
+    This class keeps the active OTP in Django cache with TTL, so issuing and verifying OTP does not touch the
+    database and nothing has to be cleaned up. Cache must be shared by all workers (e.g. Redis), an OTP in local
+    memory cache is only seen by the worker which issued it, so system check AppUser.E001 rejects that setup.
+
+    OTP is consumed by deleting its cache key, cache delete is atomic so when two requests verify the same OTP
+    concurrently only one of them gets OTP_MATCHED.
+
+    Params:
+        cache_alias: str - alias from CACHES setting, default is OTP_CACHE setting.
+        max_attempts: int - OTP is discarded after this many wrong attempts.
+    """
+    key_prefix = "otp:"
+
+    def __init__(self, cache_alias: str = None, max_attempts: int = None, **kwargs):
+        super().__init__(**kwargs)
+        self.cache_alias = cache_alias or settings.OTP_CACHE
+        self.max_attempts = max_attempts if max_attempts is not None else settings.OTP_MAX_ATTEMPTS
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def _key(self, channel: str, user_id) -> str:
+        return f"{self.key_prefix}{channel}:{user_id}"
+
+    def issue(self, channel: str, user_id) -> str:
+        otp = generate_otp()
+        key = self._key(channel, user_id)
+        self.cache.set_many({key: otp, key + ":attempts": 0}, self.ttl)
+        self.audit_issue(channel, user_id, otp)
+        return otp
+
+    def verify(self, channel: str, user_id, otp: str) -> str:
+        key = self._key(channel, user_id)
+        active_otp = self.cache.get(key)
+        if active_otp is None:
+            return OTP_NOT_FOUND
+        if not otp_matches(otp, active_otp):
+            try:
+                attempts = self.cache.incr(key + ":attempts")
+            except ValueError:
+                attempts = self.max_attempts
+            if attempts >= self.max_attempts:
+                self.cache.delete_many([key, key + ":attempts"])
+            return OTP_MISMATCH
+        # Only the request which deletes the key consumes the OTP.
+        if not self.cache.delete(key):
+            return OTP_NOT_FOUND
+        self.cache.delete(key + ":attempts")
+        self.audit_consume(channel, user_id, otp)
+        return OTP_MATCHED
+
+
+class DatabaseOTPBackend(OTPBackend):
+    """
+    This class keeps the OTP in OTPVerification / SMSOTPVerification table. Previous active OTP is expired when new
+    one is issued and OTP is consumed with conditional update, so it can be used only once.
+    """
+
+    def issue(self, channel: str, user_id) -> str:
+        model = OTP_MODELS[channel]
+        now = timezone.now()
+        model.objects.filter(user_id=user_id, is_expired=False).update(is_expired=True, updated_at=now)
+        otp = generate_otp()
+        model.objects.create(user_id_id=user_id, otp_str=otp, created_at=now, updated_at=now,
+                             expired_at=now + timedelta(seconds=self.ttl))
+        return otp
+
+    def verify(self, channel: str, user_id, otp: str) -> str:
+        model = OTP_MODELS[channel]
+        now = timezone.now()
+        ot_data = model.objects.filter(user_id=user_id).order_by("created_at", "id").last()
+        if ot_data is None or ot_data.is_expired or ot_data.expired_at <= now:
+            return OTP_NOT_FOUND
+        if not otp_matches(otp, ot_data.otp_str):
+            return OTP_MISMATCH
+        if not model.objects.filter(pk=ot_data.pk, is_expired=False).update(is_expired=True, updated_at=now):
+            return OTP_NOT_FOUND
+        return OTP_MATCHED
+
+
+_otp_backend = None
+_otp_backend_lock = threading.Lock()
+
+
+def get_otp_backend() -> OTPBackend:
+    """
+    This function returns the process wide OTP backend configured with OTP_BACKEND setting.
+    """
+    global _otp_backend
+    if _otp_backend is None:
+        with _otp_backend_lock:
+            if _otp_backend is None:
+                _otp_backend = import_string(settings.OTP_BACKEND)()
+    return _otp_backend
@@ -0,0 +1,90 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import namedtuple
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+KeysetCursor = namedtuple("KeysetCursor", ["created_at", "id", "reverse"])
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    This class in inherited from CursorPagination class. Rows are ordered by (created_at, id), newest first, and
+    cursor keeps created_at and id of the last row of the page. Next page is read with
+    "WHERE (created_at, id) < (cursor)" instead of OFFSET, so with (created_at, id) index every page costs the same.
+
+    Query params:
+        cursor: opaque cursor from next / previous link
+        page_size: number of rows in page, limited to PAGINATION_MAX_PAGE_SIZE setting
+    """
+    page_size_query_param = "page_size"
+    ordering = ("-created_at", "-id")
+    invalid_cursor_message = "Invalid cursor"
+
+    def __init__(self):
+        self.max_page_size = settings.PAGINATION_MAX_PAGE_SIZE
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        cursor = self.decode_cursor(request)
+        reverse = cursor is not None and cursor.reverse
+        if reverse:
+            queryset = queryset.order_by("created_at", "id").filter(
+                Q(created_at__gte=cursor.created_at), Q(created_at__gt=cursor.created_at) | Q(id__gt=cursor.id))
+        else:
+            queryset = queryset.order_by("-created_at", "-id")
+            if cursor is not None:
+                queryset = queryset.filter(Q(created_at__lte=cursor.created_at),
+                                           Q(created_at__lt=cursor.created_at) | Q(id__lt=cursor.id))
+
+        # Reading one extra row tells us if there is another page in this direction.
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        last = self.page[-1]
+        return self.encode_cursor(KeysetCursor(last.created_at, last.pk, False))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        first = self.page[0]
+        return self.encode_cursor(KeysetCursor(first.created_at, first.pk, True))
+
+    def encode_cursor(self, cursor):
+        raw = f"{int(cursor.reverse)}|{cursor.created_at.isoformat()}|{cursor.id}"
+        encoded = urlsafe_b64encode(raw.encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            reverse, created_at, pk = urlsafe_b64decode(encoded.encode()).decode().split("|")
+            created_at = parse_datetime(created_at)
+            if created_at is None:
+                raise ValueError(encoded)
+            return KeysetCursor(created_at, int(pk), bool(int(reverse)))
+        except (TypeError, ValueError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
@@ -0,0 +1,131 @@
+import cProfile
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from django.conf import settings
+from django.core import signing
+
+PROFILING_TOKEN_SALT = "AppUser.profiling"
+
+
+def create_profiling_token() -> str:
+    """
+    This function returns signed value for profiling request header (PROFILING_HEADER setting). Value is only valid
+    for PROFILING_TOKEN_MAX_AGE seconds and only with SECRET_KEY of this deployment.
+    """
+    return signing.dumps("profile", salt=PROFILING_TOKEN_SALT)
+
+
+def is_valid_profiling_token(token: str) -> bool:
+    try:
+        return signing.loads(token, salt=PROFILING_TOKEN_SALT,
+                             max_age=settings.PROFILING_TOKEN_MAX_AGE) == "profile"
+    except signing.BadSignature:
+        return False
+
+
+class StackSampler:
+    """
+    This class samples call stack of one thread every interval seconds from a background thread, so profiled code
+    runs at full speed between samples. Samples are returned in collapsed stack format ("outer;inner count" per line)
+    which is read by flamegraph.pl and speedscope.
+
+    Methods:
+        start: Start sampling current thread.
+        stop: Stop sampling.
+        collapsed: Return samples in collapsed stack format.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.samples = Counter()
+        self._thread_id = None
+        self._stopped = threading.Event()
+        self._sampler = None
+
+    def start(self) -> None:
+        self._thread_id = threading.get_ident()
+        self._sampler = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._sampler.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._sampler.join()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+def profile_file_path(label: str, extension: str) -> str:
+    """
+    This function returns path of new profile file in PROFILING_OUTPUT_DIR setting, named after view and time e.g.
+    BusinessProfileViewSet.add_profile-20240101T120000.123456.pstats
+    """
+    os.makedirs(settings.PROFILING_OUTPUT_DIR, exist_ok=True)
+    name = re.sub(r"[^A-Za-z0-9_.-]", "_", label)
+    timestamp = datetime.now().strftime("%Y%m%dT%H%M%S.%f")
+    return os.path.join(settings.PROFILING_OUTPUT_DIR, f"{name}-{timestamp}.{extension}")
+
+
+class RequestProfiler:
+    """
+    This class runs one request under cProfile (mode "cprofile") or StackSampler (mode "sampler") and writes the
+    result in pstats or collapsed stack file.
+    """
+
+    def __init__(self, mode: str):
+        self.mode = mode
+        self._profiler = None
+        self.started = None
+
+    def start(self) -> bool:
+        """
+        return: False when profiler could not start, e.g. another profiler is already active in this thread.
+        """
+        self.started = time.perf_counter()
+        if self.mode == "sampler":
+            self._profiler = StackSampler(settings.PROFILING_SAMPLER_INTERVAL)
+            self._profiler.start()
+            return True
+        self._profiler = cProfile.Profile()
+        try:
+            self._profiler.enable()
+        except ValueError:
+            self._profiler = None
+            return False
+        return True
+
+    def stop(self, label: str) -> str:
+        """
+        This method stops the profiler and writes its result.
+
+        return: path of written file
+        """
+        elapsed_ms = (time.perf_counter() - self.started) * 1000
+        label = f"{label}-{elapsed_ms:.0f}ms"
+        if self.mode == "sampler":
+            self._profiler.stop()
+            path = profile_file_path(label, "collapsed")
+            with open(path, "w") as output:
+                output.write(self._profiler.collapsed())
+            return path
+        self._profiler.disable()
+        path = profile_file_path(label, "pstats")
+        self._profiler.dump_stats(path)
+        return path
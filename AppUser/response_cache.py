@@ -0,0 +1,99 @@
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.response import Response
+
+from DishDash.db.routers import is_reading_from_replica
+
+from .metrics import RESPONSE_CACHE_REQUESTS
+
+BUSINESS_PROFILE_CACHE_NAMESPACE = "business_profile"
+
+
+def get_response_cache():
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def _new_version() -> str:
+    return uuid.uuid4().hex
+
+
+def _version(cache, key: str) -> str:
+    """
+    This function returns version token of key, a new token is added when there is none. Tokens are random, so a
+    version key which expired or was evicted never gets an old value back and old responses stay unreachable.
+    """
+    version = cache.get(key)
+    if version is None:
+        version = _new_version()
+        # Another worker may add the token first, then its token is used.
+        cache.add(key, version, settings.RESPONSE_CACHE_VERSION_TIMEOUT)
+        version = cache.get(key) or version
+    return version
+
+
+def _bump(cache, key: str) -> None:
+    cache.set(key, _new_version(), settings.RESPONSE_CACHE_VERSION_TIMEOUT)
+
+
+def invalidate_object(namespace: str, pk) -> None:
+    """
+    This function invalidates cached object and every cached list page of namespace. Version tokens are replaced
+    instead of deleting the keys, so a response which was read before the write and is saved after it is never served.
+    """
+    cache = get_response_cache()
+    _bump(cache, f"{namespace}:object_version:{pk}")
+    _bump(cache, f"{namespace}:list_version")
+
+
+def invalidate_list(namespace: str) -> None:
+    """
+    This function invalidates every cached list page of namespace.
+    """
+    _bump(get_response_cache(), f"{namespace}:list_version")
+
+
+class ReadThroughCacheMixin:
+    """
+    This mixin caches the serialized data of retrieve and list responses of a ModelViewSet. Response is saved in the
+    cache on first read and served from cache until invalidate_object / invalidate_list is called for namespace.
+
+    Attributes:
+        cache_namespace: str - prefix of cache keys, also used to invalidate the cache.
+        cache_timeout: int - seconds to keep the response, default is RESPONSE_CACHE_TIMEOUT setting.
+    """
+    cache_namespace = None
+    cache_timeout = None
+
+    def _cached_response(self, key: str, load) -> Response:
+        cache = get_response_cache()
+        data = cache.get(key)
+        if data is not None:
+            RESPONSE_CACHE_REQUESTS.labels(self.cache_namespace, "hit").inc()
+            return Response(data, headers={"X-Cache": "HIT"})
+        RESPONSE_CACHE_REQUESTS.labels(self.cache_namespace, "miss").inc()
+        response = load()
+        if response.status_code == 200:
+            timeout = self.cache_timeout if self.cache_timeout is not None else settings.RESPONSE_CACHE_TIMEOUT
+            if is_reading_from_replica():
+                # Replica may not have the last write yet, so its data is only kept as long as replica lag window.
+                timeout = min(timeout, settings.REPLICA_STICKY_SECONDS)
+            cache.set(key, response.data, timeout)
+        response["X-Cache"] = "MISS"
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        pk = kwargs.get(self.lookup_url_kwarg or self.lookup_field)
+        version = _version(get_response_cache(), f"{self.cache_namespace}:object_version:{pk}")
+        key = f"{self.cache_namespace}:object:{pk}:{version}"
+        return self._cached_response(
+            key, lambda: super(ReadThroughCacheMixin, self).retrieve(request, *args, **kwargs))
+
+    def list(self, request, *args, **kwargs):
+        version = _version(get_response_cache(), f"{self.cache_namespace}:list_version")
+        query = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+        key = f"{self.cache_namespace}:list:{version}:{query}"
+        return self._cached_response(
+            key, lambda: super(ReadThroughCacheMixin, self).list(request, *args, **kwargs))
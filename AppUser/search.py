@@ -0,0 +1,69 @@
+import re
+import unicodedata
+
+# Weight of trigram rows, a match in business name counts more than a match in address.
+NAME_WEIGHT = 2
+ADDRESS_WEIGHT = 1
+
+
+def normalize(text: str) -> str:
+    """
+    This function lower cases text, removes accents and replaces everything except letters and digits with single
+    space e.g. "Café  Déjà-Vu!" -> "cafe deja vu".
+    """
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(character for character in text if not unicodedata.combining(character))
+    return " ".join(re.findall(r"[^\W_]+", text.lower()))
+
+
+def trigrams(text: str, prefix: bool = False) -> set:
+    """
+    This function returns the set of 3 character pieces of every word of text. Words are padded with a space on both
+    sides ("pizza" -> " pi", "piz", "izz", "zza", "za "), so 2 character words and word starts have trigrams too and a
+    typo only changes the few trigrams around it. Unlike PostgreSQL pg_trgm words are not padded with two spaces in
+    front, trigrams like "  p" would match a large part of the table, so search text needs at least 2 characters.
+
+    Params:
+    text: str - text to split
+    prefix: bool - True for search query which user is still typing, the last word is not padded at the end so
+    "piz" matches "pizza".
+
+    return: set of trigram strings
+    """
+    words = normalize(text).split()
+    grams = set()
+    for index, word in enumerate(words):
+        is_last = index == len(words) - 1
+        padded = " " + word + ("" if prefix and is_last else " ")
+        grams.update(padded[start:start + 3] for start in range(len(padded) - 2))
+    return grams
+
+
+def index_rows(business_name: str, address: str) -> list:
+    """
+    This function returns (trigram, weight) rows of business for search index, trigram of both name and address keeps
+    the weight of name.
+    """
+    weights = {gram: ADDRESS_WEIGHT for gram in trigrams(address)}
+    weights.update({gram: NAME_WEIGHT for gram in trigrams(business_name)})
+    return list(weights.items())
+
+
+def match_score(query: str, query_grams: set, business_name: str, address: str) -> float:
+    """
+    This function ranks a candidate business for query. Score is the part of query trigrams found in name (or half
+    of the part found in address), plus a bonus when name starts with the query or a name word starts with it.
+
+    return: float score, 0 is no match and 1.5 is the best match
+    """
+    if not query_grams:
+        return 0.0
+    name_score = len(query_grams & trigrams(business_name)) / len(query_grams)
+    address_score = len(query_grams & trigrams(address)) / len(query_grams)
+    score = max(name_score, address_score / 2)
+    name = normalize(business_name)
+    if name.startswith(query):
+        score += 0.5
+    elif " " + query in " " + name:
+        score += 0.25
+    return score
@@ -1,6 +1,46 @@
+from django.contrib.auth.validators import UnicodeUsernameValidator
 from rest_framework import serializers
+from rest_framework.relations import PrimaryKeyRelatedField
+from rest_framework.validators import UniqueValidator
 from .models import CustomUser, UserProfile, UserType, BusinessProfile, BusinessManager, OTPVerification, \
     SMSOTPVerification
+from .operating_hours import parse_operating_hours
+from .user_type_cache import user_type_cache
+
+
+class PreloadedPrimaryKeyRelatedField(PrimaryKeyRelatedField):
+    """
+    This class in inherited from PrimaryKeyRelatedField class. When serializer context has "related_instances"
+    (field name -> {str(pk): instance}) the related object is taken from it instead of one query per value, this is
+    used by bulk actions which load all related objects with one query per field.
+    """
+
+    def to_internal_value(self, data):
+        preloaded = self.context.get("related_instances", {}).get(self.field_name)
+        if preloaded is None:
+            return super().to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        instance = preloaded.get(str(data))
+        if instance is None:
+            self.fail('does_not_exist', pk_value=data)
+        return instance
+
+
+class CachedUserTypeField(PrimaryKeyRelatedField):
+    """
+    This class in inherited from PrimaryKeyRelatedField class. User type is resolved from process memory cache of
+    UserType table (see AppUser.user_type_cache), so validation does not query the database.
+    """
+    preload = False
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        user_type = user_type_cache.get(data)
+        if user_type is None:
+            self.fail('does_not_exist', pk_value=data)
+        return user_type
 
 
 class CustomUserSerializer(serializers.ModelSerializer):
@@ -10,7 +50,10 @@ class CustomUserSerializer(serializers.ModelSerializer):
     Fields to show:
         'id', 'email', 'username', 'password', 'created_at', 'updated_at', 'is_deleted'
 
+    Username must be unique among soft deleted users too, they keep their row until purge_deleted command.
     """
+    username = serializers.CharField(max_length=150, validators=[
+        UnicodeUsernameValidator(), UniqueValidator(queryset=CustomUser.all_objects.all())])
 
     def __init__(self, *args, **kwargs):
         # Get the context passed during serialization
@@ -64,13 +107,20 @@ class UserProfileSerializer(serializers.ModelSerializer):
             This class in inherited from serializers.ModelSerializer class.
 
             Fields to show:
-               'id', 'user_id', 'profile_image', 'first_name', 'last_name', 'address', 'contact_number','longitude', 'latitude'
+               'id', 'user_id', 'profile_image', 'first_name', 'last_name', 'address', 'contact_number','longitude', 'latitude',
+               'image_variants'
+
+            image_variants is read only, it is saved by image pipeline (see AppUser.images) after profile_image upload.
+            User can have one profile, soft deleted profile counts until purge_deleted command removes it.
             """
+    user_id = PrimaryKeyRelatedField(queryset=CustomUser.objects.all(),
+                                     validators=[UniqueValidator(queryset=UserProfile.all_objects.all())])
 
     class Meta:
         model = UserProfile
         fields = ['id', 'user_id', 'first_name', 'last_name', 'address', 'contact_number',
-                  'longitude', 'latitude', 'profile_image']
+                  'longitude', 'latitude', 'profile_image', 'image_variants']
+        read_only_fields = ['image_variants']
 
 
 class UserTypeSerializer(serializers.ModelSerializer):
@@ -109,13 +159,25 @@ class BusinessProfileSerializer(serializers.ModelSerializer):
 
         Fields to show:
            'id', 'business_name', 'address', 'business_contact_number', 'longitude', 'latitude', 'operating_hours',
-           'business_profile_image'
+           'operating_schedule', 'business_profile_image', 'image_variants'
+
+        operating_hours is validated with AppUser.operating_hours.parse_operating_hours, operating_schedule is read
+        only and is parsed from operating_hours on save. image_variants is read only, it is saved by image pipeline
+        (see AppUser.images) after business_profile_image upload.
     """
 
     class Meta:
         model = BusinessProfile
-        fields = ['id', 'business_name', 'address', 'business_contact_number',
-                  'longitude', 'latitude', 'operating_hours', 'business_profile_image']
+        fields = ['id', 'business_name', 'address', 'business_contact_number', 'longitude', 'latitude',
+                  'operating_hours', 'operating_schedule', 'business_profile_image', 'image_variants']
+        read_only_fields = ['operating_schedule', 'image_variants']
+
+    def validate_operating_hours(self, value: str) -> str:
+        try:
+            parse_operating_hours(value)
+        except ValueError as e:
+            raise serializers.ValidationError(str(e))
+        return value
 
 
 class BusinessManagerSerializer(serializers.ModelSerializer):
@@ -124,8 +186,76 @@ class BusinessManagerSerializer(serializers.ModelSerializer):
 
           Fields to show:
             "id", "user_id", "business_pofile_id", "roll_name"
+
+          Related objects are shown as primary keys. When request has ?expand=user,business,user_type query
+          parameter the selected foreign keys are shown as nested objects instead. Viewset should select_related the
+          expanded foreign keys (see related_fields_to_select) so nested objects do not cost extra queries.
       """
+    # expand name: (foreign key field, serializer class, serializer kwargs)
+    expandable_fields = {
+        "user": ("user_id", CustomUserSerializer, {"fields": ["id", "username", "email"]}),
+        "business": ("business_pofile_id", BusinessProfileSerializer, {}),
+        "user_type": ("user_type_id", UserTypeSerializer, {}),
+    }
+    serializer_related_field = PreloadedPrimaryKeyRelatedField
+    user_type_id = CachedUserTypeField(queryset=UserType.objects.all())
 
     class Meta:
         model = BusinessManager
         fields = ["id", "user_id", "business_pofile_id", "user_type_id", "roll_name"]
+
+    @classmethod
+    def get_expand(cls, request) -> list:
+        """
+        This method returns the expand names from comma separated ?expand= query parameter of request. Spaces around
+        names are ignored, unknown names raise ValidationError (400 response).
+        """
+        if request is None:
+            return []
+        requested = [name.strip() for name in request.query_params.get("expand", "").split(",") if name.strip()]
+        unknown = [name for name in requested if name not in cls.expandable_fields]
+        if unknown:
+            raise serializers.ValidationError(
+                {"expand": [f"Unknown expand name(s): {', '.join(unknown)}. "
+                            f"Allowed: {', '.join(cls.expandable_fields)}."]})
+        return [name for name in cls.expandable_fields if name in requested]
+
+    @classmethod
+    def related_fields_to_select(cls, request) -> list:
+        """
+        This method returns the foreign key fields which viewset should pass to select_related for the request.
+        """
+        return [cls.expandable_fields[name][0] for name in cls.get_expand(request)]
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        for name in self.get_expand(self.context.get("request")):
+            field_name, serializer_class, options = self.expandable_fields[name]
+            data[field_name] = serializer_class(getattr(instance, field_name), **options).data
+        return data
+
+
+class NearbyBusinessProfileSerializer(BusinessProfileSerializer):
+    """
+        This class in inherited from BusinessProfileSerializer class.
+
+        Fields to show:
+           All fields of BusinessProfileSerializer and 'distance_km' which is calculated by nearby search.
+    """
+    distance_km = serializers.FloatField(read_only=True)
+
+    class Meta(BusinessProfileSerializer.Meta):
+        fields = BusinessProfileSerializer.Meta.fields + ['distance_km']
+
+
+class SearchBusinessProfileSerializer(BusinessProfileSerializer):
+    """
+        This class in inherited from BusinessProfileSerializer class.
+
+        Fields to show:
+           All fields of BusinessProfileSerializer and 'score' which is calculated by search.
+    """
+    score = serializers.FloatField(read_only=True)
+
+    class Meta(BusinessProfileSerializer.Meta):
+        fields = BusinessProfileSerializer.Meta.fields + ['score']
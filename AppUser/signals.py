@@ -0,0 +1,90 @@
+from django.apps import apps
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import BusinessOpeningInterval, BusinessProfile, BusinessSearchTrigram, SoftDeleteManager, \
+    SoftDeleteUserManager, UserType, soft_deleted
+from .response_cache import BUSINESS_PROFILE_CACHE_NAMESPACE, invalidate_object
+from .user_type_cache import user_type_cache
+
+
+@receiver([post_save, post_delete], sender=BusinessProfile)
+def invalidate_business_profile_cache(sender, instance, **kwargs):
+    """
+    This function invalidates cached business profile and business profile list pages when profile is created,
+    updated (including add_profile) or deleted. Cache is invalidated after commit, otherwise a request reading
+    before commit would cache the old row again.
+    """
+    pk = instance.pk
+    transaction.on_commit(lambda: invalidate_object(BUSINESS_PROFILE_CACHE_NAMESPACE, pk))
+
+
+@receiver(soft_deleted, sender=BusinessProfile)
+def invalidate_soft_deleted_business_profiles(sender, pks, **kwargs):
+    """
+    This function invalidates cached business profiles and list pages after profiles are soft deleted with
+    SoftDeleteQuerySet.soft_delete.
+    """
+    def invalidate():
+        for pk in pks:
+            invalidate_object(BUSINESS_PROFILE_CACHE_NAMESPACE, pk)
+    transaction.on_commit(invalidate)
+
+
+@receiver(post_save, sender=BusinessProfile)
+def rebuild_business_opening_intervals(sender, instance, created, **kwargs):
+    """
+    This function rebuilds "open at" intervals of business profile when it is created or its operating schedule has
+    changed. Intervals of deleted profile are deleted by cascade.
+    """
+    if not getattr(instance, "operating_schedule_changed", True):
+        return
+    BusinessOpeningInterval.rebuild([instance], replace=not created)
+
+
+@receiver(post_save, sender=BusinessProfile)
+def rebuild_business_search_trigrams(sender, instance, created, **kwargs):
+    """
+    This function rebuilds search trigrams of business profile when it is created or its name or address has changed.
+    Trigrams of deleted profile are deleted by cascade.
+    """
+    if not getattr(instance, "search_index_changed", True):
+        return
+    BusinessSearchTrigram.rebuild([instance], replace=not created)
+
+
+@receiver([post_save, post_delete], sender=UserType)
+def invalidate_user_type_cache(sender, instance, **kwargs):
+    """
+    This function bumps the shared version of user type cache after commit, so every worker loads UserType table
+    again and does not load it before the change is visible.
+    """
+    transaction.on_commit(user_type_cache.invalidate)
+
+
+@receiver(soft_deleted, sender=UserType)
+def invalidate_user_type_cache_on_soft_delete(sender, pks, **kwargs):
+    """
+    This function bumps the shared version of user type cache after user types are soft deleted.
+    """
+    transaction.on_commit(user_type_cache.invalidate)
+
+
+def stamp_soft_delete(sender, instance, update_fields=None, **kwargs):
+    """
+    This function sets updated_at when a row is saved as soft deleted (e.g. PATCH with is_deleted), purge_deleted
+    command counts retention period from updated_at of soft deleted rows. It is only set when the stored row is not
+    deleted yet, saving an already deleted row again does not extend its retention period.
+    """
+    if not instance.is_deleted or (update_fields is not None and "updated_at" not in update_fields):
+        return
+    if instance._state.adding or sender._base_manager.filter(pk=instance.pk, is_deleted=False).exists():
+        instance.updated_at = timezone.now()
+
+
+# Connected per model, so saves of other models do not call it.
+for model in apps.get_app_config("AppUser").get_models():
+    if isinstance(model._default_manager, (SoftDeleteManager, SoftDeleteUserManager)):
+        pre_save.connect(stamp_soft_delete, sender=model)
@@ -0,0 +1,198 @@
+import atexit
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+from twilio.http.http_client import TwilioHttpClient
+from twilio.rest import Client
+
+from .metrics import observe_outbound
+
+logger = logging.getLogger(__name__)
+
+
+class SMSProvider:
+    """
+    This is the base class for SMS providers. Provider is created once per process, so implementations should keep
+    their HTTP client / session on the instance and reuse it for every message.
+
+    Methods:
+        send: param(to, body) Send the SMS and return message id from provider.
+    """
+
+    def __init__(self, from_number: str = None, **kwargs):
+        self.from_number = from_number or settings.TWILIO_PHONE_NUMBER
+
+    def send(self, to: str, body: str) -> str:
+        raise NotImplementedError
+
+
+class TwilioSMSProvider(SMSProvider):
+    """
+    This class sends SMS with Twilio. Twilio client and its HTTP session (connection pool) are created on first use
+    and shared by all threads of the process, so TLS connection is set up once and not on every SMS.
+    """
+
+    def __init__(self, account_sid: str = None, auth_token: str = None, timeout: float = 10.0,
+                 max_retries: int = 2, **kwargs):
+        super().__init__(**kwargs)
+        self.account_sid = account_sid or settings.TWILIO_ACCOUNT_SID
+        self.auth_token = auth_token or settings.TWILIO_AUTH_TOKEN
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    http_client = TwilioHttpClient(pool_connections=True, timeout=self.timeout,
+                                                   max_retries=self.max_retries)
+                    self._client = Client(self.account_sid, self.auth_token, http_client=http_client)
+        return self._client
+
+    def send(self, to: str, body: str) -> str:
+        with observe_outbound("twilio", "messages.create"):
+            message = self.client.messages.create(body=body, from_=self.from_number, to=to)
+        return message.sid
+
+
+class FakeSMSProvider(SMSProvider):
+    """
+    This class keeps the SMS in memory instead of sending them. It is used in tests and benchmarks.
+
+    Params:
+        latency: float - seconds to sleep on every send, to simulate provider round trip.
+        fail_every: int - if set, every nth message raises an exception.
+    """
+
+    def __init__(self, latency: float = 0.0, fail_every: int = 0, **kwargs):
+        super().__init__(**kwargs)
+        self.latency = latency
+        self.fail_every = fail_every
+        self.outbox = []
+        self.sent_count = 0
+        self._lock = threading.Lock()
+
+    def send(self, to: str, body: str) -> str:
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.sent_count += 1
+            if self.fail_every and self.sent_count % self.fail_every == 0:
+                raise ConnectionError("Fake SMS provider failure")
+            message_id = uuid.uuid4().hex
+            self.outbox.append({"sid": message_id, "from": self.from_number, "to": to, "body": body})
+        return message_id
+
+    def clear(self):
+        with self._lock:
+            self.outbox.clear()
+            self.sent_count = 0
+
+
+class SMSSender:
+    """
+    This class sends SMS from a bounded thread pool, so request thread only submits the message and returns. Result
+    of the provider is not known when submit returns, failed SMS are logged on "AppUser.sms" logger.
+
+    Params:
+        provider: SMSProvider - provider which delivers the message.
+        max_workers: int - number of threads sending SMS concurrently.
+        max_pending: int - maximum number of SMS waiting or in progress, submit returns None after that.
+    """
+
+    def __init__(self, provider: SMSProvider, max_workers: int = 8, max_pending: int = 1000):
+        self.provider = provider
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sms-sender")
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pending = set()
+        self._pending_lock = threading.Lock()
+
+    def _send(self, to: str, body: str):
+        try:
+            return self.provider.send(to, body)
+        except Exception:
+            logger.exception("SMS to %s failed", to)
+            raise
+
+    def _release(self, future):
+        with self._pending_lock:
+            self._pending.discard(future)
+        self._slots.release()
+
+    def submit(self, to: str, body):
+        """
+        This method adds SMS in the send queue.
+
+        Params:
+        to: str - phone number
+        body: str or callable returning the message. Callable is called on the calling thread only after the SMS is
+            accepted, so e.g. an OTP is not issued for an SMS which is refused.
+
+        return: concurrent.futures.Future with provider message id, or None if too many SMS are pending.
+        """
+        if not self._slots.acquire(blocking=False):
+            return None
+        try:
+            if callable(body):
+                body = body()
+            future = self._executor.submit(self._send, to, body)
+        except Exception:
+            self._slots.release()
+            raise
+        with self._pending_lock:
+            self._pending.add(future)
+        future.add_done_callback(self._release)
+        return future
+
+    def flush(self, timeout: float = None) -> None:
+        """
+        This method waits until all submitted SMS are processed.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._pending_lock:
+                pending = list(self._pending)
+            if not pending:
+                return
+            for future in pending:
+                remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+                try:
+                    future.result(timeout=remaining)
+                except Exception:
+                    pass
+                if deadline is not None and time.monotonic() >= deadline:
+                    return
+
+    def close(self, timeout: float = None) -> None:
+        self.flush(timeout)
+        self._executor.shutdown(wait=False)
+
+
+_sms_sender = None
+_sms_sender_lock = threading.Lock()
+
+
+def get_sms_sender() -> SMSSender:
+    """
+    This function returns the process wide SMS sender configured with SMS_PROVIDER_BACKEND, SMS_PROVIDER_OPTIONS,
+    SMS_SENDER_MAX_WORKERS and SMS_SENDER_MAX_PENDING settings. Pending SMS are sent before the process exits, for
+    at most SMS_SENDER_SHUTDOWN_TIMEOUT seconds.
+    """
+    global _sms_sender
+    if _sms_sender is None:
+        with _sms_sender_lock:
+            if _sms_sender is None:
+                provider_class = import_string(settings.SMS_PROVIDER_BACKEND)
+                _sms_sender = SMSSender(provider_class(**settings.SMS_PROVIDER_OPTIONS),
+                                        max_workers=settings.SMS_SENDER_MAX_WORKERS,
+                                        max_pending=settings.SMS_SENDER_MAX_PENDING)
+                atexit.register(_sms_sender.close, settings.SMS_SENDER_SHUTDOWN_TIMEOUT)
+    return _sms_sender
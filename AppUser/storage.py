@@ -0,0 +1,420 @@
+import logging
+import mimetypes
+import os
+import re
+import shutil
+import threading
+import uuid
+
+import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+from django.utils.module_loading import import_string
+
+from .metrics import observe_outbound
+
+logger = logging.getLogger(__name__)
+
+
+class StorageWriter:
+    """
+    This is the base class for streaming writers returned by StorageBackend.open_writer. Data is written in chunks as
+    it arrives, close method finishes the object and returns its URL.
+    """
+
+    def write(self, data: bytes) -> None:
+        raise NotImplementedError
+
+    def close(self) -> str:
+        raise NotImplementedError
+
+    def abort(self) -> None:
+        raise NotImplementedError
+
+
+class StorageBackend:
+    """
+    This is the base class for file storages used for profile images.
+
+    Methods:
+        upload: param(fileobj, key, content_type) Upload file object and return its URL.
+        open_writer: param(key, content_type) Return StorageWriter to upload object chunk by chunk.
+        read: param(key) Return content of the object.
+        head: param(key) Return size and content type of the object, None if it does not exist.
+        presign_upload: param(key, content_type, max_size, expires_in) Return form which uploads the object
+        straight to storage, without passing through application.
+        url: param(key) Return public URL of the object.
+    """
+
+    def upload(self, fileobj, key: str, content_type: str = None) -> str:
+        writer = self.open_writer(key, content_type)
+        try:
+            for chunk in iter(lambda: fileobj.read(settings.STORAGE_UPLOAD_CHUNK_SIZE), b""):
+                writer.write(chunk)
+        except Exception:
+            writer.abort()
+            raise
+        return writer.close()
+
+    def open_writer(self, key: str, content_type: str = None) -> StorageWriter:
+        raise NotImplementedError
+
+    def read(self, key: str) -> bytes:
+        raise NotImplementedError
+
+    def head(self, key: str):
+        raise NotImplementedError
+
+    def presign_upload(self, key: str, content_type: str, max_size: int, expires_in: int) -> dict:
+        """
+        return: dict with "method", "url" and "fields", client sends multipart form with the fields and the file in
+        "file" field (S3 POST policy format).
+        """
+        raise NotImplementedError
+
+    def url(self, key: str) -> str:
+        raise NotImplementedError
+
+
+class S3MultipartWriter(StorageWriter):
+    """
+    This class uploads the object to S3 while data is still arriving. Data is buffered until one part is complete
+    and then uploaded as multipart upload part. Small objects which never fill one part are sent with put_object.
+    """
+
+    def __init__(self, storage, key: str, content_type: str = None):
+        self.storage = storage
+        self.key = key
+        self.content_type = content_type
+        self.buffer = bytearray()
+        self.upload_id = None
+        self.parts = []
+
+    def _extra_args(self) -> dict:
+        return {"ContentType": self.content_type} if self.content_type else {}
+
+    def _upload_part(self, data: bytes) -> None:
+        client = self.storage.client
+        if self.upload_id is None:
+            with observe_outbound("s3", "create_multipart_upload"):
+                response = client.create_multipart_upload(Bucket=self.storage.bucket_name, Key=self.key,
+                                                          **self._extra_args())
+            self.upload_id = response["UploadId"]
+        part_number = len(self.parts) + 1
+        with observe_outbound("s3", "upload_part"):
+            response = client.upload_part(Bucket=self.storage.bucket_name, Key=self.key, UploadId=self.upload_id,
+                                          PartNumber=part_number, Body=data)
+        self.parts.append({"ETag": response["ETag"], "PartNumber": part_number})
+
+    def write(self, data: bytes) -> None:
+        self.buffer.extend(data)
+        part_size = self.storage.multipart_chunksize
+        while len(self.buffer) >= part_size:
+            self._upload_part(bytes(self.buffer[:part_size]))
+            del self.buffer[:part_size]
+
+    def close(self) -> str:
+        client = self.storage.client
+        try:
+            if self.upload_id is None:
+                with observe_outbound("s3", "put_object"):
+                    client.put_object(Bucket=self.storage.bucket_name, Key=self.key, Body=bytes(self.buffer),
+                                      **self._extra_args())
+            else:
+                if self.buffer:
+                    self._upload_part(bytes(self.buffer))
+                with observe_outbound("s3", "complete_multipart_upload"):
+                    client.complete_multipart_upload(Bucket=self.storage.bucket_name, Key=self.key,
+                                                     UploadId=self.upload_id, MultipartUpload={"Parts": self.parts})
+        except Exception:
+            self.abort()
+            raise
+        self.buffer = bytearray()
+        return self.storage.url(self.key)
+
+    def abort(self) -> None:
+        self.buffer = bytearray()
+        if self.upload_id is not None:
+            try:
+                self.storage.client.abort_multipart_upload(Bucket=self.storage.bucket_name, Key=self.key,
+                                                           UploadId=self.upload_id)
+            except Exception:
+                logger.exception("Not able to abort multipart upload of %s", self.key)
+            self.upload_id = None
+
+
+class S3Storage(StorageBackend):
+    """
+    This class stores the files in S3 bucket. One boto3 client is created per process and shared by all threads,
+    its connection pool size is set with AWS_S3_MAX_POOL_CONNECTIONS setting.
+
+    Params:
+        endpoint_url: str - URL of S3 compatible server (e.g. MinIO), None for AWS.
+    """
+
+    def __init__(self, bucket_name: str = None, region_name: str = None, access_key_id: str = None,
+                 secret_access_key: str = None, endpoint_url: str = None, max_pool_connections: int = None,
+                 multipart_chunksize: int = None, **kwargs):
+        self.bucket_name = bucket_name or settings.AWS_STORAGE_BUCKET_NAME
+        self.region_name = region_name or settings.AWS_S3_REGION_NAME
+        self.access_key_id = access_key_id or settings.AWS_ACCESS_KEY_ID
+        self.secret_access_key = secret_access_key or settings.AWS_SECRET_ACCESS_KEY
+        self.endpoint_url = endpoint_url or settings.AWS_S3_ENDPOINT_URL
+        self.max_pool_connections = max_pool_connections or settings.AWS_S3_MAX_POOL_CONNECTIONS
+        self.multipart_chunksize = multipart_chunksize or settings.AWS_S3_MULTIPART_CHUNKSIZE
+        self.transfer_config = TransferConfig(multipart_threshold=self.multipart_chunksize,
+                                              multipart_chunksize=self.multipart_chunksize,
+                                              max_concurrency=settings.AWS_S3_MAX_TRANSFER_CONCURRENCY)
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    config = Config(max_pool_connections=self.max_pool_connections,
+                                    retries={"max_attempts": 3, "mode": "standard"},
+                                    connect_timeout=5, read_timeout=30)
+                    self._client = boto3.session.Session().client(
+                        "s3",
+                        aws_access_key_id=self.access_key_id,
+                        aws_secret_access_key=self.secret_access_key,
+                        region_name=self.region_name,
+                        endpoint_url=self.endpoint_url,
+                        config=config)
+        return self._client
+
+    def upload(self, fileobj, key: str, content_type: str = None) -> str:
+        extra_args = {"ContentType": content_type} if content_type else None
+        with observe_outbound("s3", "upload_fileobj"):
+            self.client.upload_fileobj(fileobj, self.bucket_name, key, ExtraArgs=extra_args,
+                                       Config=self.transfer_config)
+        return self.url(key)
+
+    def open_writer(self, key: str, content_type: str = None) -> StorageWriter:
+        return S3MultipartWriter(self, key, content_type)
+
+    def read(self, key: str) -> bytes:
+        with observe_outbound("s3", "get_object"):
+            return self.client.get_object(Bucket=self.bucket_name, Key=key)["Body"].read()
+
+    def head(self, key: str):
+        try:
+            with observe_outbound("s3", "head_object"):
+                response = self.client.head_object(Bucket=self.bucket_name, Key=key)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+        return {"size": response["ContentLength"], "content_type": response.get("ContentType")}
+
+    def presign_upload(self, key: str, content_type: str, max_size: int, expires_in: int) -> dict:
+        # Signing is done locally with the credentials, no request is sent to S3.
+        post = self.client.generate_presigned_post(
+            Bucket=self.bucket_name, Key=key, Fields={"Content-Type": content_type},
+            Conditions=[{"Content-Type": content_type}, ["content-length-range", 1, max_size]],
+            ExpiresIn=expires_in)
+        return {"method": "POST", "url": post["url"], "fields": post["fields"]}
+
+    def url(self, key: str) -> str:
+        if self.endpoint_url:
+            return f"{self.endpoint_url.rstrip('/')}/{self.bucket_name}/{key}"
+        return f"https://{self.bucket_name}.s3.amazonaws.com/{key}"
+
+
+class LocalFileWriter(StorageWriter):
+    """
+    This class writes the object in a temporary file next to its final path and renames it on close, so readers
+    never see a partially written file.
+    """
+
+    def __init__(self, storage, key: str):
+        self.storage = storage
+        self.key = key
+        self.path = storage.path(key)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.temp_path = f"{self.path}.{uuid.uuid4().hex}.part"
+        self.file = open(self.temp_path, "wb")
+
+    def write(self, data: bytes) -> None:
+        self.file.write(data)
+
+    def close(self) -> str:
+        self.file.close()
+        os.replace(self.temp_path, self.path)
+        return self.storage.url(self.key)
+
+    def abort(self) -> None:
+        self.file.close()
+        if os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
+
+
+class LocalFileSystemStorage(StorageBackend):
+    """
+    This class stores the files in local directory. It is a stand in for S3 in tests, benchmarks and development.
+
+    Params:
+        location: str - directory where files are saved, default is STORAGE_LOCAL_ROOT setting.
+        base_url: str - URL prefix for saved files, default is STORAGE_LOCAL_BASE_URL setting.
+        upload_url: str - URL prefix of presigned uploads, default is STORAGE_LOCAL_UPLOAD_URL setting.
+    """
+
+    def __init__(self, location: str = None, base_url: str = None, upload_url: str = None, **kwargs):
+        self.location = os.path.abspath(location or settings.STORAGE_LOCAL_ROOT)
+        self.base_url = base_url or settings.STORAGE_LOCAL_BASE_URL
+        self.upload_url = upload_url or settings.STORAGE_LOCAL_UPLOAD_URL
+
+    def path(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.location, key))
+        if not path.startswith(self.location + os.sep):
+            raise ValueError(f"Invalid storage key {key}")
+        return path
+
+    def upload(self, fileobj, key: str, content_type: str = None) -> str:
+        writer = self.open_writer(key, content_type)
+        try:
+            shutil.copyfileobj(fileobj, writer.file, settings.STORAGE_UPLOAD_CHUNK_SIZE)
+        except Exception:
+            writer.abort()
+            raise
+        return writer.close()
+
+    def open_writer(self, key: str, content_type: str = None) -> StorageWriter:
+        return LocalFileWriter(self, key)
+
+    def read(self, key: str) -> bytes:
+        with open(self.path(key), "rb") as file:
+            return file.read()
+
+    def head(self, key: str):
+        path = self.path(key)
+        if not os.path.isfile(path):
+            return None
+        return {"size": os.path.getsize(path), "content_type": mimetypes.guess_type(path)[0]}
+
+    def presign_upload(self, key: str, content_type: str, max_size: int, expires_in: int) -> dict:
+        # Same form as S3 POST policy, it is sent to AppUser.uploads.local_upload_view which checks the signed token.
+        from .uploads import create_local_upload_token
+
+        token = create_local_upload_token(key, content_type, max_size)
+        return {"method": "POST", "url": f"{self.upload_url.rstrip('/')}/{token}/",
+                "fields": {"key": key, "Content-Type": content_type}}
+
+    def url(self, key: str) -> str:
+        return f"{self.base_url.rstrip('/')}/{key}"
+
+
+def unique_key(prefix: str, file_name: str) -> str:
+    """
+    This function returns a new storage key for uploaded file, e.g. business_image/9f0c...e1.png. File name of client
+    is not used, so two uploads with the same name never overwrite each other.
+    """
+    extension = os.path.splitext(file_name or "")[1].lower()
+    if not re.fullmatch(r"\.[a-z0-9]{1,10}", extension):
+        extension = ""
+    return f"{prefix}{uuid.uuid4().hex}{extension}"
+
+
+class StoredUploadedFile(UploadedFile):
+    """
+    This class represents the uploaded file which is already saved in storage by StorageUploadHandler. Views use
+    key and url attributes instead of uploading the file again.
+    """
+
+    def __init__(self, name: str, key: str, url: str, size: int, content_type: str = None, charset: str = None):
+        super().__init__(file=None, name=name, content_type=content_type, size=size, charset=charset)
+        self.key = key
+        self.url = url
+
+    def open(self, mode=None):
+        raise ValueError("File is already saved in storage, use its url")
+
+    def close(self):
+        pass
+
+
+class StorageUploadHandler(FileUploadHandler):
+    """
+    This upload handler streams the files of selected fields straight to storage while request body is being read,
+    so file is never buffered in memory or temporary file by Django. Files of other fields are passed to next
+    upload handler.
+
+    Params:
+        prefixes: dict - field name to storage key prefix, e.g. {"profile_image": "user_profile_image/"}
+    """
+
+    def __init__(self, request=None, prefixes: dict = None):
+        super().__init__(request)
+        self.prefixes = prefixes or {}
+        self.writer = None
+        self.key = None
+
+    def new_file(self, field_name, file_name, content_type, content_length, charset=None, content_type_extra=None):
+        super().new_file(field_name, file_name, content_type, content_length, charset, content_type_extra)
+        self.writer = None
+        prefix = self.prefixes.get(field_name)
+        if prefix is not None:
+            self.key = unique_key(prefix, file_name)
+            self.writer = get_storage().open_writer(self.key, content_type)
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.writer is None:
+            return raw_data
+        self.writer.write(raw_data)
+        return None
+
+    def file_complete(self, file_size):
+        if self.writer is None:
+            return None
+        url = self.writer.close()
+        self.writer = None
+        return StoredUploadedFile(name=self.file_name, key=self.key, url=url, size=file_size,
+                                  content_type=self.content_type, charset=self.charset)
+
+    def upload_interrupted(self):
+        if self.writer is not None:
+            self.writer.abort()
+            self.writer = None
+
+
+def stream_uploads_to_storage(request, prefixes: dict) -> None:
+    """
+    This function adds StorageUploadHandler in front of the request upload handlers. It must be called before
+    request.data or request.FILES is accessed.
+
+    Params:
+    request: HTTP Request object
+    prefixes: dict - field name to storage key prefix
+    """
+    request.upload_handlers.insert(0, StorageUploadHandler(request, prefixes))
+
+
+def save_uploaded_file(file, key: str) -> str:
+    """
+    This function returns the URL of uploaded file. File which is already streamed to storage is not uploaded again.
+    """
+    if isinstance(file, StoredUploadedFile):
+        return file.url
+    return get_storage().upload(file, key, getattr(file, "content_type", None))
+
+
+_storage = None
+_storage_lock = threading.Lock()
+
+
+def get_storage() -> StorageBackend:
+    """
+    This function returns the process wide storage configured with STORAGE_BACKEND and STORAGE_OPTIONS settings.
+    """
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                _storage = import_string(settings.STORAGE_BACKEND)(**settings.STORAGE_OPTIONS)
+    return _storage
@@ -0,0 +1,51 @@
+from rest_framework.test import APITestCase
+
+from .middleware import QueryRecorder, view_action_label
+
+
+def registered_routes(router) -> set:
+    """
+    This function returns "<ViewSet class>.<action>" label of every route registered in router, labels are the same
+    as the ones used by QueryInstrumentationMiddleware.
+    """
+    labels = set()
+    for prefix, viewset, basename in router.registry:
+        for route in router.get_routes(viewset):
+            for action in route.mapping.values():
+                if hasattr(viewset, action):
+                    labels.add(f"{viewset.__name__}.{action}")
+    return labels
+
+
+class QueryBudgetTestCase(APITestCase):
+    """
+    This class in inherited from APITestCase class. Tests send requests with request_within_budget, which fails the
+    test when the endpoint runs more SQL queries than its budget in query_budgets.
+
+    Attributes:
+        router: DefaultRouter - router whose routes must all have a budget.
+        query_budgets: dict - "<ViewSet class>.<action>" -> maximum number of queries of one request.
+
+    Methods:
+        request_within_budget: param(method, path, data, **extra) Send request and assert query budget of its route.
+        assert_every_route_has_budget: Assert every route of router has a budget and every budget has a route.
+    """
+    router = None
+    query_budgets = {}
+
+    def request_within_budget(self, method: str, path: str, data=None, format: str = "json", **extra):
+        recorder = QueryRecorder()
+        with recorder.record():
+            response = getattr(self.client, method)(path, data, format=format, **extra)
+        label = view_action_label(response.wsgi_request)
+        self.assertIn(label, self.query_budgets, f"{method.upper()} {path} ({label}) has no query budget")
+        budget = self.query_budgets[label]
+        statements = "\n".join(f"{count}x {sql}" for sql, count in recorder.statements.most_common())
+        self.assertLessEqual(recorder.count, budget,
+                             f"{label} ran {recorder.count} queries, budget is {budget}:\n{statements}")
+        return response
+
+    def assert_every_route_has_budget(self):
+        routes = registered_routes(self.router)
+        self.assertEqual(set(), routes - set(self.query_budgets), "Routes without query budget")
+        self.assertEqual(set(), set(self.query_budgets) - routes, "Query budgets without route")
@@ -0,0 +1,41 @@
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from rest_framework.test import APITestCase
+
+from AppUser.models import BusinessManager, BusinessProfile, CustomUser, OTPVerification, UserProfile, UserType
+
+# 1x1 transparent PNG, used as profile image of upload requests.
+PNG_IMAGE = bytes.fromhex("89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+                          "1f15c4890000000d49444154789c6360606060000000050001a5f645400000000049454e44ae426082")
+
+
+class AppUserFixturesMixin:
+    """
+    This mixin creates the rows used by AppUser tests: a user with usable password, a second user, a user type,
+    a business open Mon-Sun 09:00-22:00 with its manager, a user profile and an OTP row. Cache is cleared first, so
+    cached responses and throttle buckets of an earlier test are not seen.
+    """
+    password = "budget-Passw0rd"
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.user = CustomUser.objects.create(username="budget_user", email="budget@dishdash.local",
+                                              password=make_password(self.password))
+        self.other_user = CustomUser.objects.create(username="budget_other")
+        self.user_type = UserType.objects.create(roll_type="owner")
+        self.business = BusinessProfile.objects.create(business_name="Budget", address="Street",
+                                                       business_contact_number="1234567", latitude="31.52",
+                                                       longitude="74.35", operating_hours="Mon-Sun 09:00-22:00")
+        self.manager = BusinessManager.objects.create(user_id=self.user, business_pofile_id=self.business,
+                                                      user_type_id=self.user_type, roll_name="Owner")
+        self.profile = UserProfile.objects.create(user_id=self.user, first_name="Budget", last_name="User",
+                                                  address="Street", contact_number="1234567", latitude="31.52",
+                                                  longitude="74.35")
+        self.otp = OTPVerification.objects.create(user_id=self.user, otp_str="123456")
+
+
+class AppUserTestCase(AppUserFixturesMixin, APITestCase):
+    """
+    This class in inherited from APITestCase class, feature tests of AppUser extend it to get the shared rows.
+    """
@@ -0,0 +1,63 @@
+from django.test import SimpleTestCase, override_settings
+
+from AppUser.checks import check_token_revocation_cache
+from AppUser.models import CustomUser
+from .base import AppUserTestCase
+
+
+class LoginLogoutTests(AppUserTestCase):
+    """
+    This class checks that stateless login does not write the user row and a token used after logout is rejected.
+    """
+
+    def login(self) -> str:
+        response = self.client.post("/user/login/", {"username": "budget_user", "password": self.password})
+        self.assertEqual(response.status_code, 202)
+        return response.data["data"]["access"]
+
+    def test_token_is_rejected_after_logout(self):
+        access = self.login()
+        self.assertEqual(self.client.get("/user/", HTTP_AUTHORIZATION=f"Bearer {access}").status_code, 200)
+        response = self.client.post("/user/logout/", {"username": "budget_user"}, HTTP_AUTHORIZATION=f"Bearer {access}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get("/user/", HTTP_AUTHORIZATION=f"Bearer {access}").status_code, 401)
+        # Token of a new login is not revoked.
+        self.assertEqual(self.client.get("/user/", HTTP_AUTHORIZATION=f"Bearer {self.login()}").status_code, 200)
+
+    def test_stateless_login_does_not_write_user_row(self):
+        self.login()
+        user = CustomUser.objects.get(pk=self.user.id)
+        self.assertIsNone(user.access_token)
+        self.assertEqual(user.updated_at, self.user.updated_at)
+
+    def test_wrong_credentials(self):
+        response = self.client.post("/user/login/", {"username": "budget_user", "password": "wrong"})
+        self.assertEqual(response.status_code, 401)
+        response = self.client.post("/user/login/", {"username": "nobody", "password": "wrong"})
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.client.post("/user/logout/", {"username": "budget_user"}).status_code, 400)
+
+    @override_settings(JWT_STATELESS_LOGIN=False)
+    def test_stored_tokens_are_reused_until_logout(self):
+        access = self.login()
+        self.assertEqual(CustomUser.objects.get(pk=self.user.id).access_token, access)
+        self.assertEqual(self.login(), access)
+        self.client.post("/user/logout/", {"username": "budget_user"}, HTTP_AUTHORIZATION=f"Bearer {access}")
+        self.assertIsNone(CustomUser.objects.get(pk=self.user.id).access_token)
+        self.assertNotEqual(self.login(), access)
+
+
+class TokenRevocationCacheCheckTests(SimpleTestCase):
+    """
+    This class checks that stateless login is rejected with a per process revocation store.
+    """
+    locmem = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    redis = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": "redis://cache"}}
+
+    def test_check(self):
+        with override_settings(JWT_STATELESS_LOGIN=True, TOKEN_REVOCATION_CACHE="default", CACHES=self.locmem):
+            self.assertEqual([error.id for error in check_token_revocation_cache(None)], ["AppUser.E002"])
+        with override_settings(JWT_STATELESS_LOGIN=True, TOKEN_REVOCATION_CACHE="default", CACHES=self.redis):
+            self.assertEqual(check_token_revocation_cache(None), [])
+        with override_settings(JWT_STATELESS_LOGIN=False, CACHES=self.locmem):
+            self.assertEqual(check_token_revocation_cache(None), [])
@@ -0,0 +1,46 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase, override_settings
+
+from AppUser.management.commands.run_benchmarks import Command, percentile
+
+
+class BenchmarkReportTests(SimpleTestCase):
+    """
+    This class checks the statistics and baseline comparison of run_benchmarks command. Scenarios themselves are run
+    by the command against its own database, not by the test suite.
+    """
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile(values, 100), 100)
+        self.assertEqual(percentile([7], 95), 7)
+        self.assertEqual(percentile([], 95), 0.0)
+
+    def test_compare_with_baseline(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        baseline = os.path.join(directory, "baseline.json")
+        result = {"p50_ms": 10.0, "p95_ms": 20.0, "p99_ms": 30.0, "rps": 100.0, "queries_per_request": 2.0}
+        with open(baseline, "w") as file:
+            json.dump({"results": {"login": result}}, file)
+
+        command = Command(stdout=StringIO())
+        command.compare(baseline, {"login": dict(result, p50_ms=5.0, rps=150.0), "search": result})
+        output = command.stdout.getvalue()
+        self.assertIn("p50_ms -50.0%", output)
+        self.assertIn("rps +50.0%", output)
+        self.assertIn("search                       not in baseline", output)
+
+    @override_settings(BENCHMARK_SETTINGS=False)
+    def test_refuses_to_run_without_benchmark_settings(self):
+        with self.assertRaises(CommandError):
+            call_command("run_benchmarks", stdout=StringIO())
@@ -0,0 +1,99 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from AppUser.bulk import bulk_create_with_pks
+from AppUser.models import BusinessManager, BusinessOpeningInterval, BusinessProfile, UserType
+from .base import AppUserTestCase
+
+
+class BulkWriteTests(AppUserTestCase):
+    """
+    This class checks bulk create / update actions: all items are written or none, errors are returned per item and
+    derived fields are filled like a single save would.
+    """
+
+    def business_data(self, name: str) -> dict:
+        return {"business_name": name, "address": "Street", "business_contact_number": "1", "latitude": "31.53",
+                "longitude": "74.36", "operating_hours": "Mon-Sun 09:00-22:00"}
+
+    def test_bulk_create(self):
+        items = [self.business_data("Bulk 1"), self.business_data("Bulk 2")]
+        response = self.client.post("/business_profile/bulk/", items, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([business["business_name"] for business in response.data["data"]], ["Bulk 1", "Bulk 2"])
+        created = BusinessProfile.objects.filter(business_name__startswith="Bulk")
+        self.assertEqual(created.count(), 2)
+        self.assertEqual(created.exclude(geohash=None).count(), 2)
+        self.assertEqual(BusinessOpeningInterval.objects.filter(business__in=created).count(), 14)
+        search = self.client.get("/business_profile/search/", {"q": "bulk"})
+        self.assertEqual(len(search.data["data"]), 2)
+
+    def test_invalid_item_writes_nothing(self):
+        response = self.client.post("/business_manager/bulk/", [
+            {"user_id": self.other_user.id, "business_pofile_id": self.business.id, "user_type_id": self.user_type.id,
+             "roll_name": "Manager"},
+            {"user_id": 10 ** 6, "business_pofile_id": self.business.id, "user_type_id": self.user_type.id,
+             "roll_name": "Manager"}], format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([error["index"] for error in response.data["data"]], [1])
+        self.assertIn("user_id", response.data["data"][0]["errors"])
+        self.assertEqual(BusinessManager.objects.count(), 1)
+
+        for body in ([], {"roll_type": "a"}):
+            self.assertEqual(self.client.post("/user_type/bulk/", body, format="json").status_code, 400)
+
+    def test_bulk_update(self):
+        self.client.get(f"/business_profile/{self.business.id}/")
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch("/business_profile/bulk/", [
+                {"id": self.business.id, "latitude": "-31.52", "operating_hours": "Mon 09:00-10:00"}], format="json")
+        self.assertEqual(response.status_code, 200)
+        business = BusinessProfile.objects.get(pk=self.business.id)
+        self.assertLess(business.geo_latitude, 0)
+        self.assertEqual(list(BusinessOpeningInterval.objects.filter(business=business).values_list(
+            "start_minute", "end_minute")), [(540, 600)])
+        # Cached response of the business is invalidated.
+        self.assertEqual(self.client.get(f"/business_profile/{self.business.id}/").data["latitude"], "-31.52")
+
+        response = self.client.patch("/user_type/bulk/", [{"id": self.user_type.id, "roll_type": "chief"},
+                                                         {"id": 10 ** 6, "roll_type": "boss"}], format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["data"],
+                         [{"index": 1, "errors": {"id": ["Object with this id does not exist."]}}])
+        self.assertEqual(UserType.objects.get(pk=self.user_type.id).roll_type, "owner")
+
+    def test_bulk_create_without_returning_rows(self):
+        # MySQL can not return primary keys from bulk insert, they are counted from id of the first inserted row.
+        items = [self.business_data("Bulk 1"), self.business_data("Bulk 2"), self.business_data("Bulk 3")]
+        with mock.patch.object(type(connection.features), "can_return_rows_from_bulk_insert",
+                               new_callable=mock.PropertyMock, return_value=False):
+            response = self.client.post("/business_profile/bulk/?batch_size=2", items, format="json")
+        self.assertEqual(response.status_code, 201)
+        created = {business.business_name: business.id for business in
+                   BusinessProfile.objects.filter(business_name__startswith="Bulk")}
+        self.assertEqual([(business["business_name"], business["id"]) for business in response.data["data"]],
+                         [(name, created[name]) for name in ("Bulk 1", "Bulk 2", "Bulk 3")])
+        self.assertEqual(BusinessOpeningInterval.objects.filter(business__in=created.values()).count(), 21)
+
+    def test_bulk_create_without_returning_rows_keeps_created_at(self):
+        created_at = timezone.now() - timedelta(days=30)
+        instances = [UserType(roll_type=f"type {index}", created_at=created_at) for index in range(5)]
+        with mock.patch.object(type(connection.features), "can_return_rows_from_bulk_insert",
+                               new_callable=mock.PropertyMock, return_value=False), transaction.atomic():
+            bulk_create_with_pks(UserType, instances, batch_size=2)
+        rows = UserType.objects.in_bulk([instance.pk for instance in instances])
+        self.assertEqual([rows[instance.pk].roll_type for instance in instances], [f"type {i}" for i in range(5)])
+        self.assertEqual({row.created_at for row in rows.values()}, {created_at})
+
+    def test_cache_is_invalidated_after_commit(self):
+        self.assertEqual(len(self.client.get("/business_profile/").data["results"]), 1)
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.client.post("/business_profile/bulk/", [self.business_data("Bulk 1")], format="json")
+            # Not committed yet, cached list is still served.
+            self.assertEqual(len(self.client.get("/business_profile/").data["results"]), 1)
+        for callback in callbacks:
+            callback()
+        self.assertEqual(len(self.client.get("/business_profile/").data["results"]), 2)
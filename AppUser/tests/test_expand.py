@@ -0,0 +1,51 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from AppUser.models import BusinessManager, CustomUser
+from .base import AppUserTestCase
+
+
+class BusinessManagerExpandTests(AppUserTestCase):
+    """
+    This class checks ?expand= of business managers returns nested objects, rejects unknown names and number of
+    queries does not grow with number of managers.
+    """
+
+    def list_managers(self, expand: str = None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/business_manager/", {"expand": expand} if expand else {})
+        self.assertEqual(response.status_code, 200)
+        return response.data["results"], len(queries)
+
+    def test_expanded_relations(self):
+        managers, _ = self.list_managers()
+        self.assertEqual(managers[0]["user_id"], self.user.id)
+
+        managers, _ = self.list_managers(" user, business ,user_type,")
+        manager = managers[0]
+        self.assertEqual(manager["user_id"], {"id": self.user.id, "username": "budget_user",
+                                              "email": "budget@dishdash.local"})
+        self.assertEqual(manager["business_pofile_id"]["business_name"], "Budget")
+        self.assertEqual(manager["user_type_id"]["roll_type"], "owner")
+
+    def test_unknown_expand_is_rejected(self):
+        response = self.client.get("/business_manager/", {"expand": "user,unknown"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("unknown", response.data["expand"][0])
+
+        count = BusinessManager.objects.count()
+        response = self.client.post("/business_manager/?expand=owner", {
+            "user_id": self.user.id, "business_pofile_id": self.business.id, "user_type_id": self.user_type.id,
+            "roll_name": "Manager"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(BusinessManager.objects.count(), count)
+
+    def test_queries_do_not_grow_with_managers(self):
+        _, one_manager = self.list_managers("user,business,user_type")
+        for index in range(5):
+            user = CustomUser.objects.create(username=f"manager_{index}")
+            BusinessManager.objects.create(user_id=user, business_pofile_id=self.business,
+                                           user_type_id=self.user_type, roll_name="Manager")
+        managers, six_managers = self.list_managers("user,business,user_type")
+        self.assertEqual(len(managers), 6)
+        self.assertEqual(six_managers, one_manager)
@@ -0,0 +1,97 @@
+import io
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase
+from PIL import Image
+
+from AppUser.images import ProcessPoolImagePipeline, SynchronousImagePipeline, render_variants, variant_key
+from AppUser.models import BusinessProfile
+from AppUser.storage import get_storage
+from .base import PNG_IMAGE, AppUserTestCase
+
+
+def image_bytes(size: tuple, mode: str = "RGB", image_format: str = "PNG") -> bytes:
+    output = io.BytesIO()
+    Image.new(mode, size, "red").save(output, image_format)
+    return output.getvalue()
+
+
+class RenderVariantsTests(SimpleTestCase):
+    """
+    This class checks resizing and encoding of image variants.
+    """
+
+    def test_variants_keep_aspect_ratio_and_are_not_enlarged(self):
+        variants = render_variants(image_bytes((800, 400)), {"thumb": (100, 100), "card": (400, 400),
+                                                             "full": (1600, 1600)}, "JPEG", 80)
+        sizes = {name: Image.open(io.BytesIO(data)).size for name, data in variants.items()}
+        self.assertEqual(sizes, {"thumb": (100, 50), "card": (400, 200), "full": (800, 400)})
+        self.assertTrue(all(Image.open(io.BytesIO(data)).format == "JPEG" for data in variants.values()))
+
+    def test_transparent_image_is_flattened(self):
+        variants = render_variants(PNG_IMAGE, {"thumb": (10, 10)}, "JPEG", 80)
+        self.assertEqual(Image.open(io.BytesIO(variants["thumb"])).mode, "RGB")
+
+    def test_invalid_image(self):
+        with self.assertRaises(Exception):
+            render_variants(b"not an image", {"thumb": (10, 10)}, "JPEG", 80)
+
+    def test_variant_key(self):
+        self.assertEqual(variant_key("business_image/shop.png", "thumb", "JPEG"), "business_image/shop.thumb.jpg")
+        self.assertEqual(variant_key("business_image/shop.png", "card", "WEBP"), "business_image/shop.card.webp")
+
+
+class ImagePipelineTests(AppUserTestCase):
+    """
+    This class checks that variants of an uploaded profile image are saved in storage and on the profile.
+    """
+
+    def test_add_profile_saves_variants(self):
+        image = SimpleUploadedFile("shop.png", image_bytes((1200, 600)), content_type="image/png")
+        response = self.client.post("/business_profile/add_profile/", {
+            "business_name": "Variants", "address": "Street", "business_contact_number": "1", "latitude": "31.52",
+            "longitude": "74.35", "operating_hours": "Daily 24h", "business_profile_image": image},
+            format="multipart")
+        business = BusinessProfile.objects.get(pk=response.data["data"]["id"])
+        self.assertEqual(set(business.image_variants), {"thumb", "card", "full"})
+        storage = get_storage()
+        prefix = storage.base_url.rstrip("/") + "/"
+        for name, url in business.image_variants.items():
+            self.assertTrue(url.endswith(f".{name}.jpg"), url)
+            with Image.open(io.BytesIO(storage.read(url[len(prefix):]))) as variant:
+                self.assertLessEqual(variant.size[0], 1200)
+        # Saved variants invalidate the cached response of the business.
+        self.assertEqual(self.client.get(f"/business_profile/{business.id}/").data["image_variants"],
+                         business.image_variants)
+
+    def add_profile(self, name: str) -> BusinessProfile:
+        image = SimpleUploadedFile("shop.png", image_bytes((600, 300)), content_type="image/png")
+        response = self.client.post("/business_profile/add_profile/", {
+            "business_name": name, "address": "Street", "business_contact_number": "1", "latitude": "31.52",
+            "longitude": "74.35", "operating_hours": "Daily 24h", "business_profile_image": image},
+            format="multipart")
+        return BusinessProfile.objects.get(pk=response.data["data"]["id"])
+
+    def test_uploads_with_same_name_get_own_keys(self):
+        first, second = self.add_profile("First"), self.add_profile("Second")
+        self.assertNotEqual(first.business_profile_image, second.business_profile_image)
+        self.assertNotEqual(first.image_variants["thumb"], second.image_variants["thumb"])
+        self.assertTrue(first.business_profile_image.endswith(".png"))
+
+    def test_variants_of_replaced_image_are_not_saved(self):
+        business = self.add_profile("Replaced")
+        storage = get_storage()
+        old_key = "business_image/old.png"
+        storage.upload(io.BytesIO(image_bytes((300, 300))), old_key, "image/png")
+        # Variants of the old image finish after the profile got the new image.
+        SynchronousImagePipeline().process(BusinessProfile, business.pk, old_key, render_variants)
+        business.refresh_from_db()
+        self.assertFalse(business.image_variants["thumb"].startswith(storage.url("business_image/old.")))
+
+    def test_failed_variants_are_logged(self):
+        pipeline = ProcessPoolImagePipeline()
+        with mock.patch.object(pipeline, "process", side_effect=OSError("storage is down")), \
+                self.assertLogs("AppUser.images", "ERROR") as logs:
+            pipeline._run(BusinessProfile, self.business.pk, "business_image/missing.png")
+        self.assertIn("business_image/missing.png", logs.output[0])
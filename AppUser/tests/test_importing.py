@@ -0,0 +1,80 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+
+from AppUser.management.commands.import_businesses import Command as ImportBusinessesCommand
+from AppUser.models import BusinessOpeningInterval, BusinessProfile, CustomUser, ImportCheckpoint
+from .base import AppUserTestCase
+
+
+class ImportCommandTests(AppUserTestCase):
+    """
+    This class checks import_users and import_businesses commands: invalid and existing records are skipped, derived
+    fields and indexes are filled and an import resumes after its checkpoint.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_import_users(self):
+        users = os.path.join(self.directory, "users.csv")
+        with open(users, "w") as file:
+            file.write("username,email,password\nimported_1,one@dishdash.local,Passw0rd-1\nbudget_user,,x\n"
+                       "bad name!,,x\nimported_2,two@dishdash.local,\n")
+        call_command("import_users", users, chunk_size=2, workers=2, stdout=StringIO(), stderr=StringIO())
+        self.assertTrue(CustomUser.objects.get(username="imported_1").check_password("Passw0rd-1"))
+        self.assertFalse(CustomUser.objects.get(username="imported_2").has_usable_password())
+        self.assertTrue(CustomUser.objects.get(username="budget_user").check_password(self.password))
+        checkpoint = ImportCheckpoint.objects.get(name=f"import_users:{users}")
+        self.assertEqual((checkpoint.records, checkpoint.imported, checkpoint.skipped, checkpoint.finished),
+                         (4, 2, 2, True))
+
+        output = StringIO()
+        call_command("import_users", users, workers=1, stdout=output)
+        self.assertIn("already imported", output.getvalue())
+
+    def write_businesses(self, count: int) -> str:
+        businesses = os.path.join(self.directory, "businesses.ndjson")
+        with open(businesses, "w") as file:
+            for index in range(count):
+                file.write(json.dumps({"business_name": f"Imported {index}", "address": "Mall Road",
+                                       "business_contact_number": "1", "latitude": "31.52", "longitude": "74.35",
+                                       "operating_hours": "Daily 24h"}) + "\n")
+        return businesses
+
+    def test_import_businesses_resumes_after_checkpoint(self):
+        businesses = self.write_businesses(3)
+        ImportCheckpoint.objects.create(name=f"import_businesses:{businesses}", records=1, imported=1)
+        call_command("import_businesses", businesses, stdout=StringIO())
+        imported = BusinessProfile.objects.filter(business_name__startswith="Imported")
+        self.assertEqual(sorted(imported.values_list("business_name", flat=True)), ["Imported 1", "Imported 2"])
+        self.assertEqual(imported.exclude(geohash=None).count(), 2)
+        self.assertEqual(BusinessOpeningInterval.objects.filter(business__in=imported).count(), 2)
+        response = self.client.get("/business_profile/search/", {"q": "imported"})
+        self.assertEqual(len(response.data["data"]), 2)
+
+    def test_failed_chunk_does_not_move_checkpoint(self):
+        businesses = self.write_businesses(4)
+        original_write = ImportBusinessesCommand.write
+
+        def write_then_fail(command, instances):
+            if instances[0].business_name == "Imported 2":
+                raise RuntimeError("connection lost")
+            return original_write(command, instances)
+
+        with mock.patch.object(ImportBusinessesCommand, "write", write_then_fail):
+            with self.assertRaises(RuntimeError):
+                call_command("import_businesses", businesses, chunk_size=2, stdout=StringIO())
+        checkpoint = ImportCheckpoint.objects.get(name=f"import_businesses:{businesses}")
+        self.assertEqual((checkpoint.records, checkpoint.imported, checkpoint.finished), (2, 2, False))
+
+        call_command("import_businesses", businesses, chunk_size=2, stdout=StringIO())
+        self.assertEqual(sorted(BusinessProfile.objects.filter(business_name__startswith="Imported").values_list(
+            "business_name", flat=True)), [f"Imported {index}" for index in range(4)])
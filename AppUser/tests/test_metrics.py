@@ -0,0 +1,23 @@
+from django.test import SimpleTestCase, override_settings
+
+
+class MetricsViewTests(SimpleTestCase):
+    """
+    This class checks that /metrics is only served to allowed IP addresses and to requests with the metrics token.
+    """
+
+    @override_settings(METRICS_ALLOWED_IPS=["127.0.0.1"], METRICS_TOKEN="")
+    def test_allowed_ip(self):
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"dishdash_requests_in_progress", response.content)
+        self.assertEqual(self.client.get("/metrics", REMOTE_ADDR="10.0.0.9").status_code, 403)
+        # Forwarded address is not trusted.
+        self.assertEqual(self.client.get("/metrics", REMOTE_ADDR="10.0.0.9",
+                                         HTTP_X_FORWARDED_FOR="127.0.0.1").status_code, 403)
+
+    @override_settings(METRICS_ALLOWED_IPS=[], METRICS_TOKEN="scrape-secret")
+    def test_token(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 403)
+        self.assertEqual(self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer wrong").status_code, 403)
+        self.assertEqual(self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer scrape-secret").status_code, 200)
@@ -0,0 +1,13 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+
+class MigrationTests(TestCase):
+    """
+    This class checks that migrations of AppUser match its models, so tests and deployments create the same schema.
+    """
+
+    def test_models_have_migrations(self):
+        call_command("makemigrations", "AppUser", check=True, dry_run=True, stdout=StringIO())
@@ -0,0 +1,85 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from AppUser.geo import bounding_box, encode_geohash, haversine_km, parse_coordinate
+from AppUser.models import BusinessProfile
+from .base import AppUserTestCase
+
+
+class GeoTests(SimpleTestCase):
+    """
+    This class checks coordinate parsing, geohash encoding, distance and bounding box helpers.
+    """
+
+    def test_parse_coordinate(self):
+        self.assertEqual(parse_coordinate("31.52", 90.0), 31.52)
+        for value in (None, "", "north", "nan", "91", -181):
+            self.assertIsNone(parse_coordinate(value, 90.0 if value != -181 else 180.0))
+
+    def test_encode_geohash(self):
+        # Reference value of the geohash algorithm.
+        self.assertEqual(encode_geohash(57.64911, 10.40744, 11), "u4pruydqqvj")
+        self.assertTrue(encode_geohash(31.5201, 74.3501).startswith(encode_geohash(31.52, 74.35, 6)))
+
+    def test_haversine_km(self):
+        self.assertAlmostEqual(haversine_km(0, 0, 0, 1), 111.195, places=2)
+        self.assertEqual(haversine_km(31.52, 74.35, 31.52, 74.35), 0.0)
+
+    def test_bounding_box_crosses_anti_meridian(self):
+        min_latitude, max_latitude, min_longitude, max_longitude = bounding_box(0, 179.99, 10)
+        self.assertLess(min_latitude, 0)
+        self.assertGreater(max_latitude, 0)
+        self.assertGreater(max_longitude, 180)
+
+
+class NearbyBusinessTests(AppUserTestCase):
+    """
+    This class checks /business_profile/nearby/ returns businesses inside the radius, nearest first, with distance.
+    """
+
+    def setUp(self):
+        super().setUp()
+        # Budget business of the fixtures is at 31.52, 74.35. 0.01 degree of latitude is about 1.11 km.
+        for name, latitude, longitude in [("Two Km", "31.538", "74.35"), ("One Km", "31.529", "74.35"),
+                                          ("Far Away", "31.70", "74.35"), ("Other Side", "-31.52", "-105.65")]:
+            BusinessProfile.objects.create(business_name=name, address="Street", business_contact_number="1",
+                                           latitude=latitude, longitude=longitude, operating_hours="Daily 24h")
+
+    def nearby(self, **params) -> list:
+        response = self.client.get("/business_profile/nearby/", params)
+        self.assertEqual(response.status_code, 200)
+        return [(business["business_name"], business["distance_km"]) for business in response.data["data"]]
+
+    def test_sorted_by_distance_within_radius(self):
+        businesses = self.nearby(lat="31.52", lng="74.35", radius="5")
+        self.assertEqual([name for name, distance in businesses], ["Budget", "One Km", "Two Km"])
+        self.assertEqual(businesses[0][1], 0.0)
+        self.assertAlmostEqual(businesses[1][1], 1.001, places=2)
+        self.assertAlmostEqual(businesses[2][1], 2.002, places=2)
+
+        self.assertEqual([name for name, distance in self.nearby(lat="31.52", lng="74.35", radius="1.5")],
+                         ["Budget", "One Km"])
+        self.assertEqual(len(self.nearby(lat="31.52", lng="74.35", radius="50")), 4)
+        self.assertEqual([name for name, distance in self.nearby(lat="31.52", lng="74.35", limit="1")], ["Budget"])
+
+    def test_moved_business_is_found_at_new_location(self):
+        self.client.patch(f"/business_profile/{self.business.id}/", {"latitude": "-31.52", "longitude": "-105.65"})
+        self.assertEqual(sorted(name for name, distance in self.nearby(lat="-31.52", lng="-105.65")),
+                         ["Budget", "Other Side"])
+
+    def test_invalid_parameters(self):
+        for params in ({"lat": "31.52"}, {"lat": "95", "lng": "74.35"}, {"lat": "31.52", "lng": "74.35", "radius": 0},
+                       {"lat": "31.52", "lng": "74.35", "radius": 500}, {"lat": "31.52", "lng": "74.35", "limit": "x"}):
+            response = self.client.get("/business_profile/nearby/", params)
+            self.assertEqual(response.status_code, 400, params)
+
+    def test_backfill_geo(self):
+        # Rows saved before the geo columns were added.
+        BusinessProfile.objects.update(geo_latitude=None, geo_longitude=None, geohash=None)
+        self.assertEqual(self.nearby(lat="31.52", lng="74.35"), [])
+        call_command("backfill_geo", batch_size=2, stdout=StringIO())
+        self.assertEqual([name for name, distance in self.nearby(lat="31.52", lng="74.35", radius="5")],
+                         ["Budget", "One Km", "Two Km"])
+        self.assertEqual(BusinessProfile.objects.get(business_name="Other Side").geohash[:1], "3")
@@ -0,0 +1,122 @@
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from AppUser.notifications import ThreadedNotificationQueue
+from .base import AppUserTestCase
+
+
+class StubEmailConnection:
+    """
+    This class is an email backend connection stub, send_messages fails while failures is more than 0 and always fails
+    for bounced recipients. Every attempt is recorded in attempts.
+    """
+
+    def __init__(self, outbox: list, failures: list, bounced: set = (), attempts: list = None):
+        self.outbox = outbox
+        self.failures = failures
+        self.bounced = bounced
+        self.attempts = attempts if attempts is not None else []
+        self.closed = False
+
+    def open(self):
+        pass
+
+    def send_messages(self, messages):
+        self.attempts.extend(message.subject for message in messages)
+        if self.failures[0] > 0 or any(to in self.bounced for message in messages for to in message.to):
+            self.failures[0] = max(self.failures[0] - 1, 0)
+            raise OSError("connection dropped")
+        self.outbox.extend((self, message.subject) for message in messages)
+
+    def close(self):
+        self.closed = True
+
+
+class ThreadedNotificationQueueTests(SimpleTestCase):
+    """
+    This class checks that worker thread sends batches over one connection, retries failed messages with exponential
+    backoff without holding back the next messages and that enqueue refuses messages when queue is full.
+    """
+
+    def setUp(self):
+        self.outbox = []
+        self.failures = [0]
+        self.bounced = set()
+        self.attempts = []
+        self.connections = []
+        patcher = mock.patch("AppUser.notifications.get_connection", side_effect=self.get_connection)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get_connection(self, fail_silently=False):
+        self.connections.append(StubEmailConnection(self.outbox, self.failures, self.bounced, self.attempts))
+        return self.connections[-1]
+
+    def enqueue_without_worker(self, notification_queue: ThreadedNotificationQueue, count: int) -> list:
+        with mock.patch.object(notification_queue, "_ensure_worker"):
+            return [notification_queue.enqueue(f"Mail {index}", "Body", ["to@dishdash.local"])
+                    for index in range(count)]
+
+    def test_batches_share_one_connection(self):
+        notification_queue = ThreadedNotificationQueue(batch_size=2, idle_timeout=0.05)
+        self.enqueue_without_worker(notification_queue, 5)
+        notification_queue._ensure_worker()
+        notification_queue.flush()
+        self.assertEqual([subject for _, subject in self.outbox], [f"Mail {index}" for index in range(5)])
+        self.assertEqual(len(self.connections), 1)
+        # Connection is closed when queue is idle for idle_timeout.
+        deadline = time.monotonic() + 5
+        while not self.connections[0].closed and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertTrue(self.connections[0].closed)
+
+    def test_failed_send_is_retried(self):
+        self.failures[0] = 2
+        notification_queue = ThreadedNotificationQueue(max_retries=3, retry_backoff=0.01, idle_timeout=0.05)
+        with self.assertLogs("AppUser.notifications", "WARNING") as logs:
+            notification_queue.enqueue("Mail", "Body", ["to@dishdash.local"])
+            notification_queue.flush()
+        self.assertEqual([subject for _, subject in self.outbox], ["Mail"])
+        # Connection is opened again before every retry.
+        self.assertEqual(len(self.connections), 3)
+        self.assertEqual(len(logs.records), 2)
+
+    def test_retry_delay_backs_off_exponentially(self):
+        notification_queue = ThreadedNotificationQueue(max_retries=2, retry_backoff=0.5)
+        email_message = notification_queue.build_message("Mail", "Body", ["to@dishdash.local"])
+        with self.assertLogs("AppUser.notifications", "WARNING"):
+            delays = [notification_queue.retry_delay(email_message, attempt, OSError()) for attempt in range(3)]
+        self.assertEqual(delays, [0.5, 1.0, None])
+
+    def test_failed_message_does_not_hold_back_queue(self):
+        self.bounced.add("bounce@dishdash.local")
+        notification_queue = ThreadedNotificationQueue(max_retries=1, retry_backoff=0.2, idle_timeout=0.05)
+        with self.assertLogs("AppUser.notifications", "WARNING") as logs:
+            notification_queue.enqueue("Bounced", "Body", ["bounce@dishdash.local"])
+            notification_queue.enqueue("Mail", "Body", ["to@dishdash.local"])
+            notification_queue.flush()
+        # Mail is sent while Bounced waits for its retry.
+        self.assertEqual(self.attempts, ["Bounced", "Mail", "Bounced"])
+        self.assertEqual([subject for _, subject in self.outbox], ["Mail"])
+        # Message is dropped after max_retries with an error naming the recipient.
+        self.assertEqual([record.levelname for record in logs.records], ["WARNING", "ERROR"])
+        self.assertIn("bounce@dishdash.local", logs.output[-1])
+
+    def test_full_queue_refuses_message(self):
+        notification_queue = ThreadedNotificationQueue(max_queue_size=2)
+        self.assertEqual(self.enqueue_without_worker(notification_queue, 3), [True, True, False])
+
+
+class OTPEmailQueueTests(AppUserTestCase):
+    """
+    This class checks that OTP email which can not be queued is logged.
+    """
+
+    def test_full_queue_is_logged(self):
+        with mock.patch("AppUser.views.enqueue_email", return_value=False), \
+                self.assertLogs("AppUser.views", "ERROR") as logs:
+            response = self.client.post("/otp/new_email_otp/", {"user_id": self.user.id, "email": "otp@dishdash.local"})
+        self.assertEqual(response.status_code, 201)
+        self.assertIn("otp@dishdash.local", logs.output[0])
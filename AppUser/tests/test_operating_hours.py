@@ -0,0 +1,96 @@
+from datetime import datetime
+
+from django.test import SimpleTestCase
+
+from AppUser.models import BusinessOpeningInterval, BusinessProfile
+from AppUser.operating_hours import MINUTES_PER_DAY, MINUTES_PER_WEEK, minute_of_week, parse_operating_hours, \
+    schedule_intervals
+from .base import AppUserTestCase
+
+
+class OperatingHoursParserTests(SimpleTestCase):
+    """
+    This class checks parsing of operating hours text and its conversion into minute of week intervals.
+    """
+
+    def test_parse_operating_hours(self):
+        schedule = parse_operating_hours("Mon-Fri 9am-10pm; Sat 10:00-14:00, 18:00-02:00; Sun closed")
+        self.assertEqual(schedule["mon"], [["09:00", "22:00"]])
+        self.assertEqual(schedule["sat"], [["10:00", "14:00"], ["18:00", "02:00"]])
+        self.assertEqual(schedule["sun"], [])
+        self.assertEqual(parse_operating_hours("Daily 24h")["wed"], [["00:00", "24:00"]])
+        # Later clause replaces earlier hours, day ranges wrap around the week.
+        schedule = parse_operating_hours("Daily 09:00-17:00; Fri-Mon 12:00-13:00")
+        self.assertEqual([day for day, hours in schedule.items() if hours == [["12:00", "13:00"]]],
+                         ["mon", "fri", "sat", "sun"])
+        for text in ("", "Mon 25:00-26:00", "Funday 09:00-10:00", "Mon 09:00-09:00", "Mon 13pm-2pm"):
+            with self.assertRaises(ValueError, msg=text):
+                parse_operating_hours(text)
+
+    def test_overnight_hours_close_next_day(self):
+        intervals = schedule_intervals(parse_operating_hours("Sat 20:00-03:00"))
+        saturday = 5 * MINUTES_PER_DAY
+        self.assertEqual(intervals, [(saturday + 20 * 60, saturday + MINUTES_PER_DAY + 3 * 60)])
+
+    def test_sunday_night_wraps_to_monday(self):
+        intervals = schedule_intervals(parse_operating_hours("Sun 22:00-02:00"))
+        self.assertEqual(intervals, [(0, 2 * 60), (6 * MINUTES_PER_DAY + 22 * 60, MINUTES_PER_WEEK)])
+
+    def test_overlapping_ranges_are_merged(self):
+        intervals = schedule_intervals(parse_operating_hours("Mon 09:00-14:00, 12:00-18:00; Tue 00:00-24:00; "
+                                                             "Wed 00:00-01:00"))
+        self.assertEqual(intervals, [(9 * 60, 18 * 60), (MINUTES_PER_DAY, 2 * MINUTES_PER_DAY + 60)])
+
+    def test_minute_of_week(self):
+        # 2024-01-01 is a Monday.
+        self.assertEqual(minute_of_week(datetime(2024, 1, 1, 0, 0)), 0)
+        self.assertEqual(minute_of_week(datetime(2024, 1, 7, 23, 59)), MINUTES_PER_WEEK - 1)
+
+
+class OpenAtFilterTests(AppUserTestCase):
+    """
+    This class checks ?open_at= filter of business profile list, including hours which pass midnight and Sunday
+    night hours which end on Monday.
+    """
+
+    def open_at(self, moment: str) -> list:
+        response = self.client.get("/business_profile/", {"open_at": moment})
+        return sorted(business["business_name"] for business in response.data["results"])
+
+    def test_open_at(self):
+        night = BusinessProfile.objects.create(business_name="Night", address="Street", business_contact_number="1",
+                                               latitude="31.52", longitude="74.35",
+                                               operating_hours="Fri-Sat 20:00-03:00; Sun closed")
+        self.assertEqual(night.operating_schedule["fri"], [["20:00", "03:00"]])
+        self.assertEqual(BusinessOpeningInterval.objects.filter(business=night).count(), 2)
+
+        # 2024-01-06 is a Saturday.
+        self.assertEqual(self.open_at("2024-01-06T01:30:00"), ["Night"])
+        self.assertEqual(self.open_at("2024-01-06T12:00:00"), ["Budget"])
+        self.assertEqual(self.open_at("2024-01-06T21:00:00"), ["Budget", "Night"])
+        # Saturday 20:00-03:00 is still open at Sunday 02:00 although Sunday itself is closed.
+        self.assertEqual(self.open_at("2024-01-07T02:00:00"), ["Night"])
+        self.assertEqual(self.open_at("2024-01-07T03:00:00"), [])
+        self.assertEqual(self.open_at("2024-01-08T02:00:00"), [])
+
+    def test_open_at_wraps_around_the_week(self):
+        BusinessProfile.objects.create(business_name="Sunday Club", address="Street", business_contact_number="1",
+                                       latitude="31.52", longitude="74.35", operating_hours="Sun 22:00-02:00")
+        # 2024-01-07 is a Sunday and 2024-01-08 is the Monday after it.
+        self.assertEqual(self.open_at("2024-01-07T23:00:00"), ["Sunday Club"])
+        self.assertEqual(self.open_at("2024-01-08T01:00:00"), ["Sunday Club"])
+        self.assertEqual(self.open_at("2024-01-08T02:30:00"), [])
+        # Time with offset is converted into BUSINESS_HOURS_TIME_ZONE (UTC) before the lookup, Monday 06:00 at
+        # +05:00 is Monday 01:00 UTC.
+        self.assertEqual(self.open_at("2024-01-08T06:00:00+05:00"), ["Sunday Club"])
+
+    def test_schedule_changes_update_intervals(self):
+        self.client.patch(f"/business_profile/{self.business.id}/", {"operating_hours": "Mon 09:00-10:00"})
+        self.assertEqual(list(BusinessOpeningInterval.objects.filter(business=self.business).values_list(
+            "start_minute", "end_minute")), [(9 * 60, 10 * 60)])
+        self.assertEqual(self.open_at("2024-01-06T12:00:00"), [])
+
+    def test_invalid_values(self):
+        self.assertEqual(self.client.get("/business_profile/", {"open_at": "noon"}).status_code, 400)
+        response = self.client.patch(f"/business_profile/{self.business.id}/", {"operating_hours": "Mon 25:00"})
+        self.assertEqual(response.status_code, 400)
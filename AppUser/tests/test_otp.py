@@ -0,0 +1,148 @@
+import re
+import threading
+from datetime import timedelta
+from unittest import mock
+
+from django.core import mail
+from django.db.models import QuerySet
+from django.test import SimpleTestCase, override_settings
+from django.utils import timezone
+
+from AppUser.checks import check_otp_cache
+from AppUser.models import OTPVerification
+from AppUser.otp import EMAIL_CHANNEL, OTP_MATCHED, OTP_MISMATCH, OTP_NOT_FOUND, SMS_CHANNEL, CacheOTPBackend, \
+    DatabaseOTPBackend
+from .base import AppUserTestCase
+
+
+class OTPEndpointTests(AppUserTestCase):
+    """
+    This class checks the issue -> verify flow of email OTP endpoints, OTP is read from the sent email.
+    """
+
+    def new_email_otp(self) -> str:
+        mail.outbox = []
+        response = self.client.post("/otp/new_email_otp/", {"user_id": self.user.id, "email": "otp@dishdash.local"})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(mail.outbox[0].to, ["otp@dishdash.local"])
+        return re.search(r"\d{6}", mail.outbox[0].body).group()
+
+    def verify(self, otp: str) -> int:
+        return self.client.post("/otp/verify_email_otp/", {"user_id": self.user.id, "otp": otp}).status_code
+
+    def test_otp_can_be_used_once(self):
+        otp = self.new_email_otp()
+        wrong = "000000" if otp != "000000" else "111111"
+        self.assertEqual(self.verify(wrong), 404)
+        self.assertEqual(self.verify(otp), 200)
+        self.assertEqual(self.verify(otp), 400)
+
+    def test_new_otp_replaces_previous(self):
+        first = self.new_email_otp()
+        second = self.new_email_otp()
+        if first != second:
+            self.assertEqual(self.verify(first), 404)
+        self.assertEqual(self.verify(second), 200)
+
+    def test_invalid_requests(self):
+        self.assertEqual(self.client.post("/otp/new_email_otp/", {"user_id": self.user.id}).status_code, 400)
+        response = self.client.post("/otp/new_email_otp/", {"user_id": 10 ** 6, "email": "otp@dishdash.local"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.post("/otp/verify_sms_otp/", {"user_id": self.user.id, "otp": "1"}).status_code,
+                         400)
+
+
+class CacheOTPBackendTests(AppUserTestCase):
+    """
+    This class checks that cache OTP is consumed once, also when it is verified concurrently, and is discarded after
+    max_attempts wrong attempts.
+    """
+
+    def test_concurrent_verify_matches_once(self):
+        backend = CacheOTPBackend()
+        otp = backend.issue(SMS_CHANNEL, self.user.id)
+        barrier = threading.Barrier(8)
+        results = []
+
+        def verify():
+            barrier.wait()
+            results.append(backend.verify(SMS_CHANNEL, self.user.id, otp))
+
+        threads = [threading.Thread(target=verify) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results.count(OTP_MATCHED), 1)
+        self.assertEqual(results.count(OTP_NOT_FOUND), 7)
+
+    def test_otp_is_discarded_after_max_attempts(self):
+        backend = CacheOTPBackend(max_attempts=3)
+        otp = backend.issue(EMAIL_CHANNEL, self.user.id)
+        wrong = "000000" if otp != "000000" else "111111"
+        for _ in range(3):
+            self.assertEqual(backend.verify(EMAIL_CHANNEL, self.user.id, wrong), OTP_MISMATCH)
+        self.assertEqual(backend.verify(EMAIL_CHANNEL, self.user.id, otp), OTP_NOT_FOUND)
+
+    def test_channels_and_users_are_separate(self):
+        backend = CacheOTPBackend()
+        email_otp = backend.issue(EMAIL_CHANNEL, self.user.id)
+        backend.issue(SMS_CHANNEL, self.user.id)
+        self.assertEqual(backend.verify(EMAIL_CHANNEL, self.other_user.id, email_otp), OTP_NOT_FOUND)
+        self.assertEqual(backend.verify(EMAIL_CHANNEL, self.user.id, email_otp), OTP_MATCHED)
+
+    def test_audit_rows(self):
+        backend = CacheOTPBackend(audit=True)
+        otp = backend.issue(EMAIL_CHANNEL, self.user.id)
+        self.assertTrue(OTPVerification.objects.filter(user_id=self.user, otp_str=otp, is_expired=False).exists())
+        backend.verify(EMAIL_CHANNEL, self.user.id, otp)
+        self.assertTrue(OTPVerification.objects.get(user_id=self.user, otp_str=otp).is_expired)
+
+
+class DatabaseOTPBackendTests(AppUserTestCase):
+    """
+    This class checks that database OTP is consumed once and expires.
+    """
+
+    def test_otp_can_be_used_once(self):
+        backend = DatabaseOTPBackend()
+        otp = backend.issue(EMAIL_CHANNEL, self.user.id)
+        self.assertEqual(backend.verify(EMAIL_CHANNEL, self.user.id, otp), OTP_MATCHED)
+        self.assertEqual(backend.verify(EMAIL_CHANNEL, self.user.id, otp), OTP_NOT_FOUND)
+
+    def test_otp_consumed_by_other_request_is_not_matched(self):
+        backend = DatabaseOTPBackend()
+        otp = backend.issue(EMAIL_CHANNEL, self.user.id)
+        # Another request consumes the OTP between our read and conditional update.
+        original_last = QuerySet.last
+
+        def last_then_consume(queryset):
+            row = original_last(queryset)
+            OTPVerification.objects.filter(pk=row.pk).update(is_expired=True)
+            return row
+
+        with mock.patch.object(QuerySet, "last", last_then_consume):
+            result = backend.verify(EMAIL_CHANNEL, self.user.id, otp)
+        self.assertEqual(result, OTP_NOT_FOUND)
+
+    def test_expired_otp(self):
+        backend = DatabaseOTPBackend()
+        otp = backend.issue(EMAIL_CHANNEL, self.user.id)
+        OTPVerification.objects.filter(otp_str=otp).update(expired_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(backend.verify(EMAIL_CHANNEL, self.user.id, otp), OTP_NOT_FOUND)
+
+
+class OTPCacheCheckTests(SimpleTestCase):
+    """
+    This class checks that cache OTP backend is rejected with a per process cache.
+    """
+    locmem = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    redis = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": "redis://cache"}}
+
+    def test_check(self):
+        with override_settings(OTP_BACKEND="AppUser.otp.CacheOTPBackend", OTP_CACHE="default", CACHES=self.locmem):
+            self.assertEqual([error.id for error in check_otp_cache(None)], ["AppUser.E001"])
+        with override_settings(OTP_BACKEND="AppUser.otp.CacheOTPBackend", OTP_CACHE="default", CACHES=self.redis):
+            self.assertEqual(check_otp_cache(None), [])
+        with override_settings(OTP_BACKEND="AppUser.otp.DatabaseOTPBackend", CACHES=self.locmem):
+            self.assertEqual(check_otp_cache(None), [])
@@ -0,0 +1,57 @@
+from base64 import urlsafe_b64encode
+from datetime import timedelta
+
+from django.test import override_settings
+from django.utils import timezone
+
+from AppUser.models import CustomUser
+from .base import AppUserTestCase
+
+
+class KeysetCursorPaginationTests(AppUserTestCase):
+    """
+    This class checks that list pages follow (created_at, id) newest first in both directions, rows with the same
+    created_at are neither skipped nor repeated and invalid cursors are rejected.
+    """
+
+    def setUp(self):
+        super().setUp()
+        created_at = timezone.now() - timedelta(days=1)
+        CustomUser.objects.bulk_create([CustomUser(username=f"page_{index}", created_at=created_at)
+                                        for index in range(5)])
+        self.expected = list(CustomUser.objects.order_by("-created_at", "-id").values_list("id", flat=True))
+
+    def page(self, url: str) -> tuple:
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return [user["id"] for user in response.data["results"]], response.data["next"], response.data["previous"]
+
+    def test_forward_and_backward(self):
+        pages = []
+        url = "/user/?page_size=3"
+        while url:
+            ids, url, previous = self.page(url)
+            pages.append(ids)
+        self.assertEqual([user_id for ids in pages for user_id in ids], self.expected)
+        self.assertEqual([len(ids) for ids in pages], [3, 3, 1])
+
+        # Walking back from the last page gives the same pages.
+        back = [pages[-1]]
+        while previous:
+            ids, _, previous = self.page(previous)
+            back.insert(0, ids)
+        self.assertEqual(back, pages)
+
+    def test_first_page_has_no_previous_link(self):
+        ids, next_link, previous = self.page("/user/?page_size=10")
+        self.assertEqual((ids, next_link, previous), (self.expected, None, None))
+
+    @override_settings(PAGINATION_MAX_PAGE_SIZE=2)
+    def test_page_size_is_limited(self):
+        self.assertEqual(len(self.page("/user/?page_size=100")[0]), 2)
+
+    def test_invalid_cursor(self):
+        for cursor in ("not-base64!", urlsafe_b64encode(b"0|yesterday|1").decode(),
+                       urlsafe_b64encode(b"0|2024-01-01T00:00:00+00:00").decode(),
+                       urlsafe_b64encode(b"\xff\xfe").decode()):
+            self.assertEqual(self.client.get("/user/", {"cursor": cursor}).status_code, 404, cursor)
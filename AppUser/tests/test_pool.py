@@ -0,0 +1,142 @@
+import threading
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from DishDash.db.mysql_pool.pool import ConnectionPool, PoolTimeout
+
+
+class StubConnection:
+    """
+    This class is a DB-API connection stub which records calls, ping / rollback fail when told so.
+    """
+
+    def __init__(self, number: int):
+        self.number = number
+        self.closed = False
+        self.rollbacks = 0
+        self.ping_fails = False
+        self.rollback_fails = False
+
+    def ping(self):
+        if self.ping_fails:
+            raise OSError("server has gone away")
+
+    def rollback(self):
+        if self.rollback_fails:
+            raise OSError("server has gone away")
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    """
+    This class checks ConnectionPool with a stub connection factory: connections are reused, rolled back on checkin,
+    replaced when old, dead or inherited from parent process, and checkout waits then times out when pool is full.
+    """
+
+    def setUp(self):
+        self.opened = []
+
+    def connect(self) -> StubConnection:
+        connection = StubConnection(len(self.opened) + 1)
+        self.opened.append(connection)
+        return connection
+
+    def pool(self, **options) -> ConnectionPool:
+        return ConnectionPool(self.connect, **dict({"max_size": 2, "max_overflow": 0, "timeout": 0.05}, **options))
+
+    def test_connection_is_reused_and_rolled_back(self):
+        pool = self.pool()
+        first = pool.checkout()
+        first.close()
+        first.close()
+        self.assertEqual(self.opened[0].rollbacks, 1)
+        second = pool.checkout()
+        self.assertIs(second._connection, self.opened[0])
+        self.assertEqual(len(self.opened), 1)
+        self.assertEqual((pool.size, pool.idle), (1, 0))
+
+    def test_failed_rollback_discards_connection(self):
+        pool = self.pool()
+        pooled = pool.checkout()
+        self.opened[0].rollback_fails = True
+        pooled.close()
+        self.assertTrue(self.opened[0].closed)
+        self.assertEqual((pool.size, pool.idle), (0, 0))
+
+    def test_exhausted_pool_times_out(self):
+        pool = self.pool()
+        first, second = pool.checkout(), pool.checkout()
+        with self.assertRaises(PoolTimeout):
+            pool.checkout()
+        second.close()
+        self.assertIs(pool.checkout()._connection, self.opened[1])
+        first.close()
+
+    def test_waiting_checkout_gets_returned_connection(self):
+        pool = self.pool(max_size=1, timeout=5)
+        pooled = pool.checkout()
+        result = []
+        waiter = threading.Thread(target=lambda: result.append(pool.checkout()))
+        waiter.start()
+        pooled.close()
+        waiter.join(5)
+        self.assertIs(result[0]._connection, self.opened[0])
+
+    def test_overflow_connection_is_closed_on_checkin(self):
+        pool = self.pool(max_size=1, max_overflow=1)
+        first, second = pool.checkout(), pool.checkout()
+        second.close()
+        self.assertTrue(self.opened[1].closed)
+        first.close()
+        self.assertFalse(self.opened[0].closed)
+        self.assertEqual((pool.size, pool.idle), (1, 1))
+
+    @mock.patch("DishDash.db.mysql_pool.pool.time")
+    def test_old_connection_is_recycled(self, time):
+        time.monotonic.return_value = 100.0
+        pool = self.pool(recycle=60)
+        pool.checkout().close()
+        time.monotonic.return_value = 161.0
+        self.assertIs(pool.checkout()._connection, self.opened[1])
+        self.assertTrue(self.opened[0].closed)
+        self.assertEqual(pool.size, 1)
+
+    def test_dead_connection_is_replaced(self):
+        pool = self.pool()
+        pool.checkout().close()
+        self.opened[0].ping_fails = True
+        self.assertIs(pool.checkout()._connection, self.opened[1])
+        self.assertTrue(self.opened[0].closed)
+
+    def test_failed_connect_frees_slot(self):
+        pool = ConnectionPool(mock.Mock(side_effect=OSError("refused")), max_size=1, max_overflow=0, timeout=0.05)
+        for _ in range(2):
+            with self.assertRaises(OSError):
+                pool.checkout()
+        self.assertEqual(pool.size, 0)
+
+    @mock.patch("DishDash.db.mysql_pool.pool.os")
+    def test_connections_of_parent_process_are_not_used(self, os):
+        os.getpid.return_value = 1
+        pool = self.pool()
+        pool.checkout().close()
+        parent_checked_out = pool.checkout()
+        # Forked worker opens its own connections and does not close sockets shared with parent process.
+        os.getpid.return_value = 2
+        self.assertIs(pool.checkout()._connection, self.opened[1])
+        parent_checked_out.close()
+        self.assertEqual((pool.size, pool.idle), (1, 0))
+        self.assertFalse(self.opened[0].closed)
+        self.assertEqual(self.opened[0].rollbacks, 1)
+
+    def test_prewarm(self):
+        pool = self.pool(min_size=2)
+        pool.prewarm()
+        self.assertEqual((len(self.opened), pool.size, pool.idle), (2, 2, 2))
+        pool.close_all()
+        self.assertTrue(all(connection.closed for connection in self.opened))
+        self.assertEqual(pool.size, 0)
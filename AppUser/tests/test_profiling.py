@@ -0,0 +1,55 @@
+import os
+import shutil
+import tempfile
+
+from django.core import signing
+from django.test import SimpleTestCase, override_settings
+
+from AppUser.profiling import PROFILING_TOKEN_SALT, create_profiling_token, is_valid_profiling_token
+from .base import AppUserTestCase
+
+
+class ProfilingTokenTests(SimpleTestCase):
+
+    def test_token(self):
+        self.assertTrue(is_valid_profiling_token(create_profiling_token()))
+        self.assertFalse(is_valid_profiling_token("forged"))
+        self.assertFalse(is_valid_profiling_token(signing.dumps("profile", salt="other")))
+        with override_settings(PROFILING_TOKEN_MAX_AGE=-1):
+            self.assertFalse(is_valid_profiling_token(signing.dumps("profile", salt=PROFILING_TOKEN_SALT)))
+
+
+class ProfilingMiddlewareTests(AppUserTestCase):
+    """
+    This class checks that only sampled requests and requests with a valid profiling header are profiled.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.output_dir)
+
+    def profiled_get(self, mode: str, token: str = None):
+        headers = {"HTTP_X_PROFILE_TOKEN": token} if token else {}
+        with override_settings(PROFILING_ENABLED=True, PROFILING_MODE=mode, PROFILING_OUTPUT_DIR=self.output_dir,
+                               PROFILING_SAMPLER_INTERVAL=0.001):
+            return self.client.get("/business_manager/", **headers)
+
+    def test_request_with_token_is_profiled(self):
+        for mode, extension in (("cprofile", ".pstats"), ("sampler", ".collapsed")):
+            response = self.profiled_get(mode, create_profiling_token())
+            name = response["X-Profile-File"]
+            self.assertTrue(name.startswith("BusinessManagerViewSet.list-"), name)
+            self.assertTrue(name.endswith(extension), name)
+            self.assertTrue(os.path.isfile(os.path.join(self.output_dir, name)))
+
+    def test_request_without_valid_token_is_not_profiled(self):
+        self.assertNotIn("X-Profile-File", self.profiled_get("cprofile", "forged"))
+        self.assertNotIn("X-Profile-File", self.profiled_get("cprofile"))
+        self.assertEqual(os.listdir(self.output_dir), [])
+
+    @override_settings(PROFILING_SAMPLE_RATE=1.0)
+    def test_sampled_request_is_profiled_without_header(self):
+        response = self.profiled_get("cprofile")
+        self.assertNotIn("X-Profile-File", response)
+        self.assertEqual(len(os.listdir(self.output_dir)), 1)
@@ -0,0 +1,40 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.utils import timezone
+
+from AppUser.models import OTPVerification, SMSOTPVerification
+from .base import AppUserTestCase
+
+
+class PurgeOTPsTests(AppUserTestCase):
+    """
+    This class checks that purge_otps expires OTPs older than TTL and deletes OTPs older than retention period.
+    """
+
+    def create_otp(self, model, age: timedelta):
+        otp = model.objects.create(user_id=self.user, otp_str="123456")
+        model.objects.filter(pk=otp.pk).update(created_at=timezone.now() - age)
+        return otp
+
+    def test_purge(self):
+        fresh = self.create_otp(OTPVerification, timedelta(seconds=10))
+        stale = self.create_otp(OTPVerification, timedelta(hours=1))
+        old = self.create_otp(OTPVerification, timedelta(days=8))
+        old_sms = self.create_otp(SMSOTPVerification, timedelta(days=8))
+
+        output = StringIO()
+        call_command("purge_otps", batch_size=1, ttl_seconds=300, retention_days=7, stdout=output)
+        self.assertFalse(OTPVerification.objects.get(pk=fresh.pk).is_expired)
+        self.assertTrue(OTPVerification.objects.get(pk=stale.pk).is_expired)
+        self.assertFalse(OTPVerification.all_objects.filter(pk=old.pk).exists())
+        self.assertFalse(SMSOTPVerification.all_objects.filter(pk=old_sms.pk).exists())
+        self.assertIn("deleted 1 rows", output.getvalue())
+
+    def test_single_channel(self):
+        old_sms = self.create_otp(SMSOTPVerification, timedelta(days=8))
+        old_email = self.create_otp(OTPVerification, timedelta(days=8))
+        call_command("purge_otps", channel="email", stdout=StringIO())
+        self.assertTrue(SMSOTPVerification.all_objects.filter(pk=old_sms.pk).exists())
+        self.assertFalse(OTPVerification.all_objects.filter(pk=old_email.pk).exists())
@@ -0,0 +1,167 @@
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from AppUser.testing import QueryBudgetTestCase
+from AppUser.urls import router
+from .base import PNG_IMAGE, AppUserFixturesMixin
+
+
+class EndpointQueryBudgetTests(AppUserFixturesMixin, QueryBudgetTestCase):
+    """
+    This class checks that every endpoint of AppUser/urls.py stays within its SQL query budget. When a new route is
+    registered test_every_route_has_budget fails until a budget is added here and the route is exercised below.
+
+    Only number of queries is checked here, behaviour of every feature is tested in its own test module.
+
+    Run with: python manage.py test AppUser --settings=DishDash.benchmark_settings
+    """
+    router = router
+    query_budgets = {
+        "PublicUserViewSet.list": 1,
+        "PublicUserViewSet.create": 2,
+        "PublicUserViewSet.retrieve": 1,
+        "PublicUserViewSet.update": 3,
+        "PublicUserViewSet.partial_update": 2,
+        "PublicUserViewSet.destroy": 9,
+        "PublicUserViewSet.signup": 2,
+        "PublicUserViewSet.login": 1,
+        "PublicUserViewSet.logout": 1,
+        "OTPViewSetCreateAPIView.list": 1,
+        "OTPViewSetCreateAPIView.create": 2,
+        "OTPViewSetCreateAPIView.retrieve": 1,
+        "OTPViewSetCreateAPIView.update": 3,
+        "OTPViewSetCreateAPIView.partial_update": 2,
+        "OTPViewSetCreateAPIView.destroy": 2,
+        "OTPViewSetCreateAPIView.new_email_otp": 1,
+        "OTPViewSetCreateAPIView.verify_email_otp": 0,
+        "OTPViewSetCreateAPIView.new_sms_otp": 1,
+        "OTPViewSetCreateAPIView.verify_sms_otp": 0,
+        "UserProfileViewSet.list": 1,
+        "UserProfileViewSet.create": 3,
+        "UserProfileViewSet.retrieve": 1,
+        "UserProfileViewSet.update": 4,
+        "UserProfileViewSet.partial_update": 2,
+        "UserProfileViewSet.destroy": 2,
+        "UserProfileViewSet.add_profile": 5,
+        "UserProfileViewSet.upload_target": 1,
+        "UserProfileViewSet.confirm_upload": 4,
+        "UserTypeViewSet.list": 2,
+        "UserTypeViewSet.create": 1,
+        "UserTypeViewSet.retrieve": 1,
+        "UserTypeViewSet.update": 2,
+        "UserTypeViewSet.partial_update": 2,
+        "UserTypeViewSet.destroy": 3,
+        "UserTypeViewSet.bulk": 4,
+        "BusinessProfileViewSet.list": 1,
+        "BusinessProfileViewSet.create": 3,
+        "BusinessProfileViewSet.retrieve": 1,
+        "BusinessProfileViewSet.update": 4,
+        "BusinessProfileViewSet.partial_update": 4,
+        "BusinessProfileViewSet.destroy": 5,
+        "BusinessProfileViewSet.bulk": 7,
+        "BusinessProfileViewSet.nearby": 1,
+        "BusinessProfileViewSet.search": 2,
+        "BusinessProfileViewSet.add_profile": 5,
+        "BusinessProfileViewSet.upload_target": 1,
+        "BusinessProfileViewSet.confirm_upload": 4,
+        "BusinessManagerViewSet.list": 1,
+        "BusinessManagerViewSet.create": 4,
+        "BusinessManagerViewSet.retrieve": 1,
+        "BusinessManagerViewSet.update": 4,
+        "BusinessManagerViewSet.partial_update": 2,
+        "BusinessManagerViewSet.destroy": 2,
+        "BusinessManagerViewSet.bulk": 5,
+    }
+
+    def test_every_route_has_budget(self):
+        self.assert_every_route_has_budget()
+
+    def test_user_endpoints(self):
+        self.request_within_budget("get", "/user/")
+        self.request_within_budget("get", f"/user/{self.user.id}/")
+        self.request_within_budget("post", "/user/signup/", {"username": "budget_signup", "password": "x-Passw0rd"})
+        self.request_within_budget("post", "/user/", {"username": "budget_create", "password": "x"})
+        self.request_within_budget("put", f"/user/{self.other_user.id}/", {"username": "budget_put", "password": "x"})
+        self.request_within_budget("patch", f"/user/{self.other_user.id}/", {"email": "patch@dishdash.local"})
+        response = self.request_within_budget("post", "/user/login/",
+                                              {"username": "budget_user", "password": self.password})
+        access = response.data["data"]["access"]
+        self.request_within_budget("post", "/user/logout/", {"username": "budget_user"},
+                                   HTTP_AUTHORIZATION=f"Bearer {access}")
+        self.request_within_budget("delete", f"/user/{self.other_user.id}/")
+
+    def test_otp_endpoints(self):
+        self.request_within_budget("get", "/otp/")
+        self.request_within_budget("get", f"/otp/{self.otp.id}/")
+        self.request_within_budget("post", "/otp/", {"user_id": self.user.id, "otp_str": "654321"})
+        self.request_within_budget("put", f"/otp/{self.otp.id}/", {"user_id": self.user.id, "otp_str": "111111"})
+        self.request_within_budget("patch", f"/otp/{self.otp.id}/", {"is_expired": True})
+        self.request_within_budget("post", "/otp/new_email_otp/", {"user_id": self.user.id, "email": "a@b.local"})
+        self.request_within_budget("post", "/otp/verify_email_otp/", {"user_id": self.user.id, "otp": "000000"})
+        self.request_within_budget("post", "/otp/new_sms_otp/", {"user_id": self.user.id, "phone_no": "+10000000"})
+        self.request_within_budget("post", "/otp/verify_sms_otp/", {"user_id": self.user.id, "otp": "000000"})
+        self.request_within_budget("delete", f"/otp/{self.otp.id}/")
+
+    def test_user_profile_endpoints(self):
+        profile = {"first_name": "Budget", "last_name": "User", "address": "Street", "contact_number": "1234567",
+                   "latitude": "31.52", "longitude": "74.35"}
+        self.request_within_budget("get", "/userprofile/")
+        self.request_within_budget("get", f"/userprofile/{self.profile.id}/")
+        self.request_within_budget("post", "/userprofile/", dict(profile, user_id=self.other_user.id))
+        self.request_within_budget("put", f"/userprofile/{self.profile.id}/", dict(profile, user_id=self.user.id))
+        self.request_within_budget("patch", f"/userprofile/{self.profile.id}/", {"first_name": "Patched"})
+        self.request_within_budget("delete", f"/userprofile/{self.profile.id}/")
+        image = SimpleUploadedFile("budget.png", PNG_IMAGE, content_type="image/png")
+        self.request_within_budget("post", "/userprofile/add_profile/",
+                                   dict(profile, user_id=self.user.id, profile_image=image), format="multipart")
+
+    def test_direct_upload_endpoints(self):
+        for route, pk in (("userprofile", self.profile.id), ("business_profile", self.business.id)):
+            response = self.request_within_budget("post", f"/{route}/{pk}/upload_target/",
+                                                  {"content_type": "image/png", "size": len(PNG_IMAGE)})
+            target = response.data["data"]
+            image = SimpleUploadedFile("budget.png", PNG_IMAGE, content_type="image/png")
+            self.client.post(target["upload"]["url"], dict(target["upload"]["fields"], file=image),
+                             format="multipart")
+            self.request_within_budget("post", f"/{route}/{pk}/confirm_upload/",
+                                       {"upload_token": target["upload_token"]})
+
+    def test_user_type_endpoints(self):
+        self.request_within_budget("get", "/user_type/")
+        self.request_within_budget("get", f"/user_type/{self.user_type.id}/")
+        self.request_within_budget("post", "/user_type/", {"roll_type": "staff"})
+        self.request_within_budget("put", f"/user_type/{self.user_type.id}/", {"roll_type": "chief"})
+        self.request_within_budget("patch", f"/user_type/{self.user_type.id}/", {"roll_type": "boss"})
+        self.request_within_budget("post", "/user_type/bulk/", [{"roll_type": "a"}, {"roll_type": "b"}])
+        self.request_within_budget("patch", "/user_type/bulk/", [{"id": self.user_type.id, "roll_type": "c"}])
+        self.request_within_budget("delete", f"/user_type/{self.user_type.id}/")
+
+    def test_business_profile_endpoints(self):
+        business = {"business_name": "Budget 2", "address": "Street", "business_contact_number": "1234567",
+                    "latitude": "31.53", "longitude": "74.36", "operating_hours": "Mon-Sun 09:00-22:00"}
+        self.request_within_budget("get", "/business_profile/")
+        self.request_within_budget("get", "/business_profile/", {"open_at": "now"}, format=None)
+        self.request_within_budget("get", f"/business_profile/{self.business.id}/")
+        self.request_within_budget("post", "/business_profile/", business)
+        self.request_within_budget("put", f"/business_profile/{self.business.id}/", business)
+        self.request_within_budget("patch", f"/business_profile/{self.business.id}/", {"address": "Road"})
+        self.request_within_budget("post", "/business_profile/bulk/", [business, business])
+        self.request_within_budget("patch", "/business_profile/bulk/", [{"id": self.business.id, "address": "Way"}])
+        self.request_within_budget("get", "/business_profile/nearby/", {"lat": "31.52", "lng": "74.35"},
+                                   format=None)
+        self.request_within_budget("get", "/business_profile/search/", {"q": "budgt"}, format=None)
+        image = SimpleUploadedFile("budget.png", PNG_IMAGE, content_type="image/png")
+        self.request_within_budget("post", "/business_profile/add_profile/",
+                                   dict(business, business_profile_image=image), format="multipart")
+        self.request_within_budget("delete", f"/business_profile/{self.business.id}/")
+
+    def test_business_manager_endpoints(self):
+        manager = {"user_id": self.other_user.id, "business_pofile_id": self.business.id,
+                   "user_type_id": self.user_type.id, "roll_name": "Manager"}
+        self.request_within_budget("get", "/business_manager/", {"expand": "user,business,user_type"}, format=None)
+        self.request_within_budget("get", f"/business_manager/{self.manager.id}/")
+        self.request_within_budget("post", "/business_manager/", manager)
+        self.request_within_budget("put", f"/business_manager/{self.manager.id}/", manager)
+        self.request_within_budget("patch", f"/business_manager/{self.manager.id}/", {"roll_name": "Chef"})
+        self.request_within_budget("post", "/business_manager/bulk/", [manager, manager])
+        self.request_within_budget("patch", "/business_manager/bulk/", [{"id": self.manager.id, "roll_name": "Cook"}])
+        self.request_within_budget("delete", f"/business_manager/{self.manager.id}/")
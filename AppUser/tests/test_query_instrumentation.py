@@ -0,0 +1,32 @@
+from django.test import override_settings
+
+from .base import AppUserTestCase
+
+
+@override_settings(QUERY_INSTRUMENTATION_ENABLED=True, QUERY_INSTRUMENTATION_HEADERS=True)
+class QueryInstrumentationMiddlewareTests(AppUserTestCase):
+    """
+    This class checks query count headers and slow request warnings of QueryInstrumentationMiddleware.
+    """
+
+    def test_headers(self):
+        response = self.client.get(f"/business_manager/{self.manager.id}/")
+        self.assertEqual(response["X-DB-Queries"], "1")
+        self.assertEqual(response["X-DB-Duplicate-Queries"], "0")
+        self.assertGreaterEqual(float(response["X-DB-Time-Ms"]), float(response["X-DB-Slowest-Ms"]))
+
+    @override_settings(QUERY_INSTRUMENTATION_WARN_QUERIES=0)
+    def test_warning_over_budget(self):
+        with self.assertLogs("AppUser.queries", "WARNING") as logs:
+            self.client.get(f"/business_manager/{self.manager.id}/")
+        self.assertIn("[BusinessManagerViewSet.retrieve] 1 queries", logs.output[0])
+
+    @override_settings(QUERY_INSTRUMENTATION_HEADERS=False)
+    def test_headers_can_be_disabled(self):
+        self.assertNotIn("X-DB-Queries", self.client.get("/business_manager/"))
+
+
+class QueryInstrumentationDisabledTests(AppUserTestCase):
+
+    def test_no_headers_when_disabled(self):
+        self.assertNotIn("X-DB-Queries", self.client.get("/business_manager/"))
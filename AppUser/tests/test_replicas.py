@@ -0,0 +1,95 @@
+from django.conf import settings
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from AppUser.middleware import ReplicaRoutingMiddleware, client_id
+from AppUser.models import BusinessProfile
+from DishDash.db.routers import ReplicaRouter, is_reading_from_replica, read_from_replica, reset_replica
+from .base import AppUserTestCase
+
+
+class ListView:
+    replica_read_actions = ("list",)
+
+
+def view():
+    pass
+
+
+view.cls = ListView
+view.actions = {"get": "list", "post": "create"}
+
+
+@override_settings(DATABASE_REPLICAS=["replica_1"])
+class ReplicaRoutingTests(AppUserTestCase):
+    """
+    This class checks that safe actions read from replicas and that a client reads from primary after its own write,
+    also with another token of the same user or behind a proxy.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.factory = RequestFactory()
+
+    def request(self, method: str, status: int = 200, **extra) -> bool:
+        """
+        return: True when the view read from a replica
+        """
+        seen = []
+
+        def get_response(request):
+            middleware.process_view(request, view, (), {})
+            seen.append(is_reading_from_replica())
+            return HttpResponse(status=status)
+
+        middleware = ReplicaRoutingMiddleware(get_response)
+        middleware(getattr(self.factory, method)("/business_profile/", **extra))
+        self.assertFalse(is_reading_from_replica())
+        return seen[0]
+
+    def bearer(self, user) -> dict:
+        return {"HTTP_AUTHORIZATION": f"Bearer {AccessToken.for_user(user)}"}
+
+    def test_reads_use_replica_until_client_writes(self):
+        self.assertTrue(self.request("get", **self.bearer(self.user)))
+        self.assertFalse(self.request("post", status=201, **self.bearer(self.user)))
+        # Every token of the user is sent to primary, other users still read from replica.
+        self.assertFalse(self.request("get", **self.bearer(self.user)))
+        self.assertTrue(self.request("get", **self.bearer(self.other_user)))
+
+    def test_failed_write_does_not_stick(self):
+        self.request("post", status=400, **self.bearer(self.user))
+        self.assertTrue(self.request("get", **self.bearer(self.user)))
+
+    @override_settings(REST_FRAMEWORK=dict(settings.REST_FRAMEWORK, NUM_PROXIES=1))
+    def test_anonymous_clients_behind_proxy(self):
+        proxy = {"REMOTE_ADDR": "10.0.0.1"}
+        self.request("post", status=201, HTTP_X_FORWARDED_FOR="1.1.1.1", **proxy)
+        self.assertFalse(self.request("get", HTTP_X_FORWARDED_FOR="1.1.1.1", **proxy))
+        self.assertTrue(self.request("get", HTTP_X_FORWARDED_FOR="2.2.2.2", **proxy))
+
+    def test_client_id(self):
+        self.assertEqual(client_id(self.factory.get("/", **self.bearer(self.user))), f"user:{self.user.id}")
+        self.assertEqual(client_id(self.factory.get("/", HTTP_AUTHORIZATION="Bearer invalid")), "ip:127.0.0.1")
+        self.assertEqual(client_id(self.factory.get("/", REMOTE_ADDR="1.2.3.4")), "ip:1.2.3.4")
+
+
+@override_settings(DATABASE_REPLICAS=["replica_1"])
+class ReplicaRouterTests(AppUserTestCase):
+    """
+    This class checks that router reads from replica only when it is allowed and writes and migrates primary only.
+    """
+
+    def test_router(self):
+        router = ReplicaRouter()
+        self.assertEqual(router.db_for_read(BusinessProfile), "default")
+        token = read_from_replica(True)
+        try:
+            self.assertEqual(router.db_for_read(BusinessProfile), "replica_1")
+            self.assertEqual(router.db_for_write(BusinessProfile), "default")
+        finally:
+            reset_replica(token)
+        self.assertFalse(router.allow_migrate("replica_1", "AppUser"))
+        self.assertIsNone(router.allow_migrate("default", "AppUser"))
+        self.assertTrue(router.allow_relation(self.user, self.business))
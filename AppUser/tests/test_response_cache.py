@@ -0,0 +1,65 @@
+from prometheus_client import REGISTRY
+
+from AppUser.response_cache import BUSINESS_PROFILE_CACHE_NAMESPACE, get_response_cache
+from .base import AppUserTestCase
+
+
+class ResponseCacheTests(AppUserTestCase):
+    """
+    This class checks that cached business profile responses are replaced after writes, also when version key of
+    the cache is evicted, and that hits and misses are counted in Prometheus metric.
+    """
+
+    def get(self, url: str):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_detail_is_invalidated_by_update(self):
+        url = f"/business_profile/{self.business.id}/"
+        self.assertEqual(self.get(url)["X-Cache"], "MISS")
+        self.assertEqual(self.get(url)["X-Cache"], "HIT")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(url, {"address": "Mall Road"})
+        response = self.get(url)
+        self.assertEqual((response["X-Cache"], response.data["address"]), ("MISS", "Mall Road"))
+
+    def test_list_is_invalidated_by_create(self):
+        self.get("/business_profile/")
+        self.assertEqual(self.get("/business_profile/")["X-Cache"], "HIT")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post("/business_profile/", {"business_name": "New", "address": "Street",
+                                                    "business_contact_number": "1", "latitude": "31.52",
+                                                    "longitude": "74.35", "operating_hours": "Daily 24h"})
+        response = self.get("/business_profile/")
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(len(response.data["results"]), 2)
+
+    def test_invalidated_after_commit(self):
+        url = f"/business_profile/{self.business.id}/"
+        self.get(url)
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.client.patch(url, {"address": "Mall Road"})
+            # Before commit the cached response is still served.
+            self.assertEqual(self.get(url)["X-Cache"], "HIT")
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.get(url).data["address"], "Mall Road")
+
+    def test_evicted_version_does_not_bring_old_response_back(self):
+        url = f"/business_profile/{self.business.id}/"
+        self.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(url, {"address": "Mall Road"})
+        get_response_cache().delete(f"{BUSINESS_PROFILE_CACHE_NAMESPACE}:object_version:{self.business.id}")
+        self.assertEqual(self.get(url).data["address"], "Mall Road")
+
+    def test_hits_and_misses_are_counted(self):
+        def count(result: str) -> float:
+            return REGISTRY.get_sample_value("dishdash_response_cache_requests_total",
+                                             {"namespace": BUSINESS_PROFILE_CACHE_NAMESPACE, "result": result}) or 0
+
+        hits, misses = count("hit"), count("miss")
+        for _ in range(3):
+            self.get(f"/business_profile/{self.business.id}/")
+        self.assertEqual((count("hit") - hits, count("miss") - misses), (2, 1))
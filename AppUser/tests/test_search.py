@@ -0,0 +1,62 @@
+from django.test import SimpleTestCase
+
+from AppUser.models import BusinessProfile, BusinessSearchTrigram
+from AppUser.search import match_score, normalize, trigrams
+from .base import AppUserTestCase
+
+
+class SearchTextTests(SimpleTestCase):
+    """
+    This class checks normalizing, trigram splitting and ranking of search text.
+    """
+
+    def test_normalize(self):
+        self.assertEqual(normalize("Café  Déjà-Vu!"), "cafe deja vu")
+        self.assertEqual(normalize(None), "")
+
+    def test_trigrams(self):
+        self.assertEqual(trigrams("Pizza"), {" pi", "piz", "izz", "zza", "za "})
+        # Word which is still being typed is not padded at the end, so "piz" is a prefix of "pizza".
+        self.assertEqual(trigrams("piz", prefix=True), {" pi", "piz"})
+        self.assertLessEqual(trigrams("piz", prefix=True), trigrams("pizza"))
+
+    def test_match_score(self):
+        query = normalize("pizz")
+        grams = trigrams(query, prefix=True)
+        self.assertEqual(match_score(query, grams, "Pizza Hut", "Mall Road"), 1.5)
+        self.assertEqual(match_score(query, grams, "Roma Grill", "Pizza Lane"), 0.5)
+        self.assertEqual(match_score(query, grams, "Burger Lab", "Gulberg"), 0.0)
+
+
+class BusinessSearchTests(AppUserTestCase):
+    """
+    This class checks /business_profile/search/ ranking, typo tolerance and that trigram index follows changes of
+    business profiles.
+    """
+
+    def setUp(self):
+        super().setUp()
+        for name, address in [("Pizza Hut", "Mall Road"), ("Pizzeria Roma", "Canal Bank"),
+                              ("Roma Grill", "Pizza Lane"), ("Burger Lab", "Gulberg")]:
+            BusinessProfile.objects.create(business_name=name, address=address, business_contact_number="1",
+                                           latitude="31.52", longitude="74.35", operating_hours="Daily 24h")
+
+    def search(self, query: str) -> list:
+        response = self.client.get("/business_profile/search/", {"q": query})
+        return [business["business_name"] for business in response.data["data"]]
+
+    def test_ranking_and_typos(self):
+        self.assertEqual(self.search("pizz")[:2], ["Pizza Hut", "Pizzeria Roma"])
+        self.assertEqual(self.search("piza hut")[0], "Pizza Hut")
+        self.assertEqual(self.search("burgr"), ["Burger Lab"])
+        self.assertIn("Roma Grill", self.search("pizza lane"))
+        self.assertEqual(self.search("sushi"), [])
+        self.assertEqual(self.client.get("/business_profile/search/").status_code, 400)
+        self.assertEqual(self.client.get("/business_profile/search/", {"q": "pizz", "limit": "x"}).status_code, 400)
+
+    def test_index_follows_changes(self):
+        self.client.patch(f"/business_profile/{self.business.id}/", {"business_name": "Karachi Biryani"})
+        self.assertEqual(self.search("biryani"), ["Karachi Biryani"])
+        self.assertEqual(self.search("budget"), [])
+        self.client.delete(f"/business_profile/{self.business.id}/")
+        self.assertFalse(BusinessSearchTrigram.objects.filter(business_id=self.business.id).exists())
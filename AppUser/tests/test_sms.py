@@ -0,0 +1,83 @@
+import threading
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from AppUser.otp import OTP_MATCHED, SMS_CHANNEL, get_otp_backend
+from AppUser.sms import FakeSMSProvider, SMSSender
+from .base import AppUserTestCase
+
+
+class FakeSMSProviderTests(SimpleTestCase):
+    """
+    This class checks that fake provider keeps sent SMS in outbox and fails every nth message.
+    """
+
+    def test_outbox_and_fail_every(self):
+        provider = FakeSMSProvider(from_number="+100", fail_every=3)
+        sids = [provider.send("+200", "one"), provider.send("+300", "two")]
+        with self.assertRaises(ConnectionError):
+            provider.send("+400", "three")
+        self.assertNotIn(provider.send("+500", "four"), sids)
+        self.assertEqual([(sms["sid"], sms["to"], sms["body"]) for sms in provider.outbox[:2]],
+                         [(sids[0], "+200", "one"), (sids[1], "+300", "two")])
+        self.assertEqual([sms["from"] for sms in provider.outbox], ["+100"] * 3)
+        provider.clear()
+        self.assertEqual((provider.outbox, provider.sent_count), ([], 0))
+
+
+class SMSSenderTests(SimpleTestCase):
+    """
+    This class checks that SMS sender delivers from its thread pool, logs provider failures and refuses SMS when
+    max_pending are waiting.
+    """
+
+    def test_failed_sms_is_logged(self):
+        sender = SMSSender(FakeSMSProvider(fail_every=2), max_workers=1)
+        self.addCleanup(sender.close)
+        with self.assertLogs("AppUser.sms", "ERROR") as logs:
+            futures = [sender.submit(f"+{index}", "otp") for index in range(4)]
+            sender.flush(5)
+        self.assertEqual([future.exception() is None for future in futures], [True, False, True, False])
+        self.assertEqual([sms["to"] for sms in sender.provider.outbox], ["+0", "+2"])
+        self.assertEqual(len(logs.records), 2)
+        self.assertIn("+1", logs.output[0])
+
+    def test_max_pending(self):
+        release = threading.Event()
+        provider = FakeSMSProvider()
+        sender = SMSSender(provider, max_workers=1, max_pending=2)
+        self.addCleanup(sender.close)
+        with mock.patch.object(provider, "send", side_effect=lambda to, body: release.wait(5)):
+            futures = [sender.submit("+1", "otp") for _ in range(3)]
+            self.assertIsNone(futures[2])
+            release.set()
+            sender.flush(5)
+        # Slots are released when SMS are sent.
+        self.assertIsNotNone(sender.submit("+1", "otp"))
+
+
+class SMSOTPEndpointTests(AppUserTestCase):
+    """
+    This class checks that SMS OTP is accepted for delivery and the SMS reaches the provider.
+    """
+
+    def test_sms_otp_is_accepted(self):
+        with mock.patch("AppUser.views.get_sms_sender") as get_sms_sender:
+            sender = get_sms_sender.return_value = SMSSender(FakeSMSProvider())
+            self.addCleanup(sender.close)
+            response = self.client.post("/otp/new_sms_otp/", {"user_id": self.user.id, "phone_no": "+10000000"})
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data["message"], "OTP ACCEPTED FOR DELIVERY")
+        sender.flush(5)
+        self.assertEqual(sender.provider.outbox[0]["to"], "+10000000")
+
+    def test_refused_sms_keeps_previous_otp(self):
+        otp = get_otp_backend().issue(SMS_CHANNEL, self.user.id)
+        with mock.patch("AppUser.views.get_sms_sender") as get_sms_sender:
+            sender = get_sms_sender.return_value = SMSSender(FakeSMSProvider(), max_pending=0)
+            self.addCleanup(sender.close)
+            response = self.client.post("/otp/new_sms_otp/", {"user_id": self.user.id, "phone_no": "+10000000"})
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(sender.provider.outbox, [])
+        self.assertEqual(get_otp_backend().verify(SMS_CHANNEL, self.user.id, otp), OTP_MATCHED)
@@ -0,0 +1,79 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+
+from AppUser.models import BusinessProfile, CustomUser, UserProfile, UserType
+from .base import AppUserTestCase
+
+
+class SoftDeleteTests(AppUserTestCase):
+    """
+    This class checks that soft deleted rows are hidden by default managers, still block their unique values and are
+    hard deleted by purge_deleted command after retention period.
+    """
+
+    def test_soft_deleted_rows_are_hidden(self):
+        self.client.patch(f"/user/{self.other_user.id}/", {"is_deleted": True})
+        self.assertEqual(self.client.get(f"/user/{self.other_user.id}/").status_code, 404)
+        self.assertTrue(CustomUser.all_objects.filter(pk=self.other_user.id, is_deleted=True).exists())
+        # Username of soft deleted user is still taken.
+        response = self.client.post("/user/", {"username": "budget_other", "password": "x"})
+        self.assertEqual(response.status_code, 400)
+
+        UserProfile.objects.filter(pk=self.profile.id).soft_delete()
+        self.assertEqual(self.client.get("/userprofile/").data["results"], [])
+
+    def test_patch_stamps_soft_delete_time(self):
+        CustomUser.objects.filter(pk=self.other_user.id).update(updated_at=timezone.now() - timedelta(days=30))
+        self.client.patch(f"/user/{self.other_user.id}/", {"is_deleted": True})
+        deleted = CustomUser.all_objects.get(pk=self.other_user.id)
+        self.assertGreater(deleted.updated_at, timezone.now() - timedelta(minutes=1))
+
+    def test_saving_deleted_row_keeps_soft_delete_time(self):
+        deleted_at = timezone.now() - timedelta(days=30)
+        UserType.objects.filter(pk=self.user_type.id).update(is_deleted=True, updated_at=deleted_at)
+        user_type = UserType.all_objects.get(pk=self.user_type.id)
+        user_type.roll_type = "renamed"
+        user_type.save()
+        self.assertEqual(UserType.all_objects.get(pk=self.user_type.id).updated_at, deleted_at)
+
+    def test_soft_delete_invalidates_caches(self):
+        self.assertEqual(self.client.get(f"/business_profile/{self.business.id}/").status_code, 200)
+        self.assertEqual(len(self.client.get("/user_type/").data["results"]), 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(BusinessProfile.objects.filter(pk=self.business.id).soft_delete(), 1)
+            UserType.objects.all().soft_delete()
+        self.assertEqual(self.client.get(f"/business_profile/{self.business.id}/").status_code, 404)
+        self.assertEqual(self.client.get("/business_profile/").data["results"], [])
+        self.assertEqual(self.client.get("/user_type/").data["results"], [])
+
+    @override_settings(SEARCH_CANDIDATES=2)
+    def test_soft_deleted_businesses_are_not_search_candidates(self):
+        for name in ("Pizza Palace", "Pizza Palace"):
+            BusinessProfile.objects.create(business_name=name, address="Street", business_contact_number="1",
+                                           latitude="31.52", longitude="74.35", operating_hours="Daily 24h")
+        live = BusinessProfile.objects.create(business_name="Pizza Place", address="Street",
+                                              business_contact_number="1", latitude="31.52", longitude="74.35",
+                                              operating_hours="Daily 24h")
+        BusinessProfile.objects.filter(business_name="Pizza Palace").soft_delete()
+        response = self.client.get("/business_profile/search/", {"q": "pizza palace"})
+        self.assertEqual([business["id"] for business in response.data["data"]], [live.id])
+
+    def test_purge_deleted(self):
+        CustomUser.objects.filter(pk=self.other_user.id).soft_delete()
+        UserProfile.objects.filter(pk=self.profile.id).soft_delete()
+        call_command("purge_deleted", retention_days=1, stdout=StringIO())
+        self.assertEqual(CustomUser.all_objects.filter(is_deleted=True).count(), 1)
+
+        output = StringIO()
+        call_command("purge_deleted", retention_days=0, dry_run=True, stdout=output)
+        self.assertIn("would delete 1 rows", output.getvalue())
+        self.assertEqual(CustomUser.all_objects.filter(is_deleted=True).count(), 1)
+
+        call_command("purge_deleted", retention_days=0, stdout=StringIO())
+        self.assertFalse(CustomUser.all_objects.filter(is_deleted=True).exists())
+        self.assertFalse(UserProfile.all_objects.exists())
+        self.assertTrue(CustomUser.objects.filter(pk=self.user.id).exists())
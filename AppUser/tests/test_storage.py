@@ -0,0 +1,122 @@
+import io
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase
+
+from AppUser.storage import LocalFileSystemStorage, S3MultipartWriter, S3Storage, get_storage
+from .base import PNG_IMAGE, AppUserTestCase
+
+
+class RecordingS3Client:
+    """
+    This class records S3 calls of S3MultipartWriter instead of sending them.
+    """
+
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, name):
+        def call(**kwargs):
+            self.calls.append((name, kwargs))
+            return {"UploadId": "upload-1", "ETag": f"etag-{len(self.calls)}"}
+        return call
+
+
+class S3MultipartWriterTests(SimpleTestCase):
+    """
+    This class checks that streamed objects are sent with one put_object when they fit in one part and as multipart
+    upload of part sized chunks otherwise.
+    """
+
+    def setUp(self):
+        self.storage = S3Storage(bucket_name="bucket", region_name="us-east-1", access_key_id="key",
+                                 secret_access_key="secret", multipart_chunksize=5)
+        self.storage._client = RecordingS3Client()
+
+    def test_small_object_is_put_once(self):
+        writer = S3MultipartWriter(self.storage, "image.png", "image/png")
+        writer.write(b"abc")
+        self.assertEqual(writer.close(), "https://bucket.s3.amazonaws.com/image.png")
+        self.assertEqual(self.storage.client.calls, [
+            ("put_object", {"Bucket": "bucket", "Key": "image.png", "Body": b"abc", "ContentType": "image/png"})])
+
+    def test_large_object_is_uploaded_in_parts(self):
+        writer = S3MultipartWriter(self.storage, "image.png")
+        for chunk in (b"abcd", b"efgh", b"ijkl"):
+            writer.write(chunk)
+        writer.close()
+        calls = self.storage.client.calls
+        self.assertEqual([name for name, kwargs in calls],
+                         ["create_multipart_upload", "upload_part", "upload_part", "upload_part",
+                          "complete_multipart_upload"])
+        self.assertEqual([kwargs["Body"] for name, kwargs in calls if name == "upload_part"],
+                         [b"abcde", b"fghij", b"kl"])
+        self.assertEqual([part["PartNumber"] for part in calls[-1][1]["MultipartUpload"]["Parts"]], [1, 2, 3])
+
+    def test_abort_cancels_multipart_upload(self):
+        writer = S3MultipartWriter(self.storage, "image.png")
+        writer.write(b"abcdefg")
+        writer.abort()
+        self.assertEqual(self.storage.client.calls[-1][0], "abort_multipart_upload")
+        self.assertIsNone(writer.upload_id)
+
+    def test_failed_abort_is_logged(self):
+        writer = S3MultipartWriter(self.storage, "image.png")
+        writer.write(b"abcdefg")
+        with mock.patch.object(RecordingS3Client, "abort_multipart_upload", side_effect=OSError("timeout"),
+                               create=True), self.assertLogs("AppUser.storage", "ERROR") as logs:
+            writer.abort()
+        self.assertIn("image.png", logs.output[0])
+        self.assertIsNone(writer.upload_id)
+
+
+class LocalFileSystemStorageTests(SimpleTestCase):
+    """
+    This class checks local storage used in tests and development.
+    """
+
+    def setUp(self):
+        self.location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.location)
+        self.storage = LocalFileSystemStorage(location=self.location, base_url="/media/", upload_url="/uploads/")
+
+    def test_upload_read_head(self):
+        url = self.storage.upload(io.BytesIO(PNG_IMAGE), "images/a.png", "image/png")
+        self.assertEqual(url, "/media/images/a.png")
+        self.assertEqual(self.storage.read("images/a.png"), PNG_IMAGE)
+        self.assertEqual(self.storage.head("images/a.png"), {"size": len(PNG_IMAGE), "content_type": "image/png"})
+        self.assertIsNone(self.storage.head("images/missing.png"))
+
+    def test_key_can_not_leave_location(self):
+        with self.assertRaises(ValueError):
+            self.storage.path("../outside.png")
+
+    def test_aborted_writer_leaves_no_file(self):
+        writer = self.storage.open_writer("images/b.png")
+        writer.write(b"partial")
+        writer.abort()
+        self.assertEqual(os.listdir(os.path.join(self.location, "images")), [])
+
+
+class StreamedUploadTests(AppUserTestCase):
+    """
+    This class checks that add_profile streams the image to storage and saves its URL.
+    """
+
+    def test_add_profile_streams_image_to_storage(self):
+        image = SimpleUploadedFile("shop.png", PNG_IMAGE, content_type="image/png")
+        response = self.client.post("/business_profile/add_profile/", {
+            "business_name": "Streamed", "address": "Street", "business_contact_number": "1", "latitude": "31.52",
+            "longitude": "74.35", "operating_hours": "Daily 24h", "business_profile_image": image},
+            format="multipart")
+        self.assertEqual(response.status_code, 200)
+        url = response.data["data"]["business_profile_image"]
+        self.assertTrue(url.startswith("/media/business_image/"))
+        storage = get_storage()
+        self.assertEqual(storage.read(url[len(storage.base_url.rstrip("/")) + 1:]), PNG_IMAGE)
+        # One storage instance is shared by the whole process.
+        self.assertIs(get_storage(), storage)
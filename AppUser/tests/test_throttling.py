@@ -0,0 +1,93 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from AppUser.checks import check_throttle_cache
+from AppUser.throttling import take_token
+from .base import AppUserTestCase
+
+
+class TakeTokenTests(SimpleTestCase):
+    """
+    This class checks burst, refill and wait time of take_token with a bucket of 3 tokens refilled in 60 seconds.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.clock = mock.patch("AppUser.throttling.time").start()
+        self.addCleanup(mock.patch.stopall)
+
+    def take_at(self, seconds: float, key: str = "bucket"):
+        self.clock.time.return_value = seconds
+        return take_token(key, 3, 60)
+
+    def test_burst_then_wait_for_refill(self):
+        self.assertEqual([self.take_at(600) for _ in range(3)], [None, None, None])
+        # Bucket is empty until the taken tokens are refilled at 3 tokens per minute.
+        self.assertEqual(self.take_at(600), 80)
+        self.assertEqual(self.take_at(630), 50)
+        self.assertIsNotNone(self.take_at(670))
+        self.assertIsNone(self.take_at(680))
+        self.assertAlmostEqual(self.take_at(680), 20)
+        self.assertIsNone(self.take_at(701))
+
+    def test_full_refill_allows_burst_again(self):
+        for _ in range(3):
+            self.take_at(600)
+        self.assertEqual([self.take_at(720) for _ in range(3)], [None, None, None])
+        self.assertIsNotNone(self.take_at(720))
+
+    def test_buckets_are_separate(self):
+        for _ in range(3):
+            self.take_at(600, "one")
+        self.assertIsNotNone(self.take_at(600, "one"))
+        self.assertIsNone(self.take_at(600, "two"))
+
+
+class ThrottleCacheCheckTests(SimpleTestCase):
+    """
+    This class checks that throttling with a per process cache is reported.
+    """
+
+    def test_check(self):
+        locmem = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+        with override_settings(THROTTLE_ENABLED=True, THROTTLE_CACHE="default", CACHES=locmem):
+            self.assertEqual([warning.id for warning in check_throttle_cache(None)], ["AppUser.W001"])
+        with override_settings(THROTTLE_ENABLED=False, CACHES=locmem):
+            self.assertEqual(check_throttle_cache(None), [])
+
+
+@override_settings(THROTTLE_ENABLED=True, THROTTLE_BUCKETS={
+    "new_sms_otp": {"phone": (2, 600), "ip": (100, 60), "global": (3, 600)},
+    "login": {"username": (1, 60)},
+})
+class TokenBucketThrottleTests(AppUserTestCase):
+    """
+    This class checks that OTP and login endpoints are limited per bucket of THROTTLE_BUCKETS setting.
+    """
+
+    def test_sms_otp_buckets(self):
+        sms = {"user_id": self.user.id, "phone_no": "+1 000-0000"}
+        for _ in range(2):
+            self.assertEqual(self.client.post("/otp/new_sms_otp/", sms).status_code, 202)
+        # Same phone written differently shares the bucket, throttled request does not issue OTP.
+        response = self.client.post("/otp/new_sms_otp/", dict(sms, phone_no="+10000000"))
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("Retry-After", response)
+        # Phone bucket stops the check, so the throttled requests did not spend the global bucket.
+        self.assertEqual(self.client.post("/otp/new_sms_otp/", dict(sms, phone_no="+20000000")).status_code, 202)
+        self.assertEqual(self.client.post("/otp/new_sms_otp/", dict(sms, phone_no="+30000000")).status_code, 429)
+
+    def test_login_bucket(self):
+        login = {"username": "budget_user", "password": self.password}
+        with mock.patch("AppUser.throttling.time") as clock:
+            clock.time.return_value = 600
+            self.assertEqual(self.client.post("/user/login/", login).status_code, 202)
+            response = self.client.post("/user/login/", login)
+            self.assertEqual(response.status_code, 429)
+            # Token taken at the start of a window is counted until the end of next window (sliding window).
+            self.assertEqual(response["Retry-After"], "120")
+        # Other usernames have their own bucket.
+        self.assertEqual(self.client.post("/user/login/", {"username": "budget_other", "password": "x"}).status_code,
+                         401)
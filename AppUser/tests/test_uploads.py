@@ -0,0 +1,76 @@
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from AppUser.models import UserProfile
+from .base import PNG_IMAGE, AppUserTestCase
+
+
+class DirectUploadTests(AppUserTestCase):
+    """
+    This class checks presigned upload flow: upload_target signs a form for a unique key, image is posted to
+    storage and confirm_upload saves its URL after checking the token and the stored object.
+    """
+
+    def upload_target(self, route: str, pk: int, content_type: str = "image/png") -> dict:
+        response = self.client.post(f"/{route}/{pk}/upload_target/", {"content_type": content_type,
+                                                                       "size": len(PNG_IMAGE)})
+        self.assertEqual(response.status_code, 200)
+        return response.data["data"]
+
+    def upload(self, target: dict, data: bytes = PNG_IMAGE, **fields):
+        image = SimpleUploadedFile("image.png", data, content_type="image/png")
+        return self.client.post(target["upload"]["url"], dict(target["upload"]["fields"], file=image, **fields),
+                                format="multipart")
+
+    def test_upload_and_confirm(self):
+        target = self.upload_target("userprofile", self.profile.id)
+        self.assertRegex(target["key"], r"^user_profile_image/[0-9a-f]{32}\.png$")
+        self.assertEqual(self.upload(target).status_code, 204)
+        response = self.client.post(f"/userprofile/{self.profile.id}/confirm_upload/",
+                                    {"upload_token": target["upload_token"]})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data["data"]["profile_image"].endswith(target["key"]))
+        profile = UserProfile.objects.get(pk=self.profile.id)
+        self.assertTrue(profile.profile_image.endswith(target["key"]))
+        self.assertEqual(set(profile.image_variants), {"thumb", "card", "full"})
+
+    def test_every_target_has_its_own_key(self):
+        self.assertNotEqual(self.upload_target("business_profile", self.business.id)["key"],
+                            self.upload_target("business_profile", self.business.id)["key"])
+
+    def test_invalid_targets(self):
+        url = f"/userprofile/{self.profile.id}/upload_target/"
+        self.assertEqual(self.client.post(url, {"content_type": "text/html"}).status_code, 400)
+        self.assertEqual(self.client.post(url, {"content_type": "image/png", "size": 10 ** 10}).status_code, 400)
+        response = self.client.post("/userprofile/1000000/upload_target/", {"content_type": "image/png"})
+        self.assertEqual(response.status_code, 404)
+
+    def test_upload_form_must_match_signed_target(self):
+        target = self.upload_target("userprofile", self.profile.id)
+        self.assertEqual(self.upload(target, key="user_profile_image/other.png").status_code, 403)
+        self.assertEqual(self.upload(target, data=b"").status_code, 400)
+        response = self.client.post("/uploads/bad-token/", {"key": target["key"]})
+        self.assertEqual(response.status_code, 403)
+
+    def test_confirm_checks_token_and_object(self):
+        target = self.upload_target("userprofile", self.profile.id)
+        # Image is not uploaded yet.
+        response = self.client.post(f"/userprofile/{self.profile.id}/confirm_upload/",
+                                    {"upload_token": target["upload_token"]})
+        self.assertEqual(response.status_code, 400)
+        self.upload(target)
+        # Token of user profile upload can not be used for business image.
+        response = self.client.post(f"/business_profile/{self.business.id}/confirm_upload/",
+                                    {"upload_token": target["upload_token"]})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(f"/userprofile/{self.profile.id}/confirm_upload/", {"upload_token": "forged"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_token_is_bound_to_object(self):
+        other = UserProfile.objects.create(user_id=self.other_user, first_name="Other", last_name="User",
+                                           address="Street", contact_number="1", latitude="31.52", longitude="74.35")
+        target = self.upload_target("userprofile", self.profile.id)
+        self.upload(target)
+        response = self.client.post(f"/userprofile/{other.id}/confirm_upload/",
+                                    {"upload_token": target["upload_token"]})
+        self.assertEqual(response.status_code, 400)
+        self.assertIsNone(UserProfile.objects.get(pk=other.id).profile_image)
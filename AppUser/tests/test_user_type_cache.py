@@ -0,0 +1,51 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from AppUser.models import UserType
+from AppUser.user_type_cache import UserTypeCache, user_type_cache
+from .base import AppUserTestCase
+
+
+class UserTypeCacheTests(AppUserTestCase):
+    """
+    This class checks that user types are served from process memory and reloaded after a change.
+    """
+
+    def test_lookups_do_not_query_database(self):
+        cache = UserTypeCache(check_interval=60)
+        self.assertEqual(cache.get(self.user_type.id).roll_type, "owner")
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual([user_type.roll_type for user_type in cache.all()], ["owner"])
+            self.assertIsNone(cache.get("x"))
+            self.assertIsNone(cache.get(10 ** 6))
+        self.assertEqual(len(queries), 0)
+
+    def test_other_worker_reloads_after_invalidate(self):
+        # Two caches stand in for two worker processes sharing the version key.
+        worker = UserTypeCache(check_interval=0)
+        self.assertEqual(len(worker.all()), 1)
+        UserType.objects.create(roll_type="staff")
+        UserTypeCache().invalidate()
+        self.assertEqual(sorted(user_type.roll_type for user_type in worker.all()), ["owner", "staff"])
+
+    def test_endpoints_see_changes(self):
+        self.assertEqual(len(self.client.get("/user_type/").data["results"]), 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post("/user_type/", {"roll_type": "staff"})
+        self.assertEqual(len(self.client.get("/user_type/").data["results"]), 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(f"/user_type/{self.user_type.id}/", {"roll_type": "chief"})
+        self.assertEqual(self.client.get(f"/user_type/{self.user_type.id}/").data["roll_type"], "chief")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f"/user_type/{self.user_type.id}/")
+        self.assertEqual(self.client.get(f"/user_type/{self.user_type.id}/").status_code, 404)
+        self.assertIsNone(user_type_cache.get(self.user_type.id))
+
+    def test_invalidated_after_commit(self):
+        self.assertEqual(len(user_type_cache.all()), 1)
+        with self.captureOnCommitCallbacks() as callbacks:
+            UserType.objects.create(roll_type="staff")
+        self.assertEqual(len(callbacks), 1)
+        for callback in callbacks:
+            callback()
+        self.assertEqual(len(user_type_cache.all()), 2)
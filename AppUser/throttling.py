@@ -0,0 +1,113 @@
+import hashlib
+import math
+import re
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import BaseThrottle
+
+
+def take_token(key: str, capacity: int, refill_seconds: float):
+    """
+    This function takes one token from the bucket of key in THROTTLE_CACHE. Bucket holds capacity tokens and is
+    refilled completely in refill_seconds, so capacity requests can come at once and after that
+    capacity / refill_seconds requests per second are allowed.
+
+    Django cache API has no atomic read-modify-write for a classic bucket (tokens + last refill time), so the bucket
+    is counted as sliding window of refill_seconds: tokens taken in current window plus the part of previous window
+    which is not refilled yet. Every check is one get_many and at most one add + incr, which are atomic in Redis and
+    Memcached, so concurrent workers can never take more tokens than the bucket holds.
+
+    return: None when token is taken, otherwise seconds to wait for next token
+    """
+    cache = caches[settings.THROTTLE_CACHE]
+    now = time.time() / refill_seconds
+    window = math.floor(now)
+    elapsed = now - window
+    current_key = f"throttle:{key}:{window}"
+    previous_key = f"throttle:{key}:{window - 1}"
+    counts = cache.get_many([current_key, previous_key])
+    previous = counts.get(previous_key, 0)
+    not_refilled = previous * (1 - elapsed)
+
+    def wait(current: int) -> float:
+        missing = not_refilled + current + 1 - capacity
+        if previous and missing <= not_refilled:
+            # Previous window is refilled at previous / refill_seconds tokens per second.
+            return missing * refill_seconds / previous
+        return (1 - elapsed) * refill_seconds + refill_seconds / capacity
+
+    if not_refilled + counts.get(current_key, 0) + 1 > capacity:
+        return wait(counts.get(current_key, 0))
+    timeout = math.ceil(refill_seconds * 2) + 1
+    cache.add(current_key, 0, timeout)
+    try:
+        current = cache.incr(current_key)
+    except ValueError:
+        # Key was evicted between add and incr.
+        cache.set(current_key, 1, timeout)
+        current = 1
+    if not_refilled + current > capacity:
+        # Another worker took the last token after our read.
+        return wait(current - 1)
+    return None
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    This throttle limits expensive endpoints (password hashing, SMTP, SMS) with token buckets in THROTTLE_CACHE.
+    Limits only hold across all workers when that cache is shared (Redis / Memcached), with local memory cache every
+    worker has its own buckets and system check AppUser.W001 warns about it. Buckets of action are read from
+    THROTTLE_BUCKETS setting:
+
+        {"<action>": {"<dimension>": (capacity, refill_seconds), ...}}
+
+    Dimensions are "user" (user_id), "phone" (phone_no), "email", "username" (from request body), "ip" (client IP,
+    see NUM_PROXIES setting of REST_FRAMEWORK) and "global" (one bucket for every client). Buckets are checked in
+    this order and checking stops at the first empty one, so one noisy client does not spend the global bucket.
+
+    Throttles run before the action, so a throttled request returns 429 with Retry-After header before any
+    database write, password hash or outbound call.
+    """
+    dimensions = ("user", "phone", "email", "username", "ip", "global")
+
+    def __init__(self):
+        self.retry_after = None
+
+    def bucket_value(self, request, dimension: str):
+        """
+        return: value which identifies the bucket of request e.g. phone number, None when request has no value.
+        """
+        if dimension == "ip":
+            return self.get_ident(request)
+        if dimension == "global":
+            return "all"
+        field = {"user": "user_id", "phone": "phone_no"}.get(dimension, dimension)
+        value = request.data.get(field)
+        if value in (None, ""):
+            return None
+        value = str(value).strip().lower()
+        if dimension == "phone":
+            value = re.sub(r"[^\d]", "", value)
+        return value
+
+    def allow_request(self, request, view) -> bool:
+        if not settings.THROTTLE_ENABLED:
+            return True
+        buckets = settings.THROTTLE_BUCKETS.get(view.action, {})
+        for dimension in self.dimensions:
+            if dimension not in buckets:
+                continue
+            value = self.bucket_value(request, dimension)
+            if value is None:
+                continue
+            capacity, refill_seconds = buckets[dimension]
+            digest = hashlib.sha256(value.encode()).hexdigest()[:32]
+            self.retry_after = take_token(f"{view.action}:{dimension}:{digest}", capacity, refill_seconds)
+            if self.retry_after is not None:
+                return False
+        return True
+
+    def wait(self):
+        return self.retry_after
@@ -0,0 +1,35 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+class TokenRevocationStore:
+    """
+    This class keeps the ids (jti claim) of revoked JWT tokens in the shared cache. Each entry expires together with
+    its token, so store only holds tokens which are revoked and not yet expired and user table is never written.
+
+    Methods:
+        revoke: param(token) Mark the token as revoked until it expires.
+        is_revoked: param(token) Return True if token is revoked.
+    """
+    key_prefix = "revoked_jwt:"
+
+    def __init__(self, cache_alias: str = None):
+        self.cache_alias = cache_alias or settings.TOKEN_REVOCATION_CACHE
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def revoke(self, token) -> None:
+        timeout = int(token["exp"] - time.time()) + 1
+        if timeout > 0:
+            self.cache.set(self.key_prefix + token["jti"], 1, timeout)
+
+    def is_revoked(self, token) -> bool:
+        jti = token.get("jti")
+        return jti is not None and self.cache.get(self.key_prefix + jti) is not None
+
+
+revocation_store = TokenRevocationStore()
@@ -0,0 +1,159 @@
+import mimetypes
+import uuid
+
+from django.conf import settings
+from django.core import signing
+from django.http import HttpResponse
+from django.utils import timezone
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from DishDash.general_functions import error_message, success_message
+from .images import create_image_variants
+from .storage import get_storage
+
+UPLOAD_TOKEN_SALT = "AppUser.uploads.confirm"
+LOCAL_UPLOAD_TOKEN_SALT = "AppUser.uploads.local"
+
+
+def create_local_upload_token(key: str, content_type: str, max_size: int) -> str:
+    return signing.dumps({"key": key, "content_type": content_type, "max_size": max_size},
+                         salt=LOCAL_UPLOAD_TOKEN_SALT)
+
+
+@csrf_exempt
+@require_POST
+def local_upload_view(request, token: str) -> HttpResponse:
+    """
+    This view receives presigned uploads of LocalFileSystemStorage. It accepts the same multipart form as S3 POST
+    policy (fields returned by presign_upload and the file in "file" field), so clients and tests use one upload
+    flow for both storages. It is a stand in for S3 in tests and development, production uploads go to S3.
+    """
+    try:
+        target = signing.loads(token, salt=LOCAL_UPLOAD_TOKEN_SALT, max_age=settings.UPLOAD_URL_EXPIRES)
+    except signing.BadSignature:
+        return HttpResponse("Upload URL is invalid or expired", status=status.HTTP_403_FORBIDDEN)
+    file = request.FILES.get("file")
+    if request.POST.get("key") != target["key"] or request.POST.get("Content-Type") != target["content_type"]:
+        return HttpResponse("Form fields do not match upload URL", status=status.HTTP_403_FORBIDDEN)
+    if file is None or not 0 < file.size <= target["max_size"]:
+        return HttpResponse(f"File must be 1 to {target['max_size']} bytes", status=status.HTTP_400_BAD_REQUEST)
+    get_storage().upload(file, target["key"], target["content_type"])
+    return HttpResponse(status=status.HTTP_204_NO_CONTENT)
+
+
+class DirectUploadMixin:
+    """
+    This mixin adds presigned image upload to a ModelViewSet, image bytes go from client straight to storage and
+    never pass through application workers.
+
+    Methods to Access Data:
+        To get presigned upload form: POST /<route>/{pk}/upload_target/ with "content_type" and optional "size"
+        To save uploaded image on object: POST /<route>/{pk}/confirm_upload/ with "upload_token"
+
+    Client sends multipart POST to returned upload url with returned fields and the image in "file" field, then
+    confirms the upload on the same object, upload token is only accepted for the object it was created for. Size
+    and content type are enforced by storage (S3 POST policy), confirm checks the object again before saving its URL
+    and creating image variants (see AppUser.images).
+
+    Attributes:
+        upload_field: str - model field which keeps image URL.
+        upload_prefix: str - storage key prefix of uploaded images.
+    """
+    upload_field = None
+    upload_prefix = None
+
+    @action(detail=True, methods=['post'])
+    def upload_target(self, request: Request, *args: any, **kwargs: any) -> Response:
+        """
+        In this method we are returning presigned upload form for a new image of the object.
+
+        In step 1 we validate content type and size provided by client.
+
+        In step 2 we create unique storage key and sign the upload form for it. Signing does not call storage. Upload
+        token carries primary key of the object, so it can not be confirmed on another object.
+
+        Params:
+        request: HTTP Request object - content_type and size (optional) in request body
+        **args: These are additional parameters
+        **kwargs: These are additional - optional keyword parameters
+
+        return:  rest_framework.response object with status of OK of failure to requesting source for this API
+        """
+        "STEP1: Validating content type and size"
+        content_type = request.data.get("content_type")
+        if content_type not in settings.UPLOAD_CONTENT_TYPES:
+            response_dictionary = error_message(
+                f"content_type MUST BE ONE OF {', '.join(settings.UPLOAD_CONTENT_TYPES)}")
+            return Response(response_dictionary, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            size = int(request.data.get("size", 1))
+        except (TypeError, ValueError):
+            size = 0
+        if not 0 < size <= settings.UPLOAD_MAX_SIZE:
+            response_dictionary = error_message(f"size MUST BE BETWEEN 1 AND {settings.UPLOAD_MAX_SIZE} BYTES")
+            return Response(response_dictionary, status=status.HTTP_400_BAD_REQUEST)
+
+        "STEP2: Signing upload form for unique key"
+        instance = self.get_object()
+        key = f"{self.upload_prefix}{uuid.uuid4().hex}{mimetypes.guess_extension(content_type) or ''}"
+        upload = get_storage().presign_upload(key, content_type, settings.UPLOAD_MAX_SIZE,
+                                              settings.UPLOAD_URL_EXPIRES)
+        upload_token = signing.dumps({"key": key, "field": self.upload_field, "pk": str(instance.pk)},
+                                     salt=UPLOAD_TOKEN_SALT)
+        response_dictionary = success_message("UPLOAD TARGET CREATED", {
+            "key": key, "upload": upload, "upload_token": upload_token, "max_size": settings.UPLOAD_MAX_SIZE,
+            "expires_in": settings.UPLOAD_URL_EXPIRES})
+        return Response(response_dictionary, status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=['post'])
+    def confirm_upload(self, request: Request, *args: any, **kwargs: any) -> Response:
+        """
+        In this method we are saving URL of uploaded image on the object.
+
+        In step 1 we check upload_token, so only keys created by upload_target of this route for this object can be
+        saved.
+
+        In step 2 we check the object exists in storage and is within size limit.
+
+        In step 3 we save the URL and submit the image to image pipeline.
+
+        Params:
+        request: HTTP Request object - upload_token in request body
+        **args: These are additional parameters
+        **kwargs: These are additional - optional keyword parameters
+
+        return:  rest_framework.response object with status of OK of failure to requesting source for this API
+        """
+        "STEP1: Checking upload token"
+        instance = self.get_object()
+        try:
+            upload = signing.loads(request.data.get("upload_token", ""), salt=UPLOAD_TOKEN_SALT,
+                                   max_age=settings.UPLOAD_TOKEN_MAX_AGE)
+        except signing.BadSignature:
+            upload = None
+        if upload is None or upload["field"] != self.upload_field or upload.get("pk") != str(instance.pk):
+            response_dictionary = error_message("upload_token IS INVALID OR EXPIRED")
+            return Response(response_dictionary, status=status.HTTP_400_BAD_REQUEST)
+
+        "STEP2: Checking uploaded object"
+        storage = get_storage()
+        stored = storage.head(upload["key"])
+        if stored is None:
+            response_dictionary = error_message("IMAGE IS NOT UPLOADED YET")
+            return Response(response_dictionary, status=status.HTTP_400_BAD_REQUEST)
+        if stored["size"] > settings.UPLOAD_MAX_SIZE:
+            response_dictionary = error_message(f"IMAGE IS LARGER THAN {settings.UPLOAD_MAX_SIZE} BYTES")
+            return Response(response_dictionary, status=status.HTTP_400_BAD_REQUEST)
+
+        "STEP3: Saving image URL"
+        setattr(instance, self.upload_field, storage.url(upload["key"]))
+        instance.updated_at = timezone.now()
+        instance.save(update_fields=[self.upload_field, "updated_at"])
+        create_image_variants(instance, upload["key"])
+        response_dictionary = success_message("IMAGE SAVED", self.get_serializer(instance).data)
+        return Response(response_dictionary, status=status.HTTP_200_OK)
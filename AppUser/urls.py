@@ -1,6 +1,6 @@
 from django.urls import path
 from AppUser.views import PublicUserViewSet, OTPViewSetCreateAPIView, UserProfileViewSet, \
-    BusinessProfileViewSet
+    BusinessProfileViewSet, BusinessManagerViewSet, UserTypeViewSet
 from rest_framework.routers import DefaultRouter
 
 router = DefaultRouter()
@@ -8,6 +8,8 @@ router.register(f'user', PublicUserViewSet)
 router.register(f"otp", OTPViewSetCreateAPIView)
 router.register(f"userprofile", UserProfileViewSet)
 router.register(f"business_profile", BusinessProfileViewSet)
+router.register(f"business_manager", BusinessManagerViewSet)
+router.register(f"user_type", UserTypeViewSet)
 
 urlpatterns = router.urls
 
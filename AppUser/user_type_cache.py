@@ -0,0 +1,112 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import router
+
+from DishDash.db.routers import read_from_replica, reset_replica
+
+from .models import UserType
+
+
+class UserTypeCache:
+    """
+    This class keeps all rows of UserType table in process memory. Table is loaded once per worker and loaded again
+    only when version key in the shared cache changes, invalidate method bumps that version so every worker reloads
+    the table on its next check.
+
+    Shared version is checked at most once per check_interval seconds, so between checks lookups do not leave the
+    process at all.
+
+    Methods:
+        all: Return list of all user types ordered by id.
+        get: param(pk) Return user type with primary key or None.
+        get_list_response: param(key, load) Return cached list response data for key or load and cache it.
+        invalidate: Mark cache of all workers as stale.
+    """
+    version_key = "user_type:version"
+    max_list_responses = 100
+
+    def __init__(self, cache_alias: str = None, check_interval: float = None):
+        self.cache_alias = cache_alias
+        self.check_interval = check_interval
+        self._types = None
+        self._list_responses = {}
+        self._version = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias or settings.USER_TYPE_CACHE_ALIAS]
+
+    def _shared_version(self) -> int:
+        version = self.cache.get(self.version_key)
+        if version is None:
+            # Version starts from current time, so after a cache flush it never equals the version a worker loaded.
+            self.cache.add(self.version_key, time.time_ns(), None)
+            version = self.cache.get(self.version_key)
+        return version
+
+    def _load(self) -> dict:
+        """
+        This method returns dict of primary key -> UserType, table is loaded again if shared version has changed.
+        """
+        interval = self.check_interval if self.check_interval is not None else settings.USER_TYPE_CACHE_CHECK_INTERVAL
+        now = time.monotonic()
+        types = self._types
+        if types is not None and now - self._checked_at < interval:
+            return types
+        with self._lock:
+            # Version is read before the table, so a change made while loading triggers one more reload.
+            version = self._shared_version()
+            if self._types is None or version != self._version:
+                # Table is always read from primary database, a lagging replica would be cached until next change.
+                user_types = UserType.objects.using(router.db_for_write(UserType)).order_by("id")
+                self._types = {user_type.pk: user_type for user_type in user_types}
+                self._list_responses = {}
+                self._version = version
+            self._checked_at = now
+            return self._types
+
+    def all(self) -> list:
+        return list(self._load().values())
+
+    def get(self, pk):
+        try:
+            return self._load().get(int(pk))
+        except (TypeError, ValueError):
+            return None
+
+    def get_list_response(self, key: str, load):
+        """
+        This method returns serialized list response for key (full request path) from process memory. load is
+        called to build the data when it is not cached for current version.
+        """
+        self._load()
+        version = self._version
+        data = self._list_responses.get(key)
+        if data is None:
+            # Cached response is kept until next change, so it is built from primary database like the table.
+            token = read_from_replica(False)
+            try:
+                data = load()
+            finally:
+                reset_replica(token)
+            with self._lock:
+                if version == self._version and len(self._list_responses) < self.max_list_responses:
+                    self._list_responses[key] = data
+        return data
+
+    def invalidate(self) -> None:
+        try:
+            self.cache.incr(self.version_key)
+        except ValueError:
+            self.cache.add(self.version_key, time.time_ns(), None)
+        with self._lock:
+            self._types = None
+            self._list_responses = {}
+
+
+user_type_cache = UserTypeCache()
@@ -1,25 +1,43 @@
-import random
-from datetime import timedelta
+import logging
+from datetime import datetime, timezone as dt_timezone
+from zoneinfo import ZoneInfo
 
-import boto3
+from django.conf import settings
 from django.contrib.auth.hashers import check_password
 from django.core.exceptions import ObjectDoesNotExist
-from django.core.mail import send_mail
+from django.db import transaction
+from django.db.models import Sum
 from django.utils import timezone
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
 from rest_framework.permissions import AllowAny
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken, AccessToken
 
-from DishDash import settings
 from DishDash.general_functions import error_message, success_message
+from .bulk import BulkWriteMixin
+from .geo import bounding_box_filter, haversine_km, parse_coordinate
+from .images import create_image_variants
 from .models import CustomUser, OTPVerification, UserProfile, BusinessProfile, BusinessManager, UserType, \
-    SMSOTPVerification
+    BusinessOpeningInterval, BusinessSearchTrigram
+from .notifications import enqueue_email
+from .operating_hours import minute_of_week
+from .otp import EMAIL_CHANNEL, SMS_CHANNEL, OTP_MATCHED, OTP_MISMATCH, get_otp_backend
+from .response_cache import BUSINESS_PROFILE_CACHE_NAMESPACE, ReadThroughCacheMixin, invalidate_list, \
+    invalidate_object
+from .search import match_score, normalize, trigrams
 from .serializers import CustomUserSerializer, OTPViewSetSerializer, UserProfileSerializer, BusinessProfileSerializer, \
-    BusinessManagerSerializer, UserTypeSerializer, SMSOTPVerificationSerializer
-from twilio.rest import Client
+    BusinessManagerSerializer, UserTypeSerializer, NearbyBusinessProfileSerializer, SearchBusinessProfileSerializer
+from .sms import get_sms_sender
+from .storage import save_uploaded_file, stream_uploads_to_storage, unique_key
+from .throttling import TokenBucketThrottle
+from .token_store import revocation_store
+from .uploads import DirectUploadMixin
+from .user_type_cache import user_type_cache
+
+logger = logging.getLogger(__name__)
 
 
 class PublicUserViewSet(viewsets.ModelViewSet):
@@ -63,11 +81,29 @@ class PublicUserViewSet(viewsets.ModelViewSet):
             response_dictionary = error_message('An error has occurred with message ' + str(e))
         return Response(response_dictionary, status=response_status)
 
-    @action(methods=['POST'], detail=False)
+    @staticmethod
+    def _new_tokens(user: CustomUser) -> tuple:
+        """
+        This method signs new refresh and access token for user.
+
+        return: (refresh token, access token, access token expiry datetime)
+        """
+        refresh = RefreshToken.for_user(user)
+        access = refresh.access_token
+        access_expiry = datetime.fromtimestamp(access["exp"], tz=dt_timezone.utc)
+        return refresh, access, access_expiry
+
+    @action(methods=['POST'], detail=False, throttle_classes=[TokenBucketThrottle])
     def login(self, request: Request, *args, **kwargs) -> Response:
         """
        This method implements the login functionality for user to login. We are also generating the access token,
-       refresh token and calculated access token expiry field data and saving it in database.
+       refresh token and calculated access token expiry.
+
+       When JWT_STATELESS_LOGIN setting is True (default with a shared cache) tokens are only signed and returned,
+       nothing is saved in database. Tokens are validated by signature and expiry and logout adds them in revocation
+       store.
+
+       When JWT_STATELESS_LOGIN setting is False tokens are saved in user table:
 
        In case if user is just created - this method will generate the new access token,
        refresh token and calculated access token expiry field data and saving it in database.
@@ -78,6 +114,9 @@ class PublicUserViewSet(viewsets.ModelViewSet):
        In case if access token is not expired based on the datatime saved it will return the same access token,
        refresh token and will not update the expiry datetime field.
 
+       Logins are limited per username, IP and globally (THROTTLE_BUCKETS setting), throttled requests get 429 before
+       password is hashed.
+
        param:
        request: Request (Object) this pertains the request from the POST call from the calling application.
        **args: These are additional parameters
@@ -87,78 +126,54 @@ class PublicUserViewSet(viewsets.ModelViewSet):
         # Step 1: we are extracting "username" and "password" from request data
         request_data = request.data
         # Step 2: In this try catch block we are testing following things.
-        # 1) We will check if access token is set and if it expired then generate a new token
-        # 2) We will check if access token is not expired then return same access token, refresh token and expiry date.
-        # 3) We will also verify if user exists in database.
+        # 1) We will verify if user exists in database and password is correct.
+        # 2) In stateless mode we will return new tokens without saving them.
+        # 3) We will check if access token is set and if it expired then generate a new token
+        # 4) We will check if access token is not expired then return same access token, refresh token and expiry date.
 
         try:
-            # Step 2.3 extracting user details from DB if not then raise exception
+            # Step 2.1 extracting user details from DB if not then raise exception
             user = CustomUser.objects.get(username=request_data.get("username"))
-            # Step 2.1 checking if access token of a user is already set
-            if user.access_token_expiry:
-                time_delta = (user.access_token_expiry - timezone.now()).total_seconds() / 3600
-                # if access token is set we authenticate the user.
-                if check_password(request_data.get("password"), user.password):
-                    # After authentication, we verify that if token is expired - in case it is expired we generate
-                    # a new token and save it.
-                    if time_delta < 0:
-                        # Generate JWT tokens
-                        refresh = RefreshToken.for_user(user)
-                        access = AccessToken.for_user(user)
-                        # Set expiration time for access token (e.g., 1 hour)
-                        access_expiry = timezone.now() + timedelta(hours=6)
-                        # Update user tokens and access token expiry
-                        user.refresh_token = str(refresh)
-                        user.access_token = str(access)
-                        user.access_token_expiry = access_expiry
-                        user.save()
-                        response_status = status.HTTP_202_ACCEPTED
-                        response_dictionary = success_message("User Authenticated and new Token generated",
-                                                              data={'refresh': str(refresh), 'access': str(access),
-                                                                    'access_token_expiry': user.access_token_expiry,
-                                                                    })
-                        return Response(response_dictionary, status=response_status)
-                    else:
-                        response_status = status.HTTP_202_ACCEPTED
-                        response_dictionary = success_message("User Authenticated and new Token generated",
-                                                              data={'refresh': str(user.refresh_token),
-                                                                    'access': str(user.access_token),
-                                                                    'access_token_expiry': user.access_token_expiry,
-                                                                    })
-                        return Response(response_dictionary, status=response_status)
-                else:
-                    response_status = status.HTTP_401_UNAUTHORIZED
-                    response_dictionary = error_message('User not authenticated')
-                    return Response(response_dictionary, status=response_status)
-            else:
-                # This block will fire if user access token expiry is empty, so we add new tokens and expiry date and
-                # time.
-                if check_password(request_data.get("password"), user.password):
-                    # Generate JWT tokens
-                    refresh = RefreshToken.for_user(user)
-                    access = AccessToken.for_user(user)
-
-                    # Set expiration time for access token (e.g., 1 hour)
-                    access_expiry = timezone.now() + timedelta(hours=6)
-                    # Update user tokens and access token expiry
-                    user.refresh_token = str(refresh)
-                    user.access_token = str(access)
-                    user.access_token_expiry = access_expiry
-                    user.save()
-
-                    response_status = status.HTTP_202_ACCEPTED
-                    response_dictionary = success_message("User Authenticated and new Token generated",
-                                                          data={'refresh': str(refresh), 'access': str(access),
-                                                                'access_token_expiry': user.access_token_expiry,
-                                                                })
-                    return Response(response_dictionary, status=response_status)
-                else:
-                    response_status = status.HTTP_401_UNAUTHORIZED
-                    response_dictionary = error_message('User not authenticated')
-                    return Response(response_dictionary, status=response_status)
-        except ValueError as e:
+        except (CustomUser.DoesNotExist, ValueError):
             return Response({'error': 'User does not exist'}, status=status.HTTP_404_NOT_FOUND)
 
+        if not check_password(request_data.get("password"), user.password):
+            response_status = status.HTTP_401_UNAUTHORIZED
+            response_dictionary = error_message('User not authenticated')
+            return Response(response_dictionary, status=response_status)
+
+        response_status = status.HTTP_202_ACCEPTED
+        # Step 2.2 in stateless mode tokens are only signed, user row is not updated.
+        if settings.JWT_STATELESS_LOGIN:
+            refresh, access, access_expiry = self._new_tokens(user)
+            response_dictionary = success_message("User Authenticated and new Token generated",
+                                                  data={'refresh': str(refresh), 'access': str(access),
+                                                        'access_token_expiry': access_expiry,
+                                                        })
+            return Response(response_dictionary, status=response_status)
+
+        # Step 2.3 checking if access token of a user is already set and not expired, then we return same tokens.
+        if user.access_token_expiry and user.access_token_expiry > timezone.now():
+            response_dictionary = success_message("User Authenticated and new Token generated",
+                                                  data={'refresh': str(user.refresh_token),
+                                                        'access': str(user.access_token),
+                                                        'access_token_expiry': user.access_token_expiry,
+                                                        })
+            return Response(response_dictionary, status=response_status)
+
+        # Step 2.4 This block will fire if user access token expiry is empty or expired, so we add new tokens and
+        # expiry date and time. Only token columns are updated.
+        refresh, access, access_expiry = self._new_tokens(user)
+        user.refresh_token = str(refresh)
+        user.access_token = str(access)
+        user.access_token_expiry = access_expiry
+        user.save(update_fields=["refresh_token", "access_token", "access_token_expiry"])
+        response_dictionary = success_message("User Authenticated and new Token generated",
+                                              data={'refresh': str(refresh), 'access': str(access),
+                                                    'access_token_expiry': user.access_token_expiry,
+                                                    })
+        return Response(response_dictionary, status=response_status)
+
     @action(detail=False, methods=['post'])
     def logout(self, request: Request, *args, **kwargs) -> Response:
         """
@@ -166,8 +181,9 @@ class PublicUserViewSet(viewsets.ModelViewSet):
             if user is authenticated. This function receives username in request body and access token in request
             header.
 
-            We filter out the user based on the username and extract the access token from the header. Access token
-            is passed in header so that to make sure that user is authenticated user.
+            In stateless mode access token is added in revocation store until it expires, so it is rejected by
+            authentication. Refresh tokens are not accepted by any endpoint, so they are not stored. Otherwise we
+            filter out the user based on the username and clear the tokens saved in user table.
 
             Params:
             request: HTTP Request object - you can access all fields from this variable
@@ -177,8 +193,6 @@ class PublicUserViewSet(viewsets.ModelViewSet):
             return:  rest_framework.response object with status of OK of failure to requesting source for this API
         """
         request_data = request.data
-        # extracting the user from database with respect to username provided in request body.
-        user = CustomUser.objects.get(username=request_data.get("username"))
         jwt_token = None
         # We are checking here if application has provided access token if that is so then request header
         # will have Authorization key in request dictionary
@@ -188,12 +202,17 @@ class PublicUserViewSet(viewsets.ModelViewSet):
             # Token should be in the format "Bearer <token>"
             jwt_token = auth_header.split()[1] if auth_header.startswith('Bearer') else None
         try:
-            # If we have access token then we set all token and expiry field to none.
+            # If we have access token then we revoke it or set all token and expiry field to none.
             if jwt_token:
-                user.refresh_token = None
-                user.access_token_expiry = None
-                user.access_token = None
-                user.save()
+                if settings.JWT_STATELESS_LOGIN:
+                    revocation_store.revoke(AccessToken(jwt_token))
+                else:
+                    # extracting the user from database with respect to username provided in request body.
+                    user = CustomUser.objects.get(username=request_data.get("username"))
+                    user.refresh_token = None
+                    user.access_token_expiry = None
+                    user.access_token = None
+                    user.save(update_fields=["refresh_token", "access_token", "access_token_expiry"])
                 response_status = status.HTTP_200_OK
                 response_dictionary = success_message("Logout successful")
                 return Response(response_dictionary, status=response_status)
@@ -215,6 +234,10 @@ class OTPViewSetCreateAPIView(viewsets.ModelViewSet):
     """
     This class inherits from CreateAPIView generic class, that specifically designed for adding data into database.
 
+    OTPs are issued and verified through OTP backend (OTP_BACKEND setting). With a shared cache default backend keeps
+    active OTP in cache with TTL and OTPVerification / SMSOTPVerification tables are only written when OTP_AUDIT_TO_DB
+    setting is True, otherwise OTPs are kept in those tables.
+
     Methods:
         create: param(request: HTTPRequest object, **args, **kwargs) This method is override in order to process data
         before adding into database.
@@ -222,20 +245,38 @@ class OTPViewSetCreateAPIView(viewsets.ModelViewSet):
     queryset = OTPVerification.objects.all()
     serializer_class = OTPViewSetSerializer
 
-    @action(detail=False, methods=['post'])
+    @staticmethod
+    def _verify_response(result: str) -> Response:
+        """
+        This method converts the result of OTP backend verify method into response for calling program.
+        """
+        if result == OTP_MATCHED:
+            response_status = status.HTTP_200_OK
+            response_dictionary = success_message("OTP MATCHED")
+        elif result == OTP_MISMATCH:
+            response_status = status.HTTP_404_NOT_FOUND
+            response_dictionary = success_message("OTP DOES NOT MATCH")
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+            response_dictionary = error_message("NO ACTIVE OTP FOUND")
+        return Response(response_dictionary, status=response_status)
+
+    @action(detail=False, methods=['post'], throttle_classes=[TokenBucketThrottle])
     def new_email_otp(self, request: Request, *args: any, **kwargs: any) -> Response:
         """
         In this view method we are taking HTTP request from system, that provides user id and email.
 
-        In Step 1 Retrieving the user id to set the last entry os is_expired to false.
+        In Step 1 we are validating that user exists.
 
-        In step 2 we extra the user email to send the otp to user. We also generate the OTP.
+        In step 2 we are issuing new OTP from OTP backend, it replaces the previous OTP of the user.
 
-        In step 3 we are validating and adding the otp in database against the user id.
+        In step 3 we are adding the otp email in notification queue, email is sent from background worker so we do
+        not wait for SMTP server here.
 
-        In step 4 we are emailing the otp on provided user email.
+        Requests are limited per user, email, IP and globally (THROTTLE_BUCKETS setting), throttled requests get 429
+        before OTP is issued.
 
-        In step 5 we are sending the response back to calling program.
+        In step 4 we are sending the response back to calling program.
 
         Params:
         request: HTTP Request object - you can access all fields from this variable
@@ -244,58 +285,45 @@ class OTPViewSetCreateAPIView(viewsets.ModelViewSet):
 
         return:  rest_framework.response object with status of OK of failure to requesting source for this API
         """
-
-        # STEP1: Retrieving the user id to set the last entry of is_expired to false. For further clarity please
-        # consult Project Manager or lead
-
         # Retrieve the data from the request
         request_data = request.data
+        user_id = request_data.get("user_id")
+        email = request_data.get("email")
 
-        # Filter the OTPViewSet objects based on the user_id and get the last one
-        ot_data = OTPVerification.objects.filter(user_id=request_data.get("user_id")).last()
-
-        # Update the 'is_expired' field of the retrieved object
-        if ot_data:
-            if not ot_data.is_expired:
-                ot_data.is_expired = True
-                ot_data.save()  # Saving the is_expired value in database.
-
-        "STEP2: We are generating the 6 digit otp and setting up the data to be saved"
-        otp_random = random.randrange(100000, 1000000)
-        request_data["otp_str"] = str(otp_random)
-        email = request_data["email"]
-
-        "STEP3: We are getting the correct serializer instance, validating the data and then saving it in database."
-        serializer = self.get_serializer(data=request_data)
+        "STEP1: Validating the user"
         try:
+            if not email or not CustomUser.objects.filter(pk=user_id).exists():
+                raise ValueError("user_id and email are required")
+        except (TypeError, ValueError) as e:
+            response_status = status.HTTP_400_BAD_REQUEST
+            response_dictionary = error_message("OTP NOT SAVED " + str(e))
+            return Response(response_dictionary, response_status)
 
-            # Validate the serializer data
-            serializer.is_valid(raise_exception=True)
-            # Creating new entry against the user id provided for OTP.
-            self.perform_create(serializer)
-        except Exception as e:
-            print(f"Unexpected error: {e}")
+        "STEP2: Issuing the 6 digit otp"
+        otp = get_otp_backend().issue(EMAIL_CHANNEL, user_id)
 
-        "STEP4: Sending OTP to user email "
+        "STEP3: Queueing OTP email for user "
         subject = 'Your OTP Password'
-        message = f'Your OTP password is {otp_random}'
+        message = f'Your OTP password is {otp}'
         email_from = settings.EMAIL_HOST_USER
         recipient_list = [email, ]
         try:
-            send_mail(subject, message, email_from, recipient_list)
-        except Exception as e:
+            if not enqueue_email(subject, message, recipient_list, email_from):
+                logger.error("Notification queue is full, OTP email to %s is dropped", email)
+        except Exception:
             # Handle all exceptions
-            print(f"Unexpected error: {e}")
+            logger.exception("OTP email to %s could not be queued", email)
 
-        "STEP5: Returning status response back to calling program"
+        "STEP4: Returning status response back to calling program"
         # Return response
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
+        response_dictionary = success_message("OTP SENT", {"user_id": user_id}, status.HTTP_201_CREATED)
+        return Response(response_dictionary, status=status.HTTP_201_CREATED)
 
     @action(detail=False, methods=['post'])
     def verify_email_otp(self, request: Request, *args: any, **kwargs: any) -> Response:
         """
-        In this method we are verifying the OTP provided by application through request body with entry in
-        the database.
+        In this method we are verifying the OTP provided by application through request body with active OTP of the
+        user. OTP is consumed when it matches, so it can not be used again.
 
         Params:
         request: HTTP Request object - you can access all fields from this variable
@@ -304,51 +332,26 @@ class OTPViewSetCreateAPIView(viewsets.ModelViewSet):
 
         return:  rest_framework.response object with status of OK of failure to requesting source for this API
         """
-        # STEP1: Retrieving the user id to set the last entry of is_expired to false. For further clarity please
-        # consult Project Manager or lead
-
-        # STEP 2: We verify the OTP code provided by application with OTP entry in database
-
-        # Retrieve the data from the request
         request_data = request.data
+        result = get_otp_backend().verify(EMAIL_CHANNEL, request_data.get("user_id"), request_data.get("otp"))
+        return self._verify_response(result)
 
-        # STEP1: Filter the OTPViewSet objects based on the user_id and get the last one
-        ot_data = OTPVerification.objects.filter(user_id=request_data.get("user_id")).last()
-
-        # STEP 2: This check should always be true as we are getting the last entry of OTP created, and it will have
-        # active OTP.
-        if not ot_data.is_expired:
-            # comparing the OTP from request with OTP in database
-            if request_data.get("otp") == ot_data.otp_str:
-                # if they are matched we are going to expire this OTP entry in the database
-                ot_data.is_expired = True
-                ot_data.save()  # Saving the is_expired value in database.
-                response_status = status.HTTP_200_OK
-                response_dictionary = success_message("OTP MATCHED")
-                return Response(response_dictionary, status=response_status)
-            else:
-                response_status = status.HTTP_404_NOT_FOUND
-                response_dictionary = success_message("OTP DOES NOT MATCH")
-                return Response(response_dictionary, status=response_status)
-        else:
-            response_status = status.HTTP_400_BAD_REQUEST
-            response_dictionary = error_message("NO ACTIVE OTP FOUND")
-            return Response(response_dictionary, status=response_status)
-
-    @action(detail=False, methods=['post'])
+    @action(detail=False, methods=['post'], throttle_classes=[TokenBucketThrottle])
     def new_sms_otp(self, request: Request, *args: any, **kwargs: any) -> Response:
         """
-        In this view method we are taking HTTP request from system, that provides user id and email.
-
-        In Step 1 Retrieving the user id to set the last entry os is_expired to false.
+        In this view method we are taking HTTP request from system, that provides user id and phone number.
 
-        In step 2 we extra the user email to send the otp to user. We also generate the OTP.
+        In Step 1 we are validating that user exists.
 
-        In step 3 we are validating and adding the otp in database against the user id.
+        In step 2 we are submitting the otp SMS to SMS sender, it is sent from background thread pool. New OTP is
+        issued from OTP backend only when sender accepts the SMS, as it replaces the previous OTP of the user. When too
+        many SMS are pending the response is 503 and the previous OTP can still be used. Response is 202 as the SMS is
+        only accepted for delivery, provider failures are logged and not returned to the client.
 
-        In step 4 we are emailing the otp on provided user email.
+        Requests are limited per user, phone, IP and globally (THROTTLE_BUCKETS setting), throttled requests get 429
+        before OTP is issued.
 
-        In step 5 we are sending the response back to calling program.
+        In step 3 we are sending the response back to calling program.
 
         Params:
         request: HTTP Request object - you can access all fields from this variable
@@ -357,49 +360,33 @@ class OTPViewSetCreateAPIView(viewsets.ModelViewSet):
 
         return:  rest_framework.response object with status of OK of failure to requesting source for this API
         """
-        # STEP1: Retrieving the user id to set the last entry of is_expired to false. For further clarity please
-        # consult Project Manager or lead
-
         # Retrieve the data from the request
         request_data = request.data
-        account_sid = settings.TWILIO_ACCOUNT_SID
-        auth_token = settings.TWILIO_AUTH_TOKEN
-        twilio_phone_number = settings.TWILIO_PHONE_NUMBER
-
-        # Filter the OTPViewSet objects based on the user_id and get the last one
-        ot_data = SMSOTPVerification.objects.filter(user_id=request_data.get("user_id")).last()
-        # Update the 'is_expired' field of the retrieved object
-        if ot_data:
-            ot_data.is_expired = True
-            ot_data.save()  # Saving the is_expired value in database.
-
-        "STEP2: We are generating the 6 digit otp and setting up the data to be saved"
-        otp_random = random.randrange(100000, 1000000)
-        request_data["otp_str"] = str(otp_random)
-        phone_no = request_data["phone_no"]
-
-        "STEP3: We are getting the correct serializer instance, validating the data and then saving it in database."
-        serializer = SMSOTPVerificationSerializer(data=request_data)
+        user_id = request_data.get("user_id")
+        phone_no = request_data.get("phone_no")
+
+        "STEP1: Validating the user"
         try:
-            # Validate the serializer data
-            serializer.is_valid(raise_exception=True)
-            # Creating new entry against the user id provided for OTP.
-            serializer.save()
-        except Exception as e:
+            if not phone_no or not CustomUser.objects.filter(pk=user_id).exists():
+                raise ValueError("user_id and phone_no are required")
+        except (TypeError, ValueError) as e:
             response_status = status.HTTP_400_BAD_REQUEST
-            response_dictionary = error_message("OTP NOT SAVED" + str(e))
+            response_dictionary = error_message("OTP NOT SAVED " + str(e))
             return Response(response_dictionary, response_status)
 
-        client = Client(account_sid, auth_token)
+        "STEP2: Submitting the SMS to sender thread pool, 6 digit otp is issued once the SMS is accepted"
+        def otp_message() -> str:
+            otp = get_otp_backend().issue(SMS_CHANNEL, user_id)
+            return f"Your OTP for Quick Serve is : {otp}"
 
         try:
-            message = client.messages.create(
-                body=f"Your OTP for Quick Serve is : {otp_random}",
-                from_=twilio_phone_number,
-                to=phone_no
-            )
-            response_status = status.HTTP_200_OK
-            response_dictionary = success_message("OTP SENT")
+            future = get_sms_sender().submit(phone_no, otp_message)
+            if future is None:
+                response_status = status.HTTP_503_SERVICE_UNAVAILABLE
+                response_dictionary = error_message("SMS NOT SENT, TOO MANY PENDING SMS")
+                return Response(response_dictionary, response_status)
+            response_status = status.HTTP_202_ACCEPTED
+            response_dictionary = success_message("OTP ACCEPTED FOR DELIVERY", code=response_status)
             return Response(response_dictionary, response_status)
         except Exception as e:
             response_status = status.HTTP_400_BAD_REQUEST
@@ -409,8 +396,8 @@ class OTPViewSetCreateAPIView(viewsets.ModelViewSet):
     @action(detail=False, methods=['post'])
     def verify_sms_otp(self, request: Request, *args: any, **kwargs: any) -> Response:
         """
-        In this method we are verifying the OTP provided by application through request body with entry in
-        the database.
+        In this method we are verifying the OTP provided by application through request body with active OTP of the
+        user. OTP is consumed when it matches, so it can not be used again.
 
         Params:
         request: HTTP Request object - you can access all fields from this variable
@@ -419,42 +406,17 @@ class OTPViewSetCreateAPIView(viewsets.ModelViewSet):
 
         return:  rest_framework.response object with status of OK of failure to requesting source for this API
         """
-        # STEP1: Retrieving the user id to set the last entry of is_expired to false. For further clarity please
-        # consult Project Manager or lead
-
-        # STEP 2: We verify the OTP code provided by application with OTP entry in database
-
-        # Retrieve the data from the request
         request_data = request.data
-
-        # STEP1: Filter the OTPViewSet objects based on the user_id and get the last one
-        ot_data = SMSOTPVerification.objects.filter(user_id=request_data.get("user_id")).last()
-
-        # STEP 2: This check should always be true as we are getting the last entry of OTP created, and it will have
-        # active OTP.
-        if ot_data:
-            if not ot_data.is_expired:
-                # comparing the OTP from request with OTP in database
-                if request_data.get("otp") == ot_data.otp_str:
-                    # if they are matched we are going to expire this OTP entry in the database
-                    ot_data.is_expired = True
-                    ot_data.save()  # Saving the is_expired value in database.
-                    response_status = status.HTTP_200_OK
-                    response_dictionary = success_message("OTP MATCHED")
-                    return Response(response_dictionary, status=response_status)
-                else:
-                    response_status = status.HTTP_404_NOT_FOUND
-                    response_dictionary = success_message("OTP DOES NOT MATCH")
-                    return Response(response_dictionary, status=response_status)
-            else:
-                response_status = status.HTTP_400_BAD_REQUEST
-                response_dictionary = error_message("NO ACTIVE OTP FOUND")
-                return Response(response_dictionary, status=response_status)
+        result = get_otp_backend().verify(SMS_CHANNEL, request_data.get("user_id"), request_data.get("otp"))
+        return self._verify_response(result)
 
 
-class UserProfileViewSet(viewsets.ModelViewSet):
+class UserProfileViewSet(DirectUploadMixin, viewsets.ModelViewSet):
     queryset = UserProfile.objects.all()
     serializer_class = UserProfileSerializer
+    replica_read_actions = ("list", "retrieve")
+    upload_field = "profile_image"
+    upload_prefix = "user_profile_image/"
 
     """
     This class inherits from viewsets.ModelViewSet generic class, that specifically designed for adding, updating and
@@ -467,28 +429,20 @@ class UserProfileViewSet(viewsets.ModelViewSet):
         To update an existing object completely: PUT /UserProfile/{pk}/
         To update an existing object partially: PATCH /UserProfile/{pk}/
         To delete an existing object: DELETE /UserProfile/{pk}/
+        To get presigned upload form for profile image: POST /UserProfile/{pk}/upload_target/
+        To save uploaded profile image: POST /UserProfile/{pk}/confirm_upload/
     """
 
     @action(detail=False, methods=['post'])
     def add_profile(self, request: Request, *args: any, **kwargs: any) -> Response:
-        request_data = request.data
-        file = request.FILES["profile_image"]
-        AWS_ACCESS_KEY_ID = settings.AWS_ACCESS_KEY_ID
-        AWS_SECRET_ACCESS_KEY = settings.AWS_SECRET_ACCESS_KEY
-        AWS_STORAGE_BUCKET_NAME = settings.AWS_STORAGE_BUCKET_NAME
-        AWS_S3_REGION_NAME = settings.AWS_S3_REGION_NAME
-        file_name = "user_profile_image/" + file.name
-
         try:
-            # Upload file to S3
-            s3 = boto3.client('s3',
-                              aws_access_key_id=AWS_ACCESS_KEY_ID,
-                              aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-                              region_name=AWS_S3_REGION_NAME)
-
-            s3.upload_fileobj(file, AWS_STORAGE_BUCKET_NAME, file_name)
-            file_url = f"https://{AWS_STORAGE_BUCKET_NAME}.s3.amazonaws.com/{file_name}"
-            request_data["profile_image"] = file_url
+            # Image is streamed to storage while request body is read, so it is not buffered by Django.
+            stream_uploads_to_storage(request, {"profile_image": "user_profile_image/"})
+            request_data = request.data
+            file = request.FILES["profile_image"]
+            # Streamed file already has its unique key.
+            image_key = getattr(file, "key", None) or unique_key("user_profile_image/", file.name)
+            request_data["profile_image"] = save_uploaded_file(file, image_key)
         except Exception as e:
             response_status = status.HTTP_400_BAD_REQUEST
             response_dictionary = error_message("NOT ABLE TO UPLOAD PICTURE ON S3" + str(e))
@@ -499,6 +453,8 @@ class UserProfileViewSet(viewsets.ModelViewSet):
             serializer.is_valid(raise_exception=True)
             # Creating new entry against the user id provided for OTP.
             self.perform_create(serializer)
+            # Thumb / card / full variants are created off the request thread and saved in image_variants.
+            create_image_variants(serializer.instance, image_key)
             response_status = status.HTTP_200_OK
             response_dictionary = success_message("PROFILE CREATED", serializer.data)
             return Response(response_dictionary, status=response_status)
@@ -508,9 +464,10 @@ class UserProfileViewSet(viewsets.ModelViewSet):
             return Response(response_dictionary, status=response_status)
 
 
-class UserTypeViewSet(viewsets.ModelViewSet):
+class UserTypeViewSet(BulkWriteMixin, viewsets.ModelViewSet):
     queryset = UserType.objects.all()
     serializer_class = UserTypeSerializer
+    replica_read_actions = ("list", "retrieve")
 
     """
     This class inherits from viewsets.ModelViewSet generic class, that specifically designed for adding, updating and
@@ -523,12 +480,36 @@ class UserTypeViewSet(viewsets.ModelViewSet):
         To update an existing object completely: PUT /UserType/{pk}/
         To update an existing object partially: PATCH /UserType/{pk}/
         To delete an existing object: DELETE /UserType/{pk}/
+        To create many objects: POST /UserType/bulk/
+        To update many objects partially: PATCH /UserType/bulk/
+
+    List and retrieve are served from process memory cache of UserType table (see AppUser.user_type_cache).
     """
 
+    def list(self, request: Request, *args: any, **kwargs: any) -> Response:
+        def load():
+            return super(UserTypeViewSet, self).list(request, *args, **kwargs).data
+
+        return Response(user_type_cache.get_list_response(request.build_absolute_uri(), load))
+
+    def retrieve(self, request: Request, *args: any, **kwargs: any) -> Response:
+        user_type = user_type_cache.get(kwargs.get("pk"))
+        if user_type is None:
+            raise NotFound()
+        return Response(self.get_serializer(user_type).data)
 
-class BusinessProfileViewSet(viewsets.ModelViewSet):
+    def after_bulk_write(self, instances: list) -> None:
+        # bulk writes do not send post_save signal, so user type cache is invalidated here.
+        transaction.on_commit(user_type_cache.invalidate)
+
+
+class BusinessProfileViewSet(BulkWriteMixin, DirectUploadMixin, ReadThroughCacheMixin, viewsets.ModelViewSet):
     queryset = BusinessProfile.objects.all()
     serializer_class = BusinessProfileSerializer
+    replica_read_actions = ("list", "retrieve")
+    cache_namespace = BUSINESS_PROFILE_CACHE_NAMESPACE
+    upload_field = "business_profile_image"
+    upload_prefix = "business_image/"
 
     """
     This class inherits from viewsets.ModelViewSet generic class, that specifically designed for adding, updating and
@@ -541,28 +522,202 @@ class BusinessProfileViewSet(viewsets.ModelViewSet):
         To update an existing object completely: PUT /BusinessProfile/{pk}/
         To update an existing object partially: PATCH /BusinessProfile/{pk}/
         To delete an existing object: DELETE /BusinessProfile/{pk}/
+        To create many objects: POST /BusinessProfile/bulk/
+        To update many objects partially: PATCH /BusinessProfile/bulk/
+        To list businesses near a location: GET /BusinessProfile/nearby/?lat=&lng=&radius=
+        To list businesses open at a time: GET /BusinessProfile/?open_at=now or ?open_at=2024-01-01T12:00:00
+        To search businesses by name or address: GET /BusinessProfile/search/?q=&limit=
+        To get presigned upload form for business image: POST /BusinessProfile/{pk}/upload_target/
+        To save uploaded business image: POST /BusinessProfile/{pk}/confirm_upload/
+
+    Retrieve and list responses are served from response cache, cache is invalidated when a business profile is
+    saved or deleted (see AppUser.signals). Lists filtered with open_at are not cached, "now" changes every minute.
+    Hits and misses are counted in dishdash_response_cache_requests_total metric.
     """
 
+    @staticmethod
+    def open_at_minute(value: str) -> int:
+        """
+        This method converts open_at query parameter ("now" or ISO 8601 date time) into minute of week in
+        BUSINESS_HOURS_TIME_ZONE setting. Date time without offset is taken as time in BUSINESS_HOURS_TIME_ZONE.
+
+        raise: ValueError when value is not valid date time
+        """
+        business_time_zone = ZoneInfo(settings.BUSINESS_HOURS_TIME_ZONE)
+        if value == "now":
+            moment = timezone.now()
+        else:
+            moment = datetime.fromisoformat(value)
+            if timezone.is_naive(moment):
+                moment = moment.replace(tzinfo=business_time_zone)
+        return minute_of_week(moment.astimezone(business_time_zone))
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        open_at = self.request.query_params.get("open_at") if self.action == "list" else None
+        if open_at:
+            minute = self.open_at_minute(open_at)
+            queryset = queryset.filter(pk__in=BusinessOpeningInterval.objects.filter(
+                start_minute__lte=minute, end_minute__gt=minute).values("business_id"))
+        return queryset
+
+    def list(self, request: Request, *args: any, **kwargs: any) -> Response:
+        open_at = request.query_params.get("open_at")
+        if not open_at:
+            return super().list(request, *args, **kwargs)
+        try:
+            self.open_at_minute(open_at)
+        except ValueError:
+            response_dictionary = error_message("open_at MUST BE now OR ISO 8601 DATE TIME")
+            return Response(response_dictionary, status=status.HTTP_400_BAD_REQUEST)
+        return super(ReadThroughCacheMixin, self).list(request, *args, **kwargs)
+
+    def before_bulk_write(self, instances: list, fields: set) -> set:
+        # bulk_create / bulk_update do not call save, so numeric coordinates and geohash are calculated here.
+        self.schedule_changed = []
+        self.search_changed = []
+        for instance in instances:
+            instance.update_geo_fields()
+            if instance.update_operating_schedule():
+                self.schedule_changed.append(instance)
+            if instance.search_text_changed():
+                self.search_changed.append(instance)
+        if fields and {"latitude", "longitude"} & fields:
+            fields |= {"geo_latitude", "geo_longitude", "geohash"}
+        if fields and "operating_hours" in fields:
+            fields |= {"operating_schedule"}
+        return fields
+
+    def after_bulk_write(self, instances: list) -> None:
+        # bulk writes do not send post_save signal, so "open at" intervals, search trigrams and response cache are
+        # updated here. Indexes are rebuilt in the write transaction, response cache after commit.
+        BusinessOpeningInterval.rebuild(self.schedule_changed)
+        BusinessSearchTrigram.rebuild(self.search_changed)
+        pks = [instance.pk for instance in instances]
+
+        def invalidate() -> None:
+            for pk in pks:
+                invalidate_object(self.cache_namespace, pk)
+            invalidate_list(self.cache_namespace)
+
+        transaction.on_commit(invalidate)
+
+    @action(detail=False, methods=['get'])
+    def nearby(self, request: Request, *args: any, **kwargs: any) -> Response:
+        """
+        In this method we are returning the businesses which are within radius (in kilometers) of provided latitude
+        and longitude, sorted by distance.
+
+        In step 1 we validate the query parameters.
+
+        In step 2 we pre filter the businesses with bounding box of the search circle. This uses geohash and
+        latitude / longitude indexes, so only businesses around the location are read from database.
+
+        In step 3 we calculate the exact distance for candidates only and drop the ones outside the circle.
+
+        Params:
+        request: HTTP Request object - query parameters lat, lng, radius (optional) and limit (optional)
+        **args: These are additional parameters
+        **kwargs: These are additional - optional keyword parameters
+
+        return:  rest_framework.response object with status of OK of failure to requesting source for this API
+        """
+        "STEP1: Validating the query parameters"
+        latitude = parse_coordinate(request.query_params.get("lat"), 90.0)
+        longitude = parse_coordinate(request.query_params.get("lng"), 180.0)
+        if latitude is None or longitude is None:
+            response_dictionary = error_message("VALID lat AND lng ARE REQUIRED")
+            return Response(response_dictionary, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            radius = float(request.query_params.get("radius", settings.NEARBY_DEFAULT_RADIUS_KM))
+            limit = int(request.query_params.get("limit", settings.NEARBY_MAX_RESULTS))
+        except ValueError:
+            response_dictionary = error_message("radius AND limit MUST BE NUMBERS")
+            return Response(response_dictionary, status=status.HTTP_400_BAD_REQUEST)
+        if not 0 < radius <= settings.NEARBY_MAX_RADIUS_KM:
+            response_dictionary = error_message(f"radius MUST BE BETWEEN 0 AND {settings.NEARBY_MAX_RADIUS_KM} KM")
+            return Response(response_dictionary, status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, settings.NEARBY_MAX_RESULTS))
+
+        "STEP2: Pre filtering the candidates with bounding box"
+        candidates = self.filter_queryset(self.get_queryset()).filter(
+            bounding_box_filter(latitude, longitude, radius))
+
+        "STEP3: Calculating exact distance for candidates and sorting them"
+        businesses = []
+        for business in candidates:
+            business.distance_km = round(
+                haversine_km(latitude, longitude, business.geo_latitude, business.geo_longitude), 3)
+            if business.distance_km <= radius:
+                businesses.append(business)
+        businesses.sort(key=lambda business: business.distance_km)
+
+        serializer = NearbyBusinessProfileSerializer(businesses[:limit], many=True)
+        response_dictionary = success_message("NEARBY BUSINESSES", serializer.data)
+        return Response(response_dictionary, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['get'])
+    def search(self, request: Request, *args: any, **kwargs: any) -> Response:
+        """
+        In this method we are returning the businesses whose name or address match the search text, best match first.
+        Search tolerates typos and unfinished words e.g. "piza hut" and "pizz" both find "Pizza Hut".
+
+        In step 1 we validate the query parameters and split the search text into trigrams.
+
+        In step 2 we read the businesses sharing most trigrams with search text from trigram index table. Only the
+        index rows of search trigrams are read, so time does not grow with number of businesses.
+
+        In step 3 we rank the candidates (see AppUser.search.match_score) and drop weak matches.
+
+        Params:
+        request: HTTP Request object - query parameters q and limit (optional)
+        **args: These are additional parameters
+        **kwargs: These are additional - optional keyword parameters
+
+        return:  rest_framework.response object with status of OK of failure to requesting source for this API
+        """
+        "STEP1: Validating the query parameters"
+        query = normalize(request.query_params.get("q", ""))
+        query_grams = trigrams(query, prefix=True)
+        if not query_grams:
+            response_dictionary = error_message("SEARCH TEXT q OF AT LEAST 2 CHARACTERS IS REQUIRED")
+            return Response(response_dictionary, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = int(request.query_params.get("limit", settings.SEARCH_MAX_RESULTS))
+        except ValueError:
+            response_dictionary = error_message("limit MUST BE A NUMBER")
+            return Response(response_dictionary, status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, settings.SEARCH_MAX_RESULTS))
+
+        "STEP2: Reading the candidates with most matching trigrams"
+        candidate_ids = BusinessSearchTrigram.objects.filter(trigram__in=query_grams,
+                                                            business__is_deleted=False).values(
+            "business_id").annotate(matched=Sum("weight")).order_by("-matched").values_list(
+            "business_id", flat=True)[:settings.SEARCH_CANDIDATES]
+        candidates = self.filter_queryset(self.get_queryset()).filter(pk__in=list(candidate_ids))
+
+        "STEP3: Ranking the candidates"
+        businesses = []
+        for business in candidates:
+            business.score = round(match_score(query, query_grams, business.business_name, business.address), 3)
+            if business.score >= settings.SEARCH_MIN_SCORE:
+                businesses.append(business)
+        businesses.sort(key=lambda business: (-business.score, len(business.business_name), business.pk))
+
+        serializer = SearchBusinessProfileSerializer(businesses[:limit], many=True)
+        response_dictionary = success_message("SEARCH RESULTS", serializer.data)
+        return Response(response_dictionary, status=status.HTTP_200_OK)
+
     @action(detail=False, methods=['post'])
     def add_profile(self, request: Request, *args: any, **kwargs: any) -> Response:
-        request_data = request.data
-        file = request.FILES["business_profile_image"]
-        AWS_ACCESS_KEY_ID = settings.AWS_ACCESS_KEY_ID
-        AWS_SECRET_ACCESS_KEY = settings.AWS_SECRET_ACCESS_KEY
-        AWS_STORAGE_BUCKET_NAME = settings.AWS_STORAGE_BUCKET_NAME
-        AWS_S3_REGION_NAME = settings.AWS_S3_REGION_NAME
-        file_name = "business_image/" + file.name
-
         try:
-            # Upload file to S3
-            s3 = boto3.client('s3',
-                              aws_access_key_id=AWS_ACCESS_KEY_ID,
-                              aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-                              region_name=AWS_S3_REGION_NAME)
-
-            s3.upload_fileobj(file, AWS_STORAGE_BUCKET_NAME, file_name)
-            file_url = f"https://{AWS_STORAGE_BUCKET_NAME}.s3.amazonaws.com/{file_name}"
-            request_data["business_profile_image"] = file_url
+            # Image is streamed to storage while request body is read, so it is not buffered by Django.
+            stream_uploads_to_storage(request, {"business_profile_image": "business_image/"})
+            request_data = request.data
+            file = request.FILES["business_profile_image"]
+            # Streamed file already has its unique key.
+            image_key = getattr(file, "key", None) or unique_key("business_image/", file.name)
+            request_data["business_profile_image"] = save_uploaded_file(file, image_key)
         except Exception as e:
             response_status = status.HTTP_400_BAD_REQUEST
             response_dictionary = error_message("NOT ABLE TO UPLOAD PICTURE ON S3" + str(e))
@@ -573,6 +728,8 @@ class BusinessProfileViewSet(viewsets.ModelViewSet):
             serializer.is_valid(raise_exception=True)
             # Creating new entry against the user id provided for OTP.
             self.perform_create(serializer)
+            # Thumb / card / full variants are created off the request thread and saved in image_variants.
+            create_image_variants(serializer.instance, image_key)
             response_status = status.HTTP_200_OK
             response_dictionary = success_message("PROFILE CREATED", serializer.data)
             return Response(response_dictionary, status=response_status)
@@ -582,7 +739,7 @@ class BusinessProfileViewSet(viewsets.ModelViewSet):
             return Response(response_dictionary, status=response_status)
 
 
-class BusinessManagerViewSet(viewsets.ModelViewSet):
+class BusinessManagerViewSet(BulkWriteMixin, viewsets.ModelViewSet):
     queryset = BusinessManager.objects.all()
     serializer_class = BusinessManagerSerializer
 
@@ -597,4 +754,26 @@ class BusinessManagerViewSet(viewsets.ModelViewSet):
         To update an existing object completely: PUT /BusinessManager/{pk}/
         To update an existing object partially: PATCH /BusinessManager/{pk}/
         To delete an existing object: DELETE /BusinessManager/{pk}/
+        To create many objects: POST /BusinessManager/bulk/
+        To update many objects partially: PATCH /BusinessManager/bulk/
+        To show related objects: GET /BusinessManager/?expand=user,business,user_type
     """
+
+    def initial(self, request, *args, **kwargs):
+        """
+        This method rejects unknown ?expand= names with 400 before the request is handled, so a write is not saved
+        when its response can not be shown.
+        """
+        super().initial(request, *args, **kwargs)
+        self.serializer_class.get_expand(request)
+
+    def get_queryset(self):
+        """
+        This method joins the expanded foreign keys in the same query, so number of queries does not grow with number
+        of managers in the list.
+        """
+        queryset = super().get_queryset()
+        related_fields = self.serializer_class.related_fields_to_select(self.request)
+        if related_fields:
+            queryset = queryset.select_related(*related_fields)
+        return queryset
@@ -7,10 +7,19 @@ For more information on this file, see
 https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
 """
 
+import logging
 import os
 
 from django.core.asgi import get_asgi_application
 
+from DishDash.db.mysql_pool.pool import prewarm_database_pools
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'DishDash.settings')
 
 application = get_asgi_application()
+
+# Open MIN_SIZE pooled database connections now, so first requests of the worker do not wait for connect.
+try:
+    prewarm_database_pools()
+except Exception as e:
+    logging.getLogger(__name__).warning("Database pool could not be prewarmed: %s", e)
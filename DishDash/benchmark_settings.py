@@ -0,0 +1,49 @@
+"""
+Django settings for running DishDash benchmarks on a local machine.
+
+These settings extend DishDash.settings and replace every outside service with a local one: SQLite database file,
+in-memory email outbox, fake SMS provider and local file system storage, so numbers only depend on our own code.
+
+Usage:
+    DJANGO_SETTINGS_MODULE=DishDash.benchmark_settings python manage.py run_benchmarks --output bench.json
+"""
+import tempfile
+
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR, os
+
+BENCHMARK_SETTINGS = True
+
+DEBUG = False
+ALLOWED_HOSTS = ['*']
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.getenv("BENCHMARK_DB_PATH", os.path.join(tempfile.gettempdir(), "dishdash_benchmark.sqlite3")),
+        # Concurrent writers wait for the lock instead of failing with "database is locked".
+        'OPTIONS': {'timeout': 30},
+    }
+}
+
+EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+EMAIL_HOST_USER = 'benchmark@dishdash.local'
+NOTIFICATION_QUEUE_BACKEND = 'AppUser.notifications.SynchronousNotificationQueue'
+IMAGE_PIPELINE_BACKEND = 'AppUser.images.SynchronousImagePipeline'
+SMS_PROVIDER_BACKEND = 'AppUser.sms.FakeSMSProvider'
+SMS_PROVIDER_OPTIONS = {'latency': float(os.getenv("BENCHMARK_SMS_LATENCY", 0.05))}
+STORAGE_BACKEND = 'AppUser.storage.LocalFileSystemStorage'
+STORAGE_LOCAL_ROOT = os.getenv("BENCHMARK_MEDIA_ROOT", BASE_DIR / "benchmark_media")
+# Benchmarks send thousands of logins and OTPs from one address, throttles would measure 429 responses instead.
+THROTTLE_ENABLED = False
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'benchmark',
+    }
+}
+# Benchmarks and tests run in one process, so OTPs and revoked tokens can be kept in local memory cache.
+OTP_BACKEND = 'AppUser.otp.CacheOTPBackend'
+JWT_STATELESS_LOGIN = True
+SILENCED_SYSTEM_CHECKS = ['AppUser.E001', 'AppUser.E002']
@@ -0,0 +1,66 @@
+import atexit
+import threading
+from functools import partial
+
+from django.db.backends.mysql import base as mysql_base
+
+from .pool import ConnectionPool, PoolTimeout
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+@atexit.register
+def close_pools() -> None:
+    for pool in list(_pools.values()):
+        pool.close_all()
+
+
+class DatabaseWrapper(mysql_base.DatabaseWrapper):
+    """
+    This class in inherited from django MySQL DatabaseWrapper class. Connections are taken from a process wide
+    ConnectionPool instead of being opened for every request, and closing the connection at the end of request gives
+    it back to the pool.
+
+    Pool is configured with "POOL" key of database settings:
+        MIN_SIZE: connections opened by prewarm_database_pools (default 0)
+        MAX_SIZE: connections kept open (default 10)
+        MAX_OVERFLOW: extra connections opened under load and closed when given back (default 10)
+        TIMEOUT: seconds to wait for a free connection before OperationalError (default 10)
+        RECYCLE: seconds after which connection is opened again, keep it below MySQL wait_timeout (default 3600)
+        PRE_PING: ping connection on checkout (default True)
+
+    Usage:
+        DATABASES = {"default": {"ENGINE": "DishDash.db.mysql_pool", ..., "POOL": {"MAX_SIZE": 20}}}
+    """
+
+    def get_pool(self) -> ConnectionPool:
+        pool = _pools.get(self.alias)
+        if pool is None:
+            with _pools_lock:
+                pool = _pools.get(self.alias)
+                if pool is None:
+                    options = self.settings_dict.get("POOL") or {}
+                    conn_params = self.get_connection_params()
+                    pool = ConnectionPool(partial(self.connect_to_server, conn_params),
+                                          min_size=options.get("MIN_SIZE", 0),
+                                          max_size=options.get("MAX_SIZE", 10),
+                                          max_overflow=options.get("MAX_OVERFLOW", 10),
+                                          timeout=options.get("TIMEOUT", 10.0),
+                                          recycle=options.get("RECYCLE", 3600.0),
+                                          pre_ping=options.get("PRE_PING", True))
+                    _pools[self.alias] = pool
+        return pool
+
+    @staticmethod
+    def connect_to_server(conn_params: dict):
+        connection = mysql_base.Database.connect(**conn_params)
+        # Same as django MySQL backend, bytes encoder of mysqlclient is not used.
+        connection.encoders.pop(bytes, None)
+        return connection
+
+    def get_new_connection(self, conn_params):
+        try:
+            return self.get_pool().checkout()
+        except PoolTimeout as e:
+            raise mysql_base.Database.OperationalError(str(e)) from e
@@ -0,0 +1,192 @@
+import os
+import threading
+import time
+from collections import deque
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class PooledConnection:
+    """
+    This class wraps a DB-API connection of the pool. Every attribute is read from the real connection, except
+    close which gives the connection back to the pool instead of closing it.
+    """
+
+    def __init__(self, pool, connection, created_at: float):
+        self._pool = pool
+        self._connection = connection
+        self._created_at = created_at
+        self._closed = False
+        self._pid = os.getpid()
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+    def close(self) -> None:
+        if not self._closed:
+            self._closed = True
+            self._pool.checkin(self)
+
+
+class ConnectionPool:
+    """
+    This class keeps open database connections so requests do not pay connect and authentication time.
+
+    Params:
+        connect: callable which opens a new DB-API connection.
+        min_size: int - connections opened by prewarm.
+        max_size: int - connections kept open in the pool.
+        max_overflow: int - extra connections opened under load, they are closed when given back.
+        timeout: float - seconds to wait for a free connection when max_size + max_overflow are in use.
+        recycle: float - seconds after which a connection is closed and opened again, keep it below MySQL
+        wait_timeout.
+        pre_ping: bool - ping connection on checkout and open a new one if server has closed it.
+
+    Methods:
+        checkout: Return PooledConnection, opening a new connection if no idle one is available.
+        checkin: param(pooled) Give connection back, it is rolled back and kept or closed.
+        prewarm: Open connections until min_size are idle.
+        close_all: Close idle connections.
+    """
+
+    def __init__(self, connect, min_size: int = 0, max_size: int = 10, max_overflow: int = 10,
+                 timeout: float = 10.0, recycle: float = 3600.0, pre_ping: bool = True):
+        self.connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.recycle = recycle
+        self.pre_ping = pre_ping
+        self._idle = deque()
+        self._size = 0
+        self._condition = threading.Condition()
+        self._pid = os.getpid()
+
+    def _check_fork(self) -> None:
+        """
+        Connections opened before fork (e.g. gunicorn --preload) share sockets with the parent process, child
+        forgets them without closing and opens its own.
+        """
+        if self._pid != os.getpid():
+            self._idle = deque()
+            self._size = 0
+            self._pid = os.getpid()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def idle(self) -> int:
+        return len(self._idle)
+
+    def _open(self):
+        try:
+            return PooledConnection(self, self.connect(), time.monotonic())
+        except Exception:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+
+    def _discard(self, connection) -> None:
+        try:
+            connection.close()
+        except Exception:
+            pass
+        with self._condition:
+            self._size -= 1
+            self._condition.notify()
+
+    def _is_healthy(self, connection, created_at: float) -> bool:
+        if self.recycle and time.monotonic() - created_at > self.recycle:
+            return False
+        if not self.pre_ping:
+            return True
+        try:
+            connection.ping()
+            return True
+        except Exception:
+            return False
+
+    def checkout(self) -> PooledConnection:
+        deadline = time.monotonic() + self.timeout
+        while True:
+            with self._condition:
+                self._check_fork()
+                while not self._idle and self._size >= self.max_size + self.max_overflow:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolTimeout(f"No database connection was free in {self.timeout} seconds "
+                                          f"({self._size} connections are in use)")
+                    self._condition.wait(remaining)
+                if self._idle:
+                    # Last returned connection is used first, so extra idle connections age and get recycled.
+                    connection, created_at = self._idle.pop()
+                else:
+                    self._size += 1
+                    connection = None
+            if connection is None:
+                return self._open()
+            if self._is_healthy(connection, created_at):
+                # A new wrapper is returned every time, so a stale reference of previous user can not close it.
+                return PooledConnection(self, connection, created_at)
+            self._discard(connection)
+
+    def checkin(self, pooled: PooledConnection) -> None:
+        with self._condition:
+            self._check_fork()
+            if pooled._pid != self._pid:
+                # Connection was checked out before fork, its socket still belongs to parent process.
+                return
+        try:
+            # Uncommitted transaction of the previous user must not leak into the next one.
+            pooled._connection.rollback()
+        except Exception:
+            self._discard(pooled._connection)
+            return
+        with self._condition:
+            if self._size > self.max_size:
+                overflow = True
+            else:
+                overflow = False
+                self._idle.append((pooled._connection, pooled._created_at))
+                self._condition.notify()
+        if overflow:
+            self._discard(pooled._connection)
+
+    def prewarm(self) -> None:
+        opened = []
+        try:
+            while True:
+                with self._condition:
+                    if (len(self._idle) + len(opened) >= min(self.min_size, self.max_size)
+                            or self._size >= self.max_size + self.max_overflow):
+                        break
+                    self._size += 1
+                opened.append(self._open())
+        finally:
+            for pooled in opened:
+                pooled.close()
+
+    def close_all(self) -> None:
+        with self._condition:
+            idle, self._idle = list(self._idle), deque()
+        for connection, created_at in idle:
+            self._discard(connection)
+
+
+def prewarm_database_pools() -> None:
+    """
+    This function opens MIN_SIZE connections of every pooled database, it is called from wsgi.py / asgi.py so the
+    first requests of a new worker do not wait for MySQL connect.
+    """
+    from django.db import connections
+
+    for alias in connections:
+        connection = connections[alias]
+        if hasattr(connection, "get_pool"):
+            connection.get_pool().prewarm()
@@ -0,0 +1,69 @@
+import hashlib
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+
+# True while current request may read from a replica, set by AppUser.middleware.ReplicaRoutingMiddleware.
+_read_from_replica = ContextVar("read_from_replica", default=False)
+
+
+def read_from_replica(enabled: bool):
+    """
+    This function allows or stops replica reads for current request (or task) and returns token for reset_replica.
+    """
+    return _read_from_replica.set(enabled)
+
+
+def reset_replica(token) -> None:
+    _read_from_replica.reset(token)
+
+
+def is_reading_from_replica() -> bool:
+    return bool(settings.DATABASE_REPLICAS) and _read_from_replica.get()
+
+
+def _sticky_key(client_id: str) -> str:
+    return "replica_sticky:" + hashlib.sha256(client_id.encode()).hexdigest()
+
+
+def mark_client_wrote(client_id: str) -> None:
+    """
+    This function sends reads of client to primary database for REPLICA_STICKY_SECONDS setting, so client reads its
+    own writes while replicas catch up.
+    """
+    caches[settings.REPLICA_STICKY_CACHE].set(_sticky_key(client_id), 1, settings.REPLICA_STICKY_SECONDS)
+
+
+def client_wrote_recently(client_id: str) -> bool:
+    return caches[settings.REPLICA_STICKY_CACHE].get(_sticky_key(client_id)) is not None
+
+
+class ReplicaRouter:
+    """
+    This class is a database router which sends reads to one of DATABASE_REPLICAS when current request allows it
+    (safe list / retrieve actions, see ReplicaRoutingMiddleware) and everything else to "default" database.
+
+    Replicas are copies of "default" made by MySQL replication, so migrations only run on "default".
+    """
+    primary = "default"
+
+    def db_for_read(self, model, **hints):
+        if is_reading_from_replica():
+            return random.choice(settings.DATABASE_REPLICAS)
+        return self.primary
+
+    def db_for_write(self, model, **hints):
+        return self.primary
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {self.primary, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 
+from datetime import timedelta
 from pathlib import Path
 import os
 from dotenv import load_dotenv
@@ -44,6 +45,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'AppUser.middleware.MetricsMiddleware',
+    'AppUser.middleware.ProfilingMiddleware',
+    'AppUser.middleware.QueryInstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -51,6 +55,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'AppUser.middleware.ReplicaRoutingMiddleware',
 ]
 
 ROOT_URLCONF = 'DishDash.urls'
@@ -82,15 +87,40 @@ DATABASES = {
     #     'NAME': BASE_DIR / 'db.sqlite3',
     # }
     'default': {
-        'ENGINE': 'django.db.backends.mysql',
+        # Pooled MySQL backend, connections are reused between requests (see DishDash/db/mysql_pool/base.py).
+        'ENGINE': os.getenv("DB_ENGINE", 'DishDash.db.mysql_pool'),
         'NAME': 'quickserve',
         'USER': 'root',
         'PASSWORD': 'root',
         'HOST': os.getenv("DB_HOST", '127.0.0.1'),
-        'PORT': os.getenv("DB_PORT", "3306")
+        'PORT': os.getenv("DB_PORT", "3306"),
+        # With the pool connection is given back at the end of every request, keep it 0 unless using plain backend.
+        'CONN_MAX_AGE': int(os.getenv("DB_CONN_MAX_AGE", 0)),
+        'CONN_HEALTH_CHECKS': True,
+        'POOL': {
+            'MIN_SIZE': int(os.getenv("DB_POOL_MIN_SIZE", 2)),
+            'MAX_SIZE': int(os.getenv("DB_POOL_MAX_SIZE", 10)),
+            'MAX_OVERFLOW': int(os.getenv("DB_POOL_MAX_OVERFLOW", 10)),
+            'TIMEOUT': float(os.getenv("DB_POOL_TIMEOUT", 10)),
+            'RECYCLE': float(os.getenv("DB_POOL_RECYCLE", 3600)),
+            'PRE_PING': os.getenv("DB_POOL_PRE_PING", "True") == "True",
+        },
     }
 }
 
+# Read replicas, comma separated hosts e.g. "10.0.0.2:3306,10.0.0.3". Safe list / retrieve actions read from them.
+DATABASE_REPLICAS = []
+for index, replica in enumerate(filter(None, os.getenv("DATABASE_REPLICA_HOSTS", "").split(","))):
+    host, _, port = replica.strip().partition(":")
+    alias = f"replica_{index + 1}"
+    DATABASES[alias] = dict(DATABASES['default'], HOST=host, PORT=port or DATABASES['default']['PORT'],
+                            TEST={'MIRROR': 'default'})
+    DATABASE_REPLICAS.append(alias)
+DATABASE_ROUTERS = ['DishDash.db.routers.ReplicaRouter']
+# Seconds for which reads of a client go to primary database after it writes.
+REPLICA_STICKY_SECONDS = int(os.getenv("REPLICA_STICKY_SECONDS", 5))
+REPLICA_STICKY_CACHE = os.getenv("REPLICA_STICKY_CACHE", 'default')
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -111,10 +141,58 @@ AUTH_PASSWORD_VALIDATORS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'AppUser.authentication.RevocationAwareJWTAuthentication',
 
     ),
+    'DEFAULT_PAGINATION_CLASS': 'AppUser.pagination.KeysetCursorPagination',
+    'PAGE_SIZE': int(os.getenv("PAGINATION_PAGE_SIZE", 50)),
+    # Number of proxies / load balancers in front of the app, client IP is taken from X-Forwarded-For header.
+    'NUM_PROXIES': int(os.getenv("NUM_PROXIES")) if os.getenv("NUM_PROXIES") else None,
+}
+PAGINATION_MAX_PAGE_SIZE = int(os.getenv("PAGINATION_MAX_PAGE_SIZE", 500))
+
+SIMPLE_JWT = {
+    'ACCESS_TOKEN_LIFETIME': timedelta(hours=6),
+    'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
+}
+
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+# Use a shared cache (e.g. django.core.cache.backends.redis.RedisCache) when running more than one worker.
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv("CACHE_BACKEND", 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv("CACHE_LOCATION", ''),
+    }
 }
+# Local memory cache is per process, features which need to see writes of other workers are only enabled by
+# default with a shared cache. Enabling them on a per process cache fails the system checks (AppUser.checks).
+SHARED_CACHE = CACHES['default']['BACKEND'] not in ('django.core.cache.backends.locmem.LocMemCache',
+                                                    'django.core.cache.backends.dummy.DummyCache')
+# When True login only signs new tokens and logout adds them in revocation store (TOKEN_REVOCATION_CACHE), user row
+# is not updated. Revocation store must be shared, otherwise a logged out token is still accepted by other workers.
+JWT_STATELESS_LOGIN = os.getenv("JWT_STATELESS_LOGIN", str(SHARED_CACHE)) == "True"
+TOKEN_REVOCATION_CACHE = os.getenv("TOKEN_REVOCATION_CACHE", 'default')
+# Token buckets of login and OTP endpoints, see AppUser.throttling.TokenBucketThrottle. Cache must be shared by all
+# workers (Redis / Memcached) for limits to hold across workers, with local memory cache each worker allows the
+# whole limit.
+THROTTLE_ENABLED = os.getenv("THROTTLE_ENABLED", "True") == "True"
+THROTTLE_CACHE = os.getenv("THROTTLE_CACHE", 'default')
+# action: {dimension: (capacity, seconds to refill whole bucket)}
+THROTTLE_BUCKETS = {
+    "login": {"username": (5, 60), "ip": (20, 60), "global": (int(os.getenv("THROTTLE_LOGIN_PER_SECOND", 50)), 1)},
+    "new_email_otp": {"user": (3, 600), "email": (3, 600), "ip": (10, 60),
+                      "global": (int(os.getenv("THROTTLE_EMAIL_OTP_PER_SECOND", 20)), 1)},
+    "new_sms_otp": {"user": (3, 600), "phone": (3, 600), "ip": (10, 60),
+                    "global": (int(os.getenv("THROTTLE_SMS_OTP_PER_SECOND", 10)), 1)},
+}
+RESPONSE_CACHE_ALIAS = os.getenv("RESPONSE_CACHE_ALIAS", 'default')
+RESPONSE_CACHE_TIMEOUT = int(os.getenv("RESPONSE_CACHE_TIMEOUT", 300))
+# Seconds to keep version tokens of cached objects / list pages, a new token is created after they expire.
+RESPONSE_CACHE_VERSION_TIMEOUT = int(os.getenv("RESPONSE_CACHE_VERSION_TIMEOUT", 86400))
+USER_TYPE_CACHE_ALIAS = os.getenv("USER_TYPE_CACHE_ALIAS", 'default')
+USER_TYPE_CACHE_CHECK_INTERVAL = float(os.getenv("USER_TYPE_CACHE_CHECK_INTERVAL", 1.0))
 
 # Internationalization
 # https://docs.djangoproject.com/en/3.2/topics/i18n/
@@ -153,3 +231,81 @@ AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID")
 AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY")
 AWS_STORAGE_BUCKET_NAME = os.getenv("AWS_STORAGE_BUCKET_NAME")
 AWS_S3_REGION_NAME = os.getenv("AWS_S3_REGION_NAME")  # e.g., 'us-west-1'
+AWS_S3_ENDPOINT_URL = os.getenv("AWS_S3_ENDPOINT_URL")  # only for S3 compatible servers e.g. MinIO
+AWS_S3_MAX_POOL_CONNECTIONS = int(os.getenv("AWS_S3_MAX_POOL_CONNECTIONS", 50))
+AWS_S3_MULTIPART_CHUNKSIZE = int(os.getenv("AWS_S3_MULTIPART_CHUNKSIZE", 8 * 1024 * 1024))
+AWS_S3_MAX_TRANSFER_CONCURRENCY = int(os.getenv("AWS_S3_MAX_TRANSFER_CONCURRENCY", 4))
+NEARBY_DEFAULT_RADIUS_KM = float(os.getenv("NEARBY_DEFAULT_RADIUS_KM", 5))
+NEARBY_MAX_RADIUS_KM = float(os.getenv("NEARBY_MAX_RADIUS_KM", 50))
+NEARBY_MAX_RESULTS = int(os.getenv("NEARBY_MAX_RESULTS", 100))
+SEARCH_MAX_RESULTS = int(os.getenv("SEARCH_MAX_RESULTS", 20))
+SEARCH_CANDIDATES = int(os.getenv("SEARCH_CANDIDATES", 200))
+SEARCH_MIN_SCORE = float(os.getenv("SEARCH_MIN_SCORE", 0.5))
+# Time zone in which operating hours of businesses are written, used by ?open_at= filter of business list.
+BUSINESS_HOURS_TIME_ZONE = os.getenv("BUSINESS_HOURS_TIME_ZONE", TIME_ZONE)
+# Email notification queue, use AppUser.notifications.SynchronousNotificationQueue to send on request thread.
+NOTIFICATION_QUEUE_BACKEND = os.getenv("NOTIFICATION_QUEUE_BACKEND", "AppUser.notifications.ThreadedNotificationQueue")
+NOTIFICATION_QUEUE_OPTIONS = {
+    "batch_size": int(os.getenv("NOTIFICATION_QUEUE_BATCH_SIZE", 50)),
+    "max_retries": int(os.getenv("NOTIFICATION_QUEUE_MAX_RETRIES", 3)),
+    "retry_backoff": float(os.getenv("NOTIFICATION_QUEUE_RETRY_BACKOFF", 0.5)),
+}
+NOTIFICATION_QUEUE_SHUTDOWN_TIMEOUT = float(os.getenv("NOTIFICATION_QUEUE_SHUTDOWN_TIMEOUT", 10))
+# SMS provider, use AppUser.sms.FakeSMSProvider to keep SMS in memory for tests and benchmarks.
+SMS_PROVIDER_BACKEND = os.getenv("SMS_PROVIDER_BACKEND", "AppUser.sms.TwilioSMSProvider")
+SMS_PROVIDER_OPTIONS = {}
+SMS_SENDER_MAX_WORKERS = int(os.getenv("SMS_SENDER_MAX_WORKERS", 8))
+SMS_SENDER_MAX_PENDING = int(os.getenv("SMS_SENDER_MAX_PENDING", 1000))
+SMS_SENDER_SHUTDOWN_TIMEOUT = float(os.getenv("SMS_SENDER_SHUTDOWN_TIMEOUT", 10))
+# File storage for profile images, use AppUser.storage.LocalFileSystemStorage to save files in local directory.
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "AppUser.storage.S3Storage")
+STORAGE_OPTIONS = {}
+STORAGE_UPLOAD_CHUNK_SIZE = 64 * 1024
+STORAGE_LOCAL_ROOT = os.getenv("STORAGE_LOCAL_ROOT", BASE_DIR / "media")
+STORAGE_LOCAL_BASE_URL = os.getenv("STORAGE_LOCAL_BASE_URL", "/media/")
+STORAGE_LOCAL_UPLOAD_URL = os.getenv("STORAGE_LOCAL_UPLOAD_URL", "/uploads/")
+# Presigned image uploads, see AppUser.uploads.DirectUploadMixin.
+UPLOAD_CONTENT_TYPES = ["image/jpeg", "image/png", "image/webp"]
+UPLOAD_MAX_SIZE = int(os.getenv("UPLOAD_MAX_SIZE", 10 * 1024 * 1024))
+UPLOAD_URL_EXPIRES = int(os.getenv("UPLOAD_URL_EXPIRES", 600))
+UPLOAD_TOKEN_MAX_AGE = int(os.getenv("UPLOAD_TOKEN_MAX_AGE", 3600))
+# Resized variants of uploaded profile images, see AppUser.images. Use AppUser.images.SynchronousImagePipeline to
+# create them on request thread.
+IMAGE_PIPELINE_BACKEND = os.getenv("IMAGE_PIPELINE_BACKEND", "AppUser.images.ProcessPoolImagePipeline")
+IMAGE_PIPELINE_OPTIONS = {
+    "max_workers": int(os.getenv("IMAGE_PIPELINE_MAX_WORKERS", 0)) or None,
+    "max_threads": int(os.getenv("IMAGE_PIPELINE_MAX_THREADS", 4)),
+}
+IMAGE_VARIANT_SIZES = {"thumb": (64, 64), "card": (480, 480), "full": (1600, 1600)}
+IMAGE_VARIANT_FORMAT = os.getenv("IMAGE_VARIANT_FORMAT", "JPEG")
+IMAGE_VARIANT_QUALITY = int(os.getenv("IMAGE_VARIANT_QUALITY", 82))
+# OTP store, AppUser.otp.CacheOTPBackend keeps OTPs in OTP_CACHE with TTL and needs a shared cache,
+# AppUser.otp.DatabaseOTPBackend keeps them in database tables.
+OTP_BACKEND = os.getenv("OTP_BACKEND", "AppUser.otp.CacheOTPBackend" if SHARED_CACHE else
+                        "AppUser.otp.DatabaseOTPBackend")
+OTP_CACHE = os.getenv("OTP_CACHE", "default")
+OTP_TTL_SECONDS = int(os.getenv("OTP_TTL_SECONDS", 300))
+OTP_MAX_ATTEMPTS = int(os.getenv("OTP_MAX_ATTEMPTS", 5))
+OTP_AUDIT_TO_DB = os.getenv("OTP_AUDIT_TO_DB", "False") == "True"
+BULK_WRITE_BATCH_SIZE = int(os.getenv("BULK_WRITE_BATCH_SIZE", 500))
+BULK_WRITE_MAX_BATCH_SIZE = int(os.getenv("BULK_WRITE_MAX_BATCH_SIZE", 2000))
+BULK_WRITE_MAX_ITEMS = int(os.getenv("BULK_WRITE_MAX_ITEMS", 5000))
+# Query count / DB time of every request, see AppUser.middleware.QueryInstrumentationMiddleware.
+QUERY_INSTRUMENTATION_ENABLED = os.getenv("QUERY_INSTRUMENTATION_ENABLED", "False") == "True"
+QUERY_INSTRUMENTATION_HEADERS = os.getenv("QUERY_INSTRUMENTATION_HEADERS", "True") == "True"
+QUERY_INSTRUMENTATION_WARN_QUERIES = int(os.getenv("QUERY_INSTRUMENTATION_WARN_QUERIES", 20))
+QUERY_INSTRUMENTATION_WARN_DB_MS = float(os.getenv("QUERY_INSTRUMENTATION_WARN_DB_MS", 200))
+# Profiling of sampled requests, see AppUser.middleware.ProfilingMiddleware. Mode is "cprofile" or "sampler".
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "False") == "True"
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", 0.0))
+PROFILING_HEADER = os.getenv("PROFILING_HEADER", "X-Profile-Token")
+PROFILING_TOKEN_MAX_AGE = int(os.getenv("PROFILING_TOKEN_MAX_AGE", 3600))
+PROFILING_MODE = os.getenv("PROFILING_MODE", "cprofile")
+PROFILING_SAMPLER_INTERVAL = float(os.getenv("PROFILING_SAMPLER_INTERVAL", 0.005))
+PROFILING_OUTPUT_DIR = os.getenv("PROFILING_OUTPUT_DIR", BASE_DIR / "profiles")
+# Prometheus metrics on /metrics, set PROMETHEUS_MULTIPROC_DIR environment variable when running more than one worker.
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "True") == "True"
+# /metrics is served to these client IPs (REMOTE_ADDR, comma separated) and to requests with METRICS_TOKEN as bearer
+# token, other clients get 403.
+METRICS_ALLOWED_IPS = [ip.strip() for ip in os.getenv("METRICS_ALLOWED_IPS", "127.0.0.1,::1").split(",") if ip.strip()]
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
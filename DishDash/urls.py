@@ -16,7 +16,12 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from AppUser.metrics import metrics_view
+from AppUser.uploads import local_upload_view
+
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path("metrics", metrics_view, name="metrics"),
+    path("uploads/<str:token>/", local_upload_view, name="local_upload"),
     path("", include("AppUser.urls")),
 ]